@@ -0,0 +1,84 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Every benchmark is a module that can be run from the project root, for example:
+
+    python -m benchmarks.browser_pool
+"""
+import contextlib
+import functools
+import logging
+import os
+import statistics
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "makeRecipe.settings")
+    import django
+    django.setup()
+    # The project logs everything at DEBUG, which would drown the numbers.
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+@contextlib.contextmanager
+def temporary_database():
+    """
+    Creates a throwaway test database so benchmarks never touch real data.
+    """
+    from django.db import connection
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve_directory(directory=FIXTURES_DIR, handler=_QuietHandler):
+    """
+    Serves a directory over HTTP on a free local port.
+    Yields the base url, e.g. http://127.0.0.1:54321
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler, directory=str(directory)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def measure(fn, runs):
+    """
+    Calls fn `runs` times and returns the wall time of every call in seconds.
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(
+        f"{label:<32} runs={len(timings):<5} "
+        f"mean={statistics.mean(timings) * 1000:9.2f} ms  "
+        f"median={statistics.median(timings) * 1000:9.2f} ms  "
+        f"p95={p95 * 1000:9.2f} ms"
+    )
@@ -0,0 +1,147 @@
+"""
+Load test of the scrape and autocomplete endpoints, served by one gunicorn sync worker
+and by one uvicorn worker running the async views.
+
+Recipe pages come from a local proxy that answers every www.ica.se url with the JSON-LD
+fixture after --delay seconds, like a slow recipe site would.
+
+    python -m benchmarks.async_load --requests 64 --concurrency 16 --delay 0.5
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import quote
+
+from benchmarks import FIXTURES_DIR, report
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def slow_site(delay):
+    page = (FIXTURES_DIR / "recipe_jsonld.html").read_bytes()
+
+    class SlowSiteHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, format, *args):
+            pass
+
+    return SlowSiteHandler
+
+
+@contextlib.contextmanager
+def proxy(delay):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), slow_site(delay))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def server(command, env):
+    process = subprocess.Popen(command, cwd=PROJECT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        yield process
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def wait_until_up(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"{base_url}/recipes/ingredients/autocomplete/?q=a", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{base_url} did not come up")
+
+
+def fetch(url):
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=120) as response:
+        json.loads(response.read())
+    return time.perf_counter() - start
+
+
+def load(label, urls, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        timings = list(pool.map(fetch, urls))
+    elapsed = time.perf_counter() - start
+    report(label, timings)
+    print(f"  {len(urls) / elapsed:.1f} requests/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--delay", type=float, default=0.5, help="Seconds the recipe site takes per page.")
+    args = parser.parse_args()
+
+    pages = itertools.count()
+    with tempfile.TemporaryDirectory() as tmp, proxy(args.delay) as proxy_url:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{tmp}/load.sqlite3",
+            "DEBUG": "False",
+            "HTTP_PROXY": proxy_url,
+            "http_proxy": proxy_url,
+            "NO_PROXY": "127.0.0.1,localhost",
+            "no_proxy": "127.0.0.1,localhost",
+        }
+        subprocess.run([sys.executable, "manage.py", "migrate", "-v", "0"], cwd=PROJECT_DIR, env=env, check=True)
+
+        servers = {
+            "gunicorn sync": ["gunicorn", "makeRecipe.wsgi:application", "--workers", "1"],
+            "uvicorn async": ["uvicorn", "makeRecipe.asgi:application", "--workers", "1", "--log-level", "warning"],
+        }
+        for label, command in servers.items():
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            command = command + (["--bind", f"127.0.0.1:{port}"] if command[0] == "gunicorn" else ["--port", str(port)])
+            with server(command, env):
+                wait_until_up(base_url)
+                print(label)
+                # Every request scrapes a page of its own, the scrape cache would answer repeats.
+                scrapes = [
+                    f"{base_url}/recipes/scrape-recipe-full/?url=" + quote(f"http://www.ica.se/recept/lasagne-{next(pages)}/")
+                    for _ in range(args.requests)
+                ]
+                load("  scrape-recipe-full", scrapes, args.concurrency)
+                autocompletes = [f"{base_url}/recipes/ingredients/autocomplete/?q=lo{i}" for i in range(args.requests)]
+                load("  autocomplete", autocompletes, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
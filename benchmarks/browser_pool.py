@@ -0,0 +1,48 @@
+"""
+Compares launching Chromium for every scrape with the shared browser pool.
+
+    python -m benchmarks.browser_pool --runs 20
+"""
+import argparse
+
+from benchmarks import measure, report, serve_directory, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--pool-size", type=int, default=1)
+    args = parser.parse_args()
+
+    setup_django()
+    from playwright.sync_api import sync_playwright
+    from recipes.views.browserPool import BrowserPool
+    from recipes.views.pages import SITE_CONFIGS
+
+    config = SITE_CONFIGS["ica.se"]
+
+    def scrape(page, url):
+        page.goto(url, wait_until="networkidle")
+        return page.eval_on_selector_all(config["ingredients_selector"], config["ingredients_extractor"])
+
+    with serve_directory() as base_url:
+        url = f"{base_url}/recipe.html"
+
+        def cold():
+            with sync_playwright() as p:
+                browser = p.chromium.launch()
+                page = browser.new_page()
+                scrape(page, url)
+                browser.close()
+
+        pool = BrowserPool(size=args.pool_size, max_pages=0, max_rss_mb=0)
+        # The first job waits for the browser to start, like the first scrape after a deploy.
+        pool.run(scrape, url)
+
+        report("cold launch per scrape", measure(cold, args.runs))
+        report("pooled browser", measure(lambda: pool.run(scrape, url), args.runs))
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
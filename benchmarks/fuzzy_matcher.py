@@ -0,0 +1,84 @@
+"""
+Compares the trigram ingredient index with a difflib scan of the whole catalog, in speed
+and in how often the index finds a match as close as difflib's.
+
+    python -m benchmarks.fuzzy_matcher --sizes 10000 100000
+"""
+import argparse
+import itertools
+import random
+import time
+from difflib import SequenceMatcher, get_close_matches
+
+from benchmarks import measure, report, setup_django
+
+ADJECTIVES = ["gul", "röd", "vit", "grön", "svart", "färsk", "torkad", "rökt", "riven", "hel", "krossad", "fryst"]
+NOUNS = [
+    "lök", "paprika", "peppar", "vitlök", "potatis", "morot", "tomat", "ost", "grädde", "mjölk",
+    "smör", "lax", "kyckling", "färs", "bönor", "linser", "ris", "pasta", "basilika", "persilja",
+    "citron", "lime", "ingefära", "chili", "spenat", "svamp", "purjolök", "selleri", "squash", "äpple",
+]
+
+
+def catalog(size):
+    """
+    Builds `size` unique ingredient-like names such as "rökt lax 12".
+    """
+    combos = [f"{a} {n}" for a, n in itertools.product(ADJECTIVES, NOUNS)] + NOUNS
+    return [f"{combos[i % len(combos)]} {i // len(combos)}" if i >= len(combos) else combos[i] for i in range(size)]
+
+
+def misspell(name, rng):
+    position = rng.randrange(len(name))
+    return name[:position] + name[position + 1:]
+
+
+def recall(index, names, queries):
+    """
+    Returns how many of the queries the index answers with a name scoring at least as well
+    as the best one difflib finds in the whole catalog, and how many difflib has an answer for.
+    """
+    as_good = answered = 0
+    for query in queries:
+        expected = get_close_matches(query, names, n=1, cutoff=0.8)
+        if not expected:
+            continue
+        answered += 1
+        found = index.best_match(query)
+        if found is not None:
+            score = SequenceMatcher(None, found[1].lower(), query).ratio()
+            as_good += score >= SequenceMatcher(None, expected[0], query).ratio()
+    return as_good, answered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--recall-queries", type=int, default=50, help="Queries checked against difflib, each scans the catalog.")
+    args = parser.parse_args()
+
+    setup_django()
+    from recipes.views.ingredientIndex import IngredientIndex
+
+    rng = random.Random(42)
+    for size in args.sizes:
+        names = catalog(size)
+        misspelled = [misspell(rng.choice(names), rng).strip() for _ in range(args.queries)]
+        queries = iter(itertools.cycle(misspelled))
+        print(f"\n{size} managed ingredients")
+
+        index = IngredientIndex()
+        start = time.perf_counter()
+        index.build((i, name, []) for i, name in enumerate(names))
+        print(f"{'index build':<32} {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        report("trigram index lookup", measure(lambda: index.best_match(next(queries)), args.queries))
+        # difflib is orders of magnitude slower, a handful of queries is enough to show it.
+        report("difflib full scan", measure(lambda: get_close_matches(next(queries), names, n=1, cutoff=0.8), 5))
+        as_good, answered = recall(index, names, misspelled[:args.recall_queries])
+        print(f"{'as close as difflib':<32} {as_good}/{answered}")
+
+
+if __name__ == "__main__":
+    main()
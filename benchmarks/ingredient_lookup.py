@@ -0,0 +1,58 @@
+"""
+Compares name__iexact with the lower(name) index behind managed_ingredients_named, and
+loading the ingredients of a few recipes, on a throwaway database with a large catalog.
+
+    python -m benchmarks.ingredient_lookup --ingredients 100000 --recipes 20000
+"""
+import argparse
+import random
+
+from benchmarks import measure, report, setup_django, temporary_database
+from benchmarks.fuzzy_matcher import catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ingredients", type=int, default=100_000)
+    parser.add_argument("--recipes", type=int, default=20_000)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+
+    from recipes.models import Ingredient, ManagedIngredient, Recipe
+    from recipes.views.ingridientHandler import managed_ingredients_named
+
+    rng = random.Random(42)
+    with temporary_database():
+        names = catalog(args.ingredients)
+        ManagedIngredient.objects.bulk_create([ManagedIngredient(name=name) for name in names], batch_size=5000)
+        ids = list(ManagedIngredient.objects.values_list("id", flat=True))
+        recipes = Recipe.objects.bulk_create(
+            [Recipe(title=f"Recept {i}", description="", servings=4) for i in range(args.recipes)], batch_size=5000
+        )
+        Ingredient.objects.bulk_create(
+            [Ingredient(recipe=recipe, name_id=rng.choice(ids), quantity=1, unit="st") for recipe in recipes for _ in range(8)],
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        queries = [rng.choice(names).upper() for _ in range(args.runs)]
+        lookups = iter(queries * 2)
+        report("name__iexact", measure(lambda: ManagedIngredient.objects.filter(name__iexact=next(lookups)).first(), args.runs))
+        report("lower(name) index", measure(lambda: list(managed_ingredients_named([next(lookups)])[:1]), args.runs))
+
+        recipe_ids = [r.id for r in recipes]
+        report("ingredients of 20 recipes", measure(
+            lambda: list(Ingredient.objects.filter(recipe_id__in=rng.sample(recipe_ids, 20)).values_list("recipe_id", "name_id", "unit", "quantity")),
+            args.runs,
+        ))
+        report("recipes using an ingredient", measure(
+            lambda: list(Ingredient.objects.filter(name_id=rng.choice(ids)).values_list("recipe_id", flat=True)), args.runs
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Times duplicate detection of views/ingredientMerge.py on catalogs with planted duplicates
+("gul lök" next to "gullök", "lök, gul" or a typo) and estimates what comparing every pair would take.
+
+    python -m benchmarks.ingredient_merge --sizes 10000 50000
+"""
+import argparse
+import random
+import time
+from difflib import SequenceMatcher
+
+from benchmarks import setup_django
+from benchmarks.fuzzy_matcher import ADJECTIVES
+
+# No two syllables a letter apart, so made-up names are rarely a typo of each other.
+SYLLABLES = ["ka", "ro", "lök", "sa", "mi", "dill", "gur", "ost", "pe", "lin", "nöt", "bär", "kål", "sel", "fi", "tö", "mas", "ört"]
+
+
+def catalog(size, rng):
+    """
+    Builds `size` unique made-up ingredient names of one or two words, like "röd gurpelin".
+    """
+    names = set()
+    while len(names) < size:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        names.add(f"{rng.choice(ADJECTIVES)} {word}" if rng.random() < 0.4 else word)
+    return sorted(names)
+
+
+def variant(name, rng):
+    words = name.split(" ")
+    kind = rng.randrange(4)
+    if kind == 0 and len(words) > 1:
+        return "".join(words)
+    if kind == 1 and len(words) > 1:
+        return f"{' '.join(words[1:])}, {words[0]}"
+    if kind == 2:
+        return name.capitalize()
+    # A letter left out inside the name, one missing at the end is taken for a different word.
+    position = rng.randrange(len(name) - 1)
+    return name[:position] + name[position + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--duplicates", type=float, default=0.05, help="Share of names that get a planted duplicate.")
+    args = parser.parse_args()
+
+    setup_django()
+    from recipes.views.ingredientMerge import duplicate_clusters, merge_key
+
+    rng = random.Random(42)
+    for size in args.sizes:
+        names = catalog(size, rng)
+        planted = {}
+        for original in rng.sample(range(size), int(size * args.duplicates)):
+            duplicate = variant(names[original], rng)
+            if duplicate not in names:
+                planted[len(names)] = original
+                names.append(duplicate)
+        rows = list(enumerate(names))
+        print(f"\n{len(names)} managed ingredients, {len(planted)} planted duplicates")
+
+        start = time.perf_counter()
+        clusters = duplicate_clusters(rows)
+        elapsed = time.perf_counter() - start
+        cluster_of = {i: n for n, cluster in enumerate(clusters) for i in cluster}
+        found = sum(1 for dup, original in planted.items() if dup in cluster_of and cluster_of.get(original) == cluster_of[dup])
+        # Made-up names a typo apart from each other can be merged too, they are counted as extra.
+        extra = sum(len(cluster) - 1 for cluster in clusters) - found
+        print(f"{'blocked detection':<32} {elapsed:.2f} s")
+        print(f"{'planted duplicates found':<32} {found}/{len(planted)}, {extra} other merges")
+
+        # Every pair is out of reach, time a sample and scale it up.
+        keys = [merge_key(name) for name in names]
+        sample = 20_000
+        start = time.perf_counter()
+        for _ in range(sample):
+            SequenceMatcher(None, rng.choice(keys), rng.choice(keys)).ratio()
+        pairs = len(keys) * (len(keys) - 1) // 2
+        print(f"{'all pairs (estimated)':<32} {(time.perf_counter() - start) / sample * pairs:.0f} s for {pairs} pairs")
+
+
+if __name__ == "__main__":
+    main()
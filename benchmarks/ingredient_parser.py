@@ -0,0 +1,37 @@
+"""
+Measures ingredient line parsing throughput over a corpus of Swedish ingredient lines.
+
+    python -m benchmarks.ingredient_parser --repeat 200
+"""
+import argparse
+import time
+
+from benchmarks import FIXTURES_DIR, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200, help="Times the corpus is parsed, like recipes sharing lines.")
+    args = parser.parse_args()
+
+    setup_django()
+    from recipes.views.parser import _parse, parse_ingredients
+
+    lines = (FIXTURES_DIR / "ingredient_lines.txt").read_text(encoding="utf-8").splitlines()
+
+    _parse.cache_clear()
+    start = time.perf_counter()
+    parse_ingredients(lines)
+    cold = time.perf_counter() - start
+    print(f"{'first pass (tokenizer)':<32} {len(lines) / cold:12,.0f} lines/s")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        parse_ingredients(lines)
+    warm = time.perf_counter() - start
+    print(f"{'repeated lines (memoized)':<32} {len(lines) * args.repeat / warm:12,.0f} lines/s")
+    print(_parse.cache_info())
+
+
+if __name__ == "__main__":
+    main()
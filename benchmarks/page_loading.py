@@ -0,0 +1,132 @@
+"""
+Compares waiting for networkidle with the per-site load strategy of views/pageLoading.py
+on a recipe page that pulls in slow third-party images, fonts, styles and a tracker
+that keeps beaconing. Needs the Chromium of Playwright (playwright install chromium).
+
+    python -m benchmarks.page_loading --runs 10 --delay 2
+"""
+import argparse
+import contextlib
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks import FIXTURES_DIR, measure, report, setup_django
+
+TRACKER_JS = """
+let beacons = 0;
+const timer = setInterval(() => {
+    fetch("/beacon?n=" + beacons++).catch(() => {});
+    if (beacons >= 12) clearInterval(timer);
+}, 300);
+"""
+
+
+def third_party(delay):
+    """
+    A slow ad and analytics host: every asset takes `delay` seconds.
+    """
+    class ThirdPartyHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body, content_type = b"", "application/octet-stream"
+            if self.path.endswith(".js"):
+                body, content_type = TRACKER_JS.encode(), "application/javascript"
+            elif self.path.endswith(".css"):
+                body, content_type = b"body { font-family: slow; }", "text/css"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThirdPartyHandler
+
+
+def recipe_site(third_party_url):
+    page = (FIXTURES_DIR / "recipe.html").read_text(encoding="utf-8")
+    page = page.replace("</head>", (
+        f'<link rel="stylesheet" href="{third_party_url}/fonts.css">\n'
+        f'<script async src="{third_party_url}/gtm.js"></script>\n</head>'
+    ))
+    page = page.replace("</body>", "".join(
+        f'<img src="{third_party_url}/ad-{i}.jpg">\n' for i in range(6)
+    ) + f'<video src="{third_party_url}/promo.mp4" autoplay muted></video>\n</body>').encode()
+
+    class RecipeSiteHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = page if self.path.startswith("/recept/") else b""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return RecipeSiteHandler
+
+
+@contextlib.contextmanager
+def serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--delay", type=float, default=2.0, help="Seconds every third-party asset takes.")
+    args = parser.parse_args()
+
+    setup_django()
+    from recipes.views.browserPool import BrowserPool
+    from recipes.views.newScraper import _collect_recipe, _eval
+    from recipes.views.pages import SITE_CONFIGS
+
+    with serve(third_party(args.delay)) as third_party_port:
+        # A different host name than the recipe site, like a real ad network.
+        third_party_url = f"http://localhost:{third_party_port}"
+        with serve(recipe_site(third_party_url)) as site_port:
+            url = f"http://127.0.0.1:{site_port}/recept/kottbullar-123456/"
+            config = {**SITE_CONFIGS["ica.se"], "blocked_url_patterns": [f"localhost:{third_party_port}"]}
+
+            def networkidle(page):
+                page.goto(url, wait_until="networkidle")
+                return _eval(page, config, "title")
+
+            pool = BrowserPool(size=1, max_pages=0, max_rss_mb=0)
+            recipe = pool.run(_collect_recipe, url, config)
+            print(f"Load strategy extracted {len(recipe['ingredients'])} ingredients of {recipe['title']!r}")
+            unblocked = {**config, "blocked_resource_types": [], "blocked_url_patterns": []}
+            strategies = {
+                "networkidle": lambda: pool.run(networkidle),
+                "ready selectors + blocking": lambda: pool.run(_collect_recipe, url, config),
+                "ready selectors only": lambda: pool.run(_collect_recipe, url, unblocked),
+            }
+            medians = {}
+            for label, load in strategies.items():
+                timings = measure(load, args.runs)
+                report(label, timings)
+                medians[label] = statistics.median(timings)
+            pool.close()
+
+    print(f"\nMedian page load with third-party assets taking {args.delay:g} s:")
+    for label, median in medians.items():
+        print(f"{label:<32} {median * 1000:9.2f} ms  {medians['networkidle'] / median:5.1f}x as fast as networkidle")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compares the pantry index with an ORM query per pantry ingredient.
+
+    python -m benchmarks.pantry --recipes 50000 --catalog 5000
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from benchmarks import measure, report, setup_django, temporary_database
+
+
+def naive_match(pantry, limit):
+    """
+    One query per pantry ingredient for the recipes using it, one more for the ingredient counts.
+    """
+    from django.db.models import Count
+    from recipes.models import Ingredient, Recipe
+
+    covered = Counter()
+    for ingredient_id in pantry:
+        covered.update(set(Ingredient.objects.filter(name_id=ingredient_id).values_list('recipe_id', flat=True)))
+    totals = dict(
+        Recipe.objects.filter(id__in=list(covered)).annotate(total=Count('ingredient__name', distinct=True)).values_list('id', 'total')
+    )
+    ranked = sorted(covered, key=lambda recipe_id: (totals[recipe_id] - covered[recipe_id], -covered[recipe_id], recipe_id))
+    return ranked[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recipes", type=int, default=50_000)
+    parser.add_argument("--catalog", type=int, default=5_000, help="Number of managed ingredients.")
+    parser.add_argument("--ingredients", type=int, default=10, help="Ingredients per recipe.")
+    parser.add_argument("--pantry", type=int, default=30, help="Ingredients on hand per query.")
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import transaction
+    from recipes.models import Ingredient, ManagedIngredient, Recipe
+    from recipes.views.pantryIndex import PantryIndex
+
+    rng = random.Random(42)
+    # Real catalogs are skewed, a few staples like salt and onion show up in most recipes.
+    weights = [1 / (rank + 1) for rank in range(args.catalog)]
+
+    with temporary_database():
+        start = time.perf_counter()
+        with transaction.atomic():
+            managed = ManagedIngredient.objects.bulk_create(
+                (ManagedIngredient(name=f"ingrediens {i}") for i in range(args.catalog)), batch_size=1000
+            )
+            recipes = Recipe.objects.bulk_create(
+                (Recipe(title=f"Recept {i}", description="", servings=4) for i in range(args.recipes)), batch_size=1000
+            )
+            Ingredient.objects.bulk_create(
+                (
+                    Ingredient(recipe=recipe, name=ingredient, quantity=1, unit="st")
+                    for recipe in recipes
+                    for ingredient in set(rng.choices(managed, weights, k=args.ingredients))
+                ),
+                batch_size=5000,
+            )
+        print(f"{args.recipes} recipes over {args.catalog} ingredients seeded in {time.perf_counter() - start:.1f}s")
+
+        index = PantryIndex()
+        start = time.perf_counter()
+        index.build(Ingredient.objects.values_list("recipe_id", "name_id").iterator(chunk_size=10000))
+        print(f"{'index build':<32} {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        pantries = [[ingredient.id for ingredient in rng.choices(managed, weights, k=args.pantry)] for _ in range(args.runs)]
+        queries = iter(pantries * 2)
+        report("pantry index", measure(lambda: index.match(next(queries), 25), args.runs))
+
+        changed = rng.sample(recipes, 100)
+        start = time.perf_counter()
+        index.update({recipe.id: {rng.choice(managed).id for _ in range(args.ingredients)} for recipe in changed})
+        print(f"{'update 100 recipes':<32} {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        queries = iter(pantries)
+        report("query per ingredient", measure(lambda: naive_match(next(queries), 25), max(1, args.runs // 10)))
+
+
+if __name__ == "__main__":
+    main()
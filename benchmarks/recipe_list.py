@@ -0,0 +1,49 @@
+"""
+Compares loading every recipe for the list page with keyset pages of lean rows,
+at the first page and deep into the table, and list pages with and without cached cards.
+
+    python -m benchmarks.recipe_list --sizes 1000 10000 50000
+"""
+import argparse
+
+from benchmarks import measure, report, setup_django, temporary_database
+
+DESCRIPTION = "En lång beskrivning av receptet. " * 60
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import Client
+    from recipes.models import Recipe
+    from recipes.views.fragmentCache import fragment_cache
+    from recipes.views.recipeHandler import recipe_page
+
+    def cold_list_page():
+        fragment_cache().clear()
+        return client.get("/")
+
+    with temporary_database():
+        client = Client()
+        for size in args.sizes:
+            Recipe.objects.bulk_create(
+                (Recipe(title=f"Recept {i}", description=DESCRIPTION, servings=4) for i in range(Recipe.objects.count(), size)),
+                batch_size=1000,
+            )
+            deep_cursor = Recipe.objects.order_by('-id').values_list('id', flat=True)[100]
+            print(f"\n{size} recipes")
+
+            report("all rows, full description", measure(lambda: list(Recipe.objects.all()), max(1, args.runs // 10)))
+            report("keyset first page", measure(lambda: recipe_page(), args.runs))
+            report("keyset deep page", measure(lambda: recipe_page(deep_cursor), args.runs))
+            report("list page, cold fragments", measure(cold_list_page, args.runs))
+            report("list page, cached fragments", measure(lambda: client.get("/"), args.runs))
+            report("JSON page request", measure(lambda: client.get("/page/", {"after": deep_cursor}), args.runs))
+
+
+if __name__ == "__main__":
+    main()
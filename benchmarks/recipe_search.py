@@ -0,0 +1,67 @@
+"""
+Measures full-text recipe search against a LIKE scan over titles and descriptions.
+
+    python -m benchmarks.recipe_search --recipes 100000
+"""
+import argparse
+import itertools
+import random
+import time
+
+from benchmarks import measure, report, setup_django, temporary_database
+from benchmarks.fuzzy_matcher import ADJECTIVES, NOUNS
+
+DISHES = ["soppa", "gryta", "paj", "sallad", "wok", "lasagne", "risotto", "curry", "pannkakor", "biffar"]
+WORDS = ["enkel", "snabb", "krämig", "het", "somrig", "klassisk", "vegetarisk", "mustig", "fräsch", "god"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import transaction
+    from django.db.models import Q
+    from recipes.models import Recipe
+    from recipes.views.recipeSearch import search_page, store_documents
+
+    rng = random.Random(42)
+    with temporary_database():
+        start = time.perf_counter()
+        with transaction.atomic():
+            recipes = Recipe.objects.bulk_create(
+                (
+                    Recipe(
+                        title=f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}{rng.choice(DISHES)}",
+                        description=" ".join(rng.choices(WORDS + NOUNS, k=40)),
+                        servings=4,
+                    )
+                    for _ in range(args.recipes)
+                ),
+                batch_size=1000,
+            )
+            documents = [
+                (recipe.id, recipe.title, recipe.description, " ".join(rng.sample(NOUNS, 8)))
+                for recipe in recipes
+            ]
+            store_documents([recipe.id for recipe in recipes], documents)
+        print(f"{args.recipes} recipes seeded and indexed in {time.perf_counter() - start:.1f}s")
+
+        queries = itertools.cycle(["lax", "krämig soppa", "röd paprikagryta", "ving", "citron lime", "het curry"])
+
+        def like_scan():
+            words = next(queries).split()
+            matches = Recipe.objects.all()
+            for word in words:
+                matches = matches.filter(Q(title__icontains=word) | Q(description__icontains=word))
+            return list(matches.values_list("id", flat=True)[:25])
+
+        report("full-text search, first page", measure(lambda: search_page(next(queries), 1), args.runs))
+        report("full-text search, page 10", measure(lambda: search_page(next(queries), 10), args.runs))
+        report("LIKE scan, unranked", measure(like_scan, max(1, args.runs // 10)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Times importing and exporting recipes as JSON lines, and saving recipes one at a time
+like the add recipe form does for comparison.
+
+    python -m benchmarks.recipe_transfer --recipes 100000
+"""
+import argparse
+import json
+import os
+import random
+import time
+import tracemalloc
+
+from benchmarks import setup_django, temporary_database
+
+
+def records(count, catalog, ingredients, rng):
+    units = ["g", "dl", "msk", "tsk", "st", "krm"]
+    for i in range(catalog):
+        yield {"type": "managed_ingredient", "name": f"ingrediens {i}", "common_denonyms": [], "weight_to_volume_conversion": 1.0, "category": "", "notes": ""}
+    for i in range(count):
+        yield {
+            "type": "recipe",
+            "title": f"Recept {i}",
+            "description": "Blanda allt och grädda i ugnen.",
+            "servings": rng.randint(1, 8),
+            "ingredients": [
+                {"name": f"ingrediens {rng.randrange(catalog)}", "quantity": rng.randint(1, 500) / 10, "unit": rng.choice(units)}
+                for _ in range(ingredients)
+            ],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--catalog", type=int, default=2_000, help="Number of managed ingredients.")
+    parser.add_argument("--ingredients", type=int, default=10, help="Ingredients per recipe.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--one-by-one", type=int, default=200, help="Recipes saved one at a time.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import transaction
+    from recipes.models import Ingredient, ManagedIngredient, Recipe
+    from recipes.views.recipeTransfer import RecipeImporter, export_records
+
+    lines = [json.dumps(record, ensure_ascii=False) for record in records(args.recipes, args.catalog, args.ingredients, random.Random(42))]
+
+    with temporary_database():
+        start = time.perf_counter()
+        importer = RecipeImporter(args.batch_size)
+        for line in lines:
+            importer.add(json.loads(line))
+        counts = importer.close()
+        elapsed = time.perf_counter() - start
+        print(f"{'import':<32} {counts['recipes']} recipes, {counts['ingredients']} ingredients in {elapsed:.1f}s "
+              f"({counts['recipes'] / elapsed:.0f} recipes/s)")
+
+        def export():
+            exported = 0
+            with open(os.devnull, "w", encoding="utf-8") as output, transaction.atomic():
+                for record in export_records():
+                    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    exported += 1
+            return exported
+
+        start = time.perf_counter()
+        exported = export()
+        elapsed = time.perf_counter() - start
+        # tracemalloc slows everything down, memory is measured on a second run.
+        tracemalloc.start()
+        export()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{'export':<32} {exported} records in {elapsed:.1f}s, peak memory {peak / 2**20:.1f} MB")
+
+        names = list(ManagedIngredient.objects.values_list("id", flat=True))
+        rng = random.Random(1)
+        start = time.perf_counter()
+        for i in range(args.one_by_one):
+            with transaction.atomic():
+                recipe = Recipe.objects.create(title=f"Formulär {i}", description="", servings=4)
+                for _ in range(args.ingredients):
+                    Ingredient.objects.create(recipe=recipe, name_id=rng.choice(names), quantity=1, unit="st")
+        elapsed = time.perf_counter() - start
+        print(f"{'one recipe at a time':<32} {args.one_by_one} recipes in {elapsed:.1f}s "
+              f"({args.one_by_one / elapsed:.0f} recipes/s, {args.recipes / (args.one_by_one / elapsed) / 60:.0f} min for {args.recipes})")
+
+
+if __name__ == "__main__":
+    main()
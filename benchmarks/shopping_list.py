@@ -0,0 +1,84 @@
+"""
+Compares the old per-recipe Python loop, the grouped shopping list query
+and the weighted sum over stored per-serving vectors.
+
+    python -m benchmarks.shopping_list --recipes 1000
+"""
+import argparse
+import random
+
+from benchmarks import measure, report, setup_django, temporary_database
+
+
+def legacy_shopping_list(recipe_ids, num_guests):
+    """
+    The loop create_shopping_list used before, one query per recipe and per ingredient name.
+    """
+    from recipes.models import Recipe
+
+    merged_ingredients = {}
+    for recipe in Recipe.objects.filter(id__in=recipe_ids):
+        scale_factor = num_guests / recipe.servings
+        for ingredient in recipe.ingredient_set.all():
+            key = f"{ingredient.name.name}_{ingredient.unit}"
+            if key in merged_ingredients:
+                merged_ingredients[key]['quantity'] += ingredient.quantity * scale_factor
+            else:
+                merged_ingredients[key] = {'name': ingredient.name.name, 'quantity': ingredient.quantity * scale_factor, 'unit': ingredient.unit}
+    return list(merged_ingredients.values())
+
+
+def seed(recipes, ingredients_per_recipe, catalog_size):
+    from recipes.models import Ingredient, ManagedIngredient, Recipe
+
+    rng = random.Random(42)
+    units = [unit for unit, _ in Ingredient.UNIT_CHOICES]
+    managed = ManagedIngredient.objects.bulk_create(ManagedIngredient(name=f"ingrediens {i}") for i in range(catalog_size))
+    created = Recipe.objects.bulk_create(
+        Recipe(title=f"Recept {i}", description="", servings=rng.randint(2, 8)) for i in range(recipes)
+    )
+    Ingredient.objects.bulk_create(
+        Ingredient(recipe=recipe, name=rng.choice(managed), quantity=rng.uniform(0.5, 500), unit=rng.choice(units))
+        for recipe in created
+        for _ in range(ingredients_per_recipe)
+    )
+    return [recipe.id for recipe in created]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recipes", type=int, default=1000)
+    parser.add_argument("--ingredients", type=int, default=12, help="Ingredients per recipe.")
+    parser.add_argument("--catalog", type=int, default=300, help="Number of managed ingredients.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from recipes.views.ingredientVectors import rebuild_ingredient_vectors, sum_vectors
+    from recipes.views.shoppingListHandler import aggregate_shopping_list
+
+    def vector_sum(recipe_ids, num_guests):
+        return sum_vectors(dict.fromkeys(recipe_ids, num_guests))
+
+    with temporary_database():
+        call_command("migrate", verbosity=0)
+        recipe_ids = seed(args.recipes, args.ingredients, args.catalog)
+        rebuild_ingredient_vectors(recipe_ids)
+        print(f"{args.recipes} recipes with {args.ingredients} ingredients each")
+
+        for label, fn in [
+            ("per-recipe loop", legacy_shopping_list),
+            ("grouped query", aggregate_shopping_list),
+            ("per-serving vectors", vector_sum),
+        ]:
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as queries:
+                fn(recipe_ids, 10)
+            report(f"{label} ({len(queries)} queries)", measure(lambda: fn(recipe_ids, 10), args.runs))
+
+
+if __name__ == "__main__":
+    main()
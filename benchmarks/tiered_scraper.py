@@ -0,0 +1,42 @@
+"""
+Compares the browserless JSON-LD fast path with rendering the same page in the browser pool.
+
+    python -m benchmarks.tiered_scraper --runs 20
+"""
+import argparse
+import resource
+
+from benchmarks import measure, report, serve_directory, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from recipes.views.browserPool import BrowserPool
+    from recipes.views.newScraper import _collect_recipe, extract_static
+    from recipes.views.pages import SITE_CONFIGS
+
+    config = SITE_CONFIGS["ica.se"]
+
+    with serve_directory() as base_url:
+        url = f"{base_url}/recipe_jsonld.html"
+        recipe = extract_static(url, config)
+        print(f"Static tier: {recipe['tier']}, {len(recipe['ingredients'])} ingredients")
+
+        cpu_before = resource.getrusage(resource.RUSAGE_SELF).ru_utime
+        report("static fetch + JSON-LD", measure(lambda: extract_static(url, config), args.runs))
+        cpu = resource.getrusage(resource.RUSAGE_SELF).ru_utime - cpu_before
+        print(f"  cpu per scrape: {cpu / args.runs * 1000:.2f} ms")
+
+        pool = BrowserPool(size=1, max_pages=0, max_rss_mb=0)
+        pool.run(_collect_recipe, url, config)
+        report("browser pool", measure(lambda: pool.run(_collect_recipe, url, config), args.runs))
+        print(f"  browser rss: {pool._slots[0].browser_rss_mb():.0f} MB")
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
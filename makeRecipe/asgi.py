@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'makeRecipe.settings')
+# Serve the async versions of the scrape and autocomplete views, see recipes/urls.py.
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import environ
 import os
+import tempfile
 import dj_database_url
 
 env = environ.Env(
@@ -98,6 +99,66 @@ else:
         }
     }
 
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Under ASGI every request writes from a thread of its own. Taking the write lock when a
+    # transaction starts makes concurrent writers wait instead of failing with "database is locked".
+    DATABASES['default'].setdefault('OPTIONS', {}).update(transaction_mode='IMMEDIATE', timeout=20)
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    if env.bool("DATABASE_POOL", default=True):
+        # Every worker process keeps a pool of open connections instead of connecting for each request.
+        # Unlike CONN_MAX_AGE this also covers the threads async views run their queries in.
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': env.int("DATABASE_POOL_MIN_SIZE", default=2),
+            'max_size': env.int("DATABASE_POOL_MAX_SIZE", default=10),
+            'timeout': env.int("DATABASE_POOL_TIMEOUT", default=10),
+        }
+    else:
+        # Behind an external pooler like PgBouncer, connections are kept open between requests instead.
+        DATABASES['default']['CONN_MAX_AGE'] = env.int("CONN_MAX_AGE", default=60)
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+
+# Cache
+# Redis is shared by all worker processes, the in-memory fallback is per process.
+
+if env('REDIS_URL', default=None):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': env('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Rendered recipe cards and ingredient lists, keyed by recipe version.
+# FRAGMENT_CACHE_BACKEND picks locmem, file or redis (REDIS_URL or a Redis on localhost).
+FRAGMENT_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'fragments',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': env('FRAGMENT_CACHE_DIR', default=os.path.join(tempfile.gettempdir(), 'makerecipe-fragments')),
+    },
+    'redis': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': env('REDIS_URL', default='redis://127.0.0.1:6379/1'),
+    },
+}
+FRAGMENT_CACHE_TIMEOUT = env.int("FRAGMENT_CACHE_TIMEOUT", default=24 * 60 * 60)
+CACHES['fragments'] = {
+    **FRAGMENT_CACHE_BACKENDS[env('FRAGMENT_CACHE_BACKEND', default='redis' if env('REDIS_URL', default=None) else 'locmem')],
+    'TIMEOUT': FRAGMENT_CACHE_TIMEOUT,
+    'KEY_PREFIX': 'fragments',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -162,4 +223,52 @@ WHITENOISE_AUTOREFRESH = DEBUG
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_ROOT = env("MEDIA", default=BASE_DIR / "media")  
-MEDIA_URL = env("MEDIA_PATH", default="/media/")
\ No newline at end of file
+MEDIA_URL = env("MEDIA_PATH", default="/media/")
+
+# Scraper
+# Warm Chromium browsers shared by all scrapes in a worker process.
+
+SCRAPER_POOL_SIZE = env.int("SCRAPER_POOL_SIZE", default=2)
+SCRAPER_POOL_MAX_PAGES = env.int("SCRAPER_POOL_MAX_PAGES", default=50)
+SCRAPER_POOL_MAX_RSS_MB = env.int("SCRAPER_POOL_MAX_RSS_MB", default=512)
+SCRAPER_POOL_TIMEOUT = env.int("SCRAPER_POOL_TIMEOUT", default=60)
+
+# Scrapes a site answers with 429 or 5xx are retried with exponential backoff (seconds).
+# Request rates and pages in flight per site are set in SITE_CONFIGS, see views/scrapeScheduler.py.
+SCRAPER_MAX_RETRIES = env.int("SCRAPER_MAX_RETRIES", default=3)
+SCRAPER_BACKOFF_BASE = env.float("SCRAPER_BACKOFF_BASE", default=1.0)
+SCRAPER_BACKOFF_MAX = env.float("SCRAPER_BACKOFF_MAX", default=60.0)
+
+# Served through makeRecipe/asgi.py, which turns this on, the scrape and autocomplete
+# endpoints use async views and one shared async browser per worker.
+ASYNC_VIEWS = env.bool("ASYNC_VIEWS", default=False)
+ASYNC_SCRAPER_MAX_PAGES = env.int("ASYNC_SCRAPER_MAX_PAGES", default=16)
+
+# Scraped pages are cached in the database for a week, see the purgescrapecache command.
+SCRAPE_CACHE_TTL = env.int("SCRAPE_CACHE_TTL", default=7 * 24 * 60 * 60)
+SCRAPE_CACHE_MAX_ENTRIES = env.int("SCRAPE_CACHE_MAX_ENTRIES", default=5000)
+# Seconds between checks for entries above SCRAPE_CACHE_MAX_ENTRIES, made while storing a page.
+SCRAPE_CACHE_EVICT_INTERVAL = env.int("SCRAPE_CACHE_EVICT_INTERVAL", default=300)
+
+# Scrape jobs, handled by the runscrapeworker command.
+SCRAPE_JOB_POLL_INTERVAL = env.float("SCRAPE_JOB_POLL_INTERVAL", default=1.0)
+SCRAPE_JOB_TIMEOUT = env.int("SCRAPE_JOB_TIMEOUT", default=5 * 60)
+SCRAPE_JOB_MAX_ATTEMPTS = env.int("SCRAPE_JOB_MAX_ATTEMPTS", default=3)
+SCRAPE_JOB_RETENTION = env.int("SCRAPE_JOB_RETENTION", default=24 * 60 * 60)
+
+# Seconds before the in-memory ingredient matcher is rebuilt to pick up changes from other workers.
+INGREDIENT_INDEX_TTL = env.int("INGREDIENT_INDEX_TTL", default=300)
+# Same for the pantry index behind "What can I cook?".
+PANTRY_INDEX_TTL = env.int("PANTRY_INDEX_TTL", default=300)
+
+# Ingredient autocomplete
+# Cached results are keyed by the catalog version, which moves when a managed ingredient changes.
+# Without REDIS_URL the version lives in each process's own cache, so other worker
+# processes keep serving their cached results for up to AUTOCOMPLETE_CACHE_TIMEOUT seconds.
+AUTOCOMPLETE_MIN_LENGTH = env.int("AUTOCOMPLETE_MIN_LENGTH", default=2)
+AUTOCOMPLETE_LIMIT = env.int("AUTOCOMPLETE_LIMIT", default=10)
+AUTOCOMPLETE_CACHE_TIMEOUT = env.int("AUTOCOMPLETE_CACHE_TIMEOUT", default=300)
+AUTOCOMPLETE_BROWSER_MAX_AGE = env.int("AUTOCOMPLETE_BROWSER_MAX_AGE", default=60)
+
+# Recipes per page on the recipe list, more are loaded while scrolling.
+RECIPE_PAGE_SIZE = env.int("RECIPE_PAGE_SIZE", default=24)
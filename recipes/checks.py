@@ -0,0 +1,61 @@
+import re
+
+from django.core import checks
+from django.db import DatabaseError, connections, transaction
+
+# How a plan reads a whole table instead of going through an index.
+FULL_SCAN_PATTERNS = {
+    'postgresql': r'Seq Scan on {table}\b',
+    'sqlite': r'\bSCAN {table}\b',
+}
+
+
+def hot_queries():
+    """
+    (label, queryset) of the lookups scrapes, imports and recipe pages make all the time.
+    """
+    from recipes.models import Ingredient, Recipe, ScrapedPage, ScrapeJob
+    from recipes.views.ingridientHandler import managed_ingredients_named
+
+    return [
+        ('managed ingredients by name in any case', managed_ingredients_named(['gul lök']).values_list('id', 'name')),
+        ('ingredients of recipes', Ingredient.objects.filter(recipe_id__in=[1, 2]).values_list('recipe_id', 'name_id')),
+        ('recipes using a managed ingredient', Ingredient.objects.filter(name_id=1).values_list('recipe_id', flat=True)),
+        ('recipe by source url', Recipe.objects.filter(source_url='https://www.ica.se/recept/').values_list('id')),
+        ('cached scrape by key', ScrapedPage.objects.filter(key='0' * 64).values_list('data')),
+        ('oldest pending scrape job', ScrapeJob.objects.filter(status='pending').order_by('created_at', 'id').values_list('id')[:1]),
+    ]
+
+def query_plan(queryset, using):
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            # A small table is read whole even with an index, this only leaves a seq scan when there is no index.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.using(using).explain()
+
+@checks.register(checks.Tags.database)
+def check_query_plans(databases=None, **kwargs):
+    """
+    Warns about hot queries that read a whole table. Runs with the test suite and with
+    `manage.py check --database default`, add `--fail-level WARNING` to fail on it.
+    """
+    warnings = []
+    for using in databases or []:
+        vendor = connections[using].vendor
+        if vendor not in FULL_SCAN_PATTERNS:
+            continue
+        for label, queryset in hot_queries():
+            try:
+                plan = query_plan(queryset, using)
+            except DatabaseError:
+                # Tables missing before the first migrate.
+                return warnings
+            if re.search(FULL_SCAN_PATTERNS[vendor].format(table=queryset.model._meta.db_table), plan):
+                warnings.append(checks.Warning(
+                    f'The query for {label} reads the whole {queryset.model._meta.db_table} table on {using}.',
+                    hint=f'Run migrate to add the missing index. Query plan:\n{plan}',
+                    id='recipes.W001',
+                ))
+    return warnings
@@ -1,5 +1,7 @@
 from django import forms
-from django.forms import inlineformset_factory
+from django.core.exceptions import ValidationError
+from django.forms import BaseInlineFormSet, inlineformset_factory
+from django.utils.functional import cached_property
 from .models import Recipe, Ingredient, ManagedIngredient
 
 class RecipeForm(forms.ModelForm):
@@ -7,15 +9,91 @@ class RecipeForm(forms.ModelForm):
         model = Recipe
         fields = ['title', 'description', 'servings']
 
+class IngredientPicker(forms.Widget):
+    """
+    The id of a managed ingredient in a hidden input, next to a text input for its name that
+    the ingredient autocomplete fills in (static/js/add_recipe.js). Renders without the catalog,
+    the name is looked up in `ingredients`, {id: ManagedIngredient}.
+    """
+    template_name = 'recipes/widgets/ingredient_picker.html'
+
+    def __init__(self, attrs=None):
+        super().__init__(attrs)
+        self.ingredients = {}
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        value = str(value or '')
+        ingredient = self.ingredients.get(int(value)) if value.isdigit() else None
+        context['widget']['label'] = ingredient.name if ingredient else ''
+        return context
+
+class ManagedIngredientField(forms.ModelChoiceField):
+    """
+    A managed ingredient picked by id. Ids are looked up in `ingredients` when it is set,
+    BaseIngredientFormSet loads them for all of its forms at once, instead of a query per form.
+    """
+    widget = IngredientPicker
+
+    def __init__(self, **kwargs):
+        super().__init__(queryset=ManagedIngredient.objects.all(), **kwargs)
+        self.ingredients = None
+
+    def to_python(self, value):
+        if self.ingredients is None or value in self.empty_values:
+            return super().to_python(value)
+        value = str(value)
+        if not value.isdigit() or int(value) not in self.ingredients:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+        return self.ingredients[int(value)]
+
 class IngredientForm(forms.ModelForm):
-    name = forms.ModelChoiceField(queryset=ManagedIngredient.objects.all().order_by('category', 'name'), label="Ingredient")
+    name = ManagedIngredientField(label="Ingredient")
 
     class Meta:
         model = Ingredient
         fields = ['name', 'quantity', 'unit']
 
-IngredientFormSet = inlineformset_factory(Recipe, Ingredient, form=IngredientForm, extra=1, can_delete=False)
-IngredientEditFormSet = inlineformset_factory(Recipe, Ingredient, form=IngredientForm, extra=1, can_delete=True)
+    def __init__(self, *args, ingredients=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['name'].ingredients = ingredients
+        if ingredients is None and self.instance.name_id:
+            ingredients = {self.instance.name_id: self.instance.name}
+        self.fields['name'].widget.ingredients = ingredients or {}
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        # The ingredient is known to exist when it was found in `ingredients`, which
+        # saves the model validation query of the foreign key for every form.
+        if self.fields['name'].ingredients is not None:
+            exclude.add('name')
+        return exclude
+
+class BaseIngredientFormSet(BaseInlineFormSet):
+    """
+    Gives every form the managed ingredients it shows or validates, loaded in one query:
+    the submitted ids of a bound formset, the recipe's ingredients with their names otherwise.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('queryset', Ingredient.objects.select_related('name'))
+        super().__init__(*args, **kwargs)
+
+    @cached_property
+    def managed_ingredients(self):
+        if not self.is_bound:
+            return {ingredient.name_id: ingredient.name for ingredient in self.get_queryset()}
+        ids = {
+            int(value) for i in range(self.total_form_count())
+            if (value := str(self.data.get(f'{self.add_prefix(i)}-name', ''))).isdigit()
+        }
+        return ManagedIngredient.objects.in_bulk(ids)
+
+    def get_form_kwargs(self, index):
+        return {**super().get_form_kwargs(index), 'ingredients': self.managed_ingredients}
+
+IngredientFormSet = inlineformset_factory(Recipe, Ingredient, form=IngredientForm, formset=BaseIngredientFormSet, extra=1, can_delete=False)
+IngredientEditFormSet = inlineformset_factory(Recipe, Ingredient, form=IngredientForm, formset=BaseIngredientFormSet, extra=1, can_delete=True)
 
 class ShoppingListForm(forms.Form):
     recipes = forms.ModelMultipleChoiceField(
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from urllib.parse import urldefrag, urlparse
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+from playwright.async_api import async_playwright
+
+from recipes.views.asyncScraper import collect_links, collect_recipe
+from recipes.views.pages import SITE_CONFIGS
+from recipes.views.recipeSources import fetch_source, recipe_hash, site_sources, update_validators, with_source
+from recipes.views.scrapeCache import canonicalize_url
+from recipes.views.scrapeScheduler import politely_async
+from recipes.views.scrapingHandler import save_scraped_recipes
+
+
+class Command(BaseCommand):
+    help = "Crawls a site from SITE_CONFIGS and imports every recipe it has not imported before."
+
+    def add_arguments(self, parser):
+        parser.add_argument("site_key", choices=sorted(SITE_CONFIGS))
+        parser.add_argument("--concurrency", type=int, default=4, help="Number of pages extracting recipes at the same time.")
+        parser.add_argument("--max-recipes", type=int, default=100, help="Stop after this many recipe links, 0 for no limit.")
+        parser.add_argument("--max-listing-pages", type=int, default=20, help="Number of non-recipe pages to search for links.")
+        parser.add_argument("--batch-size", type=int, default=50, help="Number of recipes saved per transaction.")
+        parser.add_argument("--queue-size", type=int, default=None, help="Links waiting for extraction, defaults to 4 x concurrency.")
+        parser.add_argument("--refresh", action="store_true", help="Also check recipes imported before and update the ones that changed.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        self.stats = {"found": 0, "known": 0, "extracted": 0, "failed": 0, "saved": 0, "browser": 0, "unchanged": 0, "not_modified": 0}
+        # Canonical url -> source fields of the recipes imported from this site before.
+        self.sources = site_sources(options["site_key"])
+        asyncio.run(self.crawl(SITE_CONFIGS[options["site_key"]], options))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Found {self.stats['found']} new recipe links and skipped {self.stats['known']} imported before, "
+            f"extracted {self.stats['extracted']} ({self.stats['browser']} needed a browser), "
+            f"failed {self.stats['failed']}, saved {self.stats['saved']} recipes in {elapsed:.1f}s"
+        )
+        if options["refresh"]:
+            self.stdout.write(
+                f"Checked {len(self.sources)} imported recipes: {self.stats['not_modified']} not modified, "
+                f"{self.stats['unchanged']} unchanged after extraction"
+            )
+
+    async def crawl(self, config, options):
+        concurrency = max(1, options["concurrency"])
+        links = asyncio.Queue(maxsize=options["queue_size"] or concurrency * 4)
+        self.batch = []
+
+        async with async_playwright() as p:
+            browser = await p.chromium.launch()
+            try:
+                context = await browser.new_context()
+                workers = [
+                    asyncio.create_task(self.extract(context, config, links, options["batch_size"]))
+                    for _ in range(concurrency)
+                ]
+
+                async def feed():
+                    if options["refresh"]:
+                        # Imported recipes are checked even when no listing page links to them anymore.
+                        for url in self.sources:
+                            await links.put(url)
+                    await self.discover(context, config, links, options)
+                    for _ in workers:
+                        await links.put(None)
+
+                # A failing worker aborts the crawl instead of leaving discovery blocked on a full queue.
+                await asyncio.gather(feed(), *workers)
+                await self.flush()
+            finally:
+                await browser.close()
+
+    async def discover(self, context, config, links, options):
+        """
+        Walks listing pages breadth first and streams unseen recipe links into the queue,
+        links to recipes imported before are skipped. Waits whenever the queue is full so
+        discovery never runs far ahead of extraction.
+        """
+        host = urlparse(config["start_url"]).netloc
+        page = await context.new_page()
+        frontier = [config["start_url"]]
+        queued = set(frontier)
+        seen_recipes = set()
+        max_recipes = options["max_recipes"]
+
+        visited = 0
+        while frontier and visited < options["max_listing_pages"]:
+            url = frontier.pop(0)
+            visited += 1
+            try:
+                hrefs = await politely_async(url, collect_links, page, url, config)
+            except Exception as e:
+                self.stderr.write(f"Could not read {url}: {e}")
+                continue
+
+            for href in hrefs:
+                href = urldefrag(href)[0]
+                if config["recipe_pattern"].match(href):
+                    url = canonicalize_url(href)
+                    if url in seen_recipes:
+                        continue
+                    seen_recipes.add(url)
+                    if url in self.sources:
+                        self.stats["known"] += 1
+                        continue
+                    self.stats["found"] += 1
+                    await links.put(url)
+                    if max_recipes and self.stats["found"] >= max_recipes:
+                        await page.close()
+                        return
+                elif urlparse(href).netloc == host and href not in queued:
+                    queued.add(href)
+                    frontier.append(href)
+
+        await page.close()
+
+    async def extract(self, context, config, links, batch_size):
+        page = await context.new_page()
+        while True:
+            url = await links.get()
+            if url is None:
+                break
+            source = self.sources.get(url)
+            try:
+                not_modified, recipe, validators = await politely_async(
+                    url, sync_to_async(fetch_source, thread_sensitive=False), url, config, source
+                )
+                if not_modified:
+                    self.stats["not_modified"] += 1
+                    continue
+                if recipe is None:
+                    self.stats["browser"] += 1
+                    recipe = await politely_async(url, collect_recipe, page, url, config)
+            except Exception as e:
+                self.stats["failed"] += 1
+                self.stderr.write(f"Could not scrape {url}: {e}")
+                # Start over with a clean page in case the old one crashed.
+                await page.close()
+                page = await context.new_page()
+                continue
+            self.stats["extracted"] += 1
+            if source is not None:
+                if recipe_hash(recipe) == source["source_hash"]:
+                    self.stats["unchanged"] += 1
+                    if validators and any(source[field] != value for field, value in validators.items()):
+                        await sync_to_async(update_validators)(source["id"], validators)
+                    continue
+                recipe["recipe_id"] = source["id"]
+            self.batch.append(with_source(recipe, url, validators))
+            if len(self.batch) >= batch_size:
+                await self.flush()
+        await page.close()
+
+    async def flush(self):
+        batch, self.batch = self.batch, []
+        if not batch:
+            return
+        # Saves run one at a time on Django's shared sync thread.
+        saved = await sync_to_async(save_scraped_recipes)(batch)
+        self.stats["saved"] += len(saved)
+        self.stdout.write(f"Saved {len(saved)} recipes")
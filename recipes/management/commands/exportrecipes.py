@@ -0,0 +1,27 @@
+import json
+
+from django.core.management.base import BaseCommand, OutputWrapper
+
+from recipes.views.recipeTransfer import EXPORT_CHUNK_SIZE, export_records, export_snapshot
+
+
+class Command(BaseCommand):
+    help = "Writes every managed ingredient and recipe as JSON lines, the format importrecipes reads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", default="-", help="File to write, - for standard output.")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="Rows fetched per database round trip.")
+
+    def handle(self, *args, **options):
+        to_stdout = options["output"] == "-"
+        output = self.stdout if to_stdout else OutputWrapper(open(options["output"], "w", encoding="utf-8"))
+        written = 0
+        try:
+            with export_snapshot():
+                for record in export_records(options["chunk_size"]):
+                    output.write(json.dumps(record, ensure_ascii=False))
+                    written += 1
+        finally:
+            if not to_stdout:
+                output.close()
+        self.stderr.write(f"Exported {written} records")
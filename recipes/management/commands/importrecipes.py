@@ -0,0 +1,45 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.views.recipeTransfer import RecipeImporter
+
+
+class Command(BaseCommand):
+    help = "Imports recipes and managed ingredients from JSON lines written by exportrecipes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="File to read, - for standard input.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Number of recipes saved per transaction.")
+        parser.add_argument("--max-errors", type=int, default=100, help="Give up after this many invalid records, 0 for no limit.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        importer = RecipeImporter(max(1, options["batch_size"]))
+        source = sys.stdin if options["input"] == "-" else open(options["input"], encoding="utf-8")
+        errors = 0
+        try:
+            for number, line in enumerate(source, 1):
+                if not line.strip():
+                    continue
+                try:
+                    importer.add(json.loads(line))
+                except ValueError as e:
+                    # Invalid records are skipped, the rest of the file is still imported.
+                    errors += 1
+                    self.stderr.write(f"Line {number}: {e}")
+                    if options["max_errors"] and errors >= options["max_errors"]:
+                        importer.close()
+                        raise CommandError(f"Stopped after {errors} invalid records, the records before line {number} were imported.")
+            counts = importer.close()
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        self.stdout.write(
+            f"Imported {counts['recipes']} recipes with {counts['ingredients']} ingredients and "
+            f"{counts['managed_ingredients']} new managed ingredients in {time.perf_counter() - started:.1f}s"
+            + (f", skipped {errors} invalid records" if errors else "")
+        )
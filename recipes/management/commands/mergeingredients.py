@@ -0,0 +1,45 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.views.ingredientMerge import DEFAULT_MERGE_THRESHOLD, apply_merges, merge_plan
+
+
+class Command(BaseCommand):
+    help = "Finds managed ingredients that are likely duplicates, like \"gul lök\" and \"gullök\", and merges them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threshold", type=float, default=DEFAULT_MERGE_THRESHOLD, help="Similarity (0-1) two names need to be merged.")
+        parser.add_argument("-o", "--output", help="Also write the plan as JSON to this file, to review or edit it.")
+        parser.add_argument("--plan", help="A JSON plan written with --output and reviewed, instead of finding the duplicates again.")
+        parser.add_argument("--apply", action="store_true", help="Merge the ingredients of the --plan, it is only printed otherwise.")
+
+    def handle(self, *args, **options):
+        # Similar names are not always the same ingredient, only a plan someone has reviewed is applied.
+        if options["apply"] and not options["plan"]:
+            raise CommandError("--apply needs a reviewed --plan, write one with --output first.")
+        started = time.perf_counter()
+        if options["plan"]:
+            try:
+                with open(options["plan"], encoding="utf-8") as plan_file:
+                    plan = json.load(plan_file)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read {options['plan']}: {e}")
+        else:
+            plan = merge_plan(options["threshold"])
+
+        for merge in plan:
+            keep = merge["keep"]
+            self.stdout.write(f"{keep.get('name', keep['id'])} ({keep.get('uses', '?')} uses)")
+            for duplicate in merge["merge"]:
+                self.stdout.write(f"    <- {duplicate.get('name', duplicate['id'])} ({duplicate.get('uses', '?')} uses)")
+        duplicates = sum(len(merge["merge"]) for merge in plan)
+        self.stdout.write(f"{duplicates} duplicates of {len(plan)} ingredients found in {time.perf_counter() - started:.1f}s")
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump(plan, output, ensure_ascii=False, indent=2)
+        if options["apply"]:
+            merged, recipes = apply_merges(plan)
+            self.stdout.write(f"Merged {merged} ingredients, {recipes} recipes changed")
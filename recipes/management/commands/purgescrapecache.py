@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from recipes.views.pages import SITE_CONFIGS
+from recipes.views.scrapeCache import invalidate
+
+
+class Command(BaseCommand):
+    help = "Deletes cached scrape results."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", help="Only delete the cached result for this url.")
+        parser.add_argument("--site", choices=sorted(SITE_CONFIGS), help="Only delete cached results for this site.")
+        parser.add_argument("--expired", action="store_true", help="Only delete results older than SCRAPE_CACHE_TTL.")
+
+    def handle(self, *args, **options):
+        deleted = invalidate(url=options["url"], site_key=options["site"], expired_only=options["expired"])
+        self.stdout.write(f"Deleted {deleted} cached pages")
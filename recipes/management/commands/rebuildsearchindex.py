@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.models import Recipe
+from recipes.views.recipeSearch import index_recipes
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index of every recipe."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Number of recipes indexed per transaction.")
+
+    def handle(self, *args, **options):
+        recipe_ids = list(Recipe.objects.order_by("id").values_list("id", flat=True))
+        for start in range(0, len(recipe_ids), options["batch_size"]):
+            with transaction.atomic():
+                index_recipes(recipe_ids[start:start + options["batch_size"]])
+        self.stdout.write(f"Indexed {len(recipe_ids)} recipes")
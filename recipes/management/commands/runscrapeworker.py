@@ -0,0 +1,69 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from recipes.views.newScraper import find_recipe
+from recipes.views.scrapeJobs import claim_job, fail_job, finish_job, purge_finished_jobs, requeue_stale_jobs
+from recipes.views.scrapeScheduler import queue_stats
+from recipes.views.scrapingHandler import scrape_payload
+
+# Seconds between looking for stale jobs and purging old ones.
+MAINTENANCE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = "Processes queued scrape jobs so scraping never blocks a web worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=1, help="Number of jobs scraped at the same time.")
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty instead of waiting for jobs.")
+
+    def handle(self, *args, **options):
+        self.once = options["once"]
+        self.stopping = threading.Event()
+        threads = [threading.Thread(target=self.work, daemon=True) for _ in range(max(1, options["concurrency"]))]
+        for thread in threads:
+            thread.start()
+
+        self.stdout.write(f"Scrape worker started with {len(threads)} threads")
+        try:
+            while any(thread.is_alive() for thread in threads):
+                close_old_connections()
+                requeued = requeue_stale_jobs()
+                if requeued:
+                    self.stderr.write(f"Requeued {requeued} stale jobs")
+                purge_finished_jobs()
+                for site, stats in queue_stats().items():
+                    if stats["waiting"] or stats["in_flight"] or stats["paused_for"]:
+                        self.stdout.write(f"{site}: {stats['waiting']} waiting, {stats['in_flight']} in flight, paused for {stats['paused_for']}s")
+                close_old_connections()
+                for thread in threads:
+                    thread.join(MAINTENANCE_INTERVAL / len(threads))
+        except KeyboardInterrupt:
+            self.stopping.set()
+            for thread in threads:
+                thread.join()
+
+    def work(self):
+        while not self.stopping.is_set():
+            close_old_connections()
+            job = claim_job()
+            if job is None:
+                if self.once:
+                    break
+                self.stopping.wait(settings.SCRAPE_JOB_POLL_INTERVAL)
+                continue
+
+            started = time.perf_counter()
+            try:
+                result = scrape_payload(find_recipe(job.url, job.site_key))
+            except Exception as e:
+                fail_job(job, str(e))
+                self.stderr.write(f"Could not scrape {job.url} (attempt {job.attempts}): {e}")
+                continue
+            finish_job(job, result)
+            self.stdout.write(f"Scraped {job.url} in {time.perf_counter() - started:.1f}s ({result['tier']})")
+        connections.close_all()
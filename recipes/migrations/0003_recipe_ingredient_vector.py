@@ -0,0 +1,55 @@
+# Generated by Django 5.1.6 on 2026-10-18 10:40
+
+import struct
+from collections import defaultdict
+
+from django.db import migrations, models
+
+# Frozen copy of recipes.views.ingredientVectors as of this migration, so it keeps working
+# when that module changes. Entries are (ingredient id, unit code, quantity per serving).
+CANONICAL_UNITS = {
+    'g': ('g', 1), 'kg': ('g', 1000),
+    'ml': ('ml', 1), 'cl': ('ml', 10), 'dl': ('ml', 100), 'liter': ('ml', 1000),
+    'krm': ('ml', 1), 'tsk': ('ml', 5), 'msk': ('ml', 15),
+    'st': ('st', 1), 'nypa': ('nypa', 1), 'klyfta': ('klyfta', 1),
+}
+UNIT_CODES = {unit: code for code, unit in enumerate(['g', 'ml', 'st', 'nypa', 'klyfta'])}
+VECTOR_ENTRY = struct.Struct('<qBd')
+
+
+def pack_vector(rows, servings):
+    if not servings or servings <= 0:
+        return b''
+    totals = defaultdict(float)
+    for ingredient_id, unit, quantity in rows:
+        canonical, factor = CANONICAL_UNITS.get(unit, ('st', 1))
+        totals[ingredient_id, UNIT_CODES[canonical]] += (quantity or 0) * factor / servings
+    return b''.join(VECTOR_ENTRY.pack(ingredient_id, code, quantity) for (ingredient_id, code), quantity in totals.items())
+
+
+def build_vectors(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    recipes = list(Recipe.objects.only('id', 'servings'))
+    rows = {}
+    for recipe_id, *row in Ingredient.objects.values_list('recipe_id', 'name_id', 'unit', 'quantity'):
+        rows.setdefault(recipe_id, []).append(row)
+    for recipe in recipes:
+        recipe.ingredient_vector = pack_vector(rows.get(recipe.id, []), recipe.servings)
+    Recipe.objects.bulk_update(recipes, ['ingredient_vector'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_scrapedpage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredient_vector',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(build_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.6 on 2026-10-18 10:52
+
+from django.db import migrations
+
+SQLITE_SQL = """
+CREATE VIRTUAL TABLE recipes_recipesearch USING fts5(title, description, ingredients, prefix='2 3');
+"""
+# No foreign key to recipes_recipe: Django does not know this table, so the TRUNCATE of
+# flush and TransactionTestCase would refuse to empty recipes_recipe. Deleted recipes are
+# removed from the index by recipes_changed, see recipes/signals.py.
+POSTGRESQL_SQL = """
+CREATE TABLE recipes_recipesearch (
+    recipe_id bigint PRIMARY KEY,
+    document tsvector NOT NULL
+);
+CREATE INDEX recipes_recipesearch_document ON recipes_recipesearch USING GIN (document);
+"""
+# Frozen copies of the inserts in recipes.views.recipeSearch.store_documents.
+SQLITE_INSERT = 'INSERT INTO recipes_recipesearch (rowid, title, description, ingredients) VALUES (%s, %s, %s, %s)'
+POSTGRESQL_INSERT = """
+INSERT INTO recipes_recipesearch (recipe_id, document) VALUES (%s,
+    setweight(to_tsvector('swedish', %s), 'A') ||
+    setweight(to_tsvector('swedish', %s), 'C') ||
+    setweight(to_tsvector('swedish', %s), 'B'))
+"""
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        schema_editor.execute(SQLITE_SQL)
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRESQL_SQL)
+    else:
+        return
+
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    ingredients = {}
+    for recipe_id, name, denonyms in Ingredient.objects.values_list('recipe_id', 'name__name', 'name__common_denonyms'):
+        ingredients.setdefault(recipe_id, []).extend([name, *(str(denonym) for denonym in denonyms or [])])
+    documents = [
+        (recipe_id, title, description, ' '.join(ingredients.get(recipe_id, [])))
+        for recipe_id, title, description in Recipe.objects.values_list('id', 'title', 'description')
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(SQLITE_INSERT if connection.vendor == 'sqlite' else POSTGRESQL_INSERT, documents)
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute('DROP TABLE recipes_recipesearch')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_recipe_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
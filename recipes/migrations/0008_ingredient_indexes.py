@@ -0,0 +1,37 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:29
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_source'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ingredient',
+            name='name',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='ingredients', to='recipes.managedingredient'),
+        ),
+        migrations.AlterField(
+            model_name='ingredient',
+            name='recipe',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='recipes.recipe'),
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['recipe', 'name'], name='recipes_ing_recipe__ab3d46_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['name', 'recipe'], name='recipes_ing_name_id_2edd56_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='managedingredient',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='managedingredient_lower_name'),
+        ),
+    ]
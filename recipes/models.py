@@ -1,9 +1,20 @@
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 class Recipe(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     servings = models.IntegerField()
+    # Per-serving (managed ingredient, canonical unit, quantity) entries, see views/ingredientVectors.py
+    ingredient_vector = models.BinaryField(default=b'', editable=False)
+    # Moved forward whenever the recipe, its ingredients or their names change, see views/recipeChanges.py
+    updated_at = models.DateTimeField(default=timezone.now, editable=False)
+    # Canonical url of the crawled page and what it looked like, see views/recipeSources.py
+    source_url = models.URLField(max_length=2000, blank=True, db_index=True, editable=False)
+    source_hash = models.CharField(max_length=64, blank=True, editable=False)
+    source_etag = models.CharField(max_length=200, blank=True, editable=False)
+    source_last_modified = models.CharField(max_length=100, blank=True, editable=False)
 
     def __str__(self):
         return self.title
@@ -15,6 +26,9 @@ class ManagedIngredient(models.Model):
     category = models.CharField(max_length=100, blank=True)
     notes = models.TextField(blank=True)
 
+    class Meta:
+        # Case-insensitive name lookups, see managed_ingredients_named in views/ingridientHandler.py
+        indexes = [models.Index(Lower('name'), name='managedingredient_lower_name')]
 
     def __str__(self):
         return self.name
@@ -34,10 +48,55 @@ class Ingredient(models.Model):
         ('nypa', 'nypa'),
         ('klyfta', 'klyfta'),
     ]
-    name = models.ForeignKey(ManagedIngredient, on_delete=models.PROTECT, related_name='ingredients')
+    # Indexed together with the recipe, see Meta.
+    name = models.ForeignKey(ManagedIngredient, on_delete=models.PROTECT, related_name='ingredients', db_index=False)
     quantity = models.FloatField()
     unit = models.CharField(max_length=50, choices=UNIT_CHOICES)
-    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE)
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, db_index=False)
+
+    class Meta:
+        # The ingredients of some recipes and the recipes using some ingredients,
+        # both answered from the index alone.
+        indexes = [models.Index(fields=['recipe', 'name']), models.Index(fields=['name', 'recipe'])]
+
+    def __str__(self):
+        return self.name.name
+
+class ScrapedPage(models.Model):
+    """
+    A cached scrape result, keyed by the canonical url and the site config used to scrape it.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    url = models.URLField(max_length=2000, db_index=True)
+    site_key = models.CharField(max_length=100)
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.url
+
+class ScrapeJob(models.Model):
+    """
+    A scrape waiting for or handled by the runscrapeworker command, polled by the add recipe page.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'pending'),
+        ('running', 'running'),
+        ('done', 'done'),
+        ('failed', 'failed'),
+    ]
+    url = models.URLField(max_length=2000)
+    site_key = models.CharField(max_length=100)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
 
     def __str__(self):
-        return self.name.name
\ No newline at end of file
+        return f"{self.url} ({self.status})"
@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recipes.models import Ingredient, ManagedIngredient, Recipe
+from recipes.views.ingredientIndex import index_managed_ingredient, unindex_managed_ingredient
+from recipes.views.ingridientHandler import bump_catalog_version
+from recipes.views.fragmentCache import invalidate_fragments
+from recipes.views.recipeChanges import recipes_changed
+
+
+@receiver(post_save, sender=ManagedIngredient)
+def managed_ingredient_saved(sender, instance, created, **kwargs):
+    index_managed_ingredient(instance)
+    # Autocomplete results cached before the commit would otherwise be stored under the new version.
+    transaction.on_commit(bump_catalog_version)
+    if not created:
+        # Recipes show the ingredient's name, a rename changes all of them.
+        recipes_changed(instance.ingredients.values_list('recipe_id', flat=True).distinct())
+
+@receiver(post_delete, sender=ManagedIngredient)
+def managed_ingredient_deleted(sender, instance, **kwargs):
+    unindex_managed_ingredient(instance.id)
+    transaction.on_commit(bump_catalog_version)
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, **kwargs):
+    recipes_changed([instance.id])
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    invalidate_fragments([(instance.id, instance.updated_at)])
+    # Drops the recipe from the search index.
+    recipes_changed([instance.id])
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, instance, **kwargs):
+    recipes_changed([instance.recipe_id])
@@ -0,0 +1,18 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from recipes.checks import check_query_plans
+from recipes.models import Recipe
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_an_index(self):
+        self.assertEqual(check_query_plans(databases=['default']), [])
+
+    def test_full_scan_is_reported(self):
+        unindexed = [('recipes by title', Recipe.objects.filter(title='Pannkakor').values_list('id'))]
+        with mock.patch('recipes.checks.hot_queries', return_value=unindexed):
+            warnings = check_query_plans(databases=['default'])
+        self.assertEqual([warning.id for warning in warnings], ['recipes.W001'])
+        self.assertIn('recipes by title', warnings[0].msg)
@@ -0,0 +1,70 @@
+from django.test import TestCase
+
+from recipes.forms import IngredientEditFormSet, IngredientFormSet
+from recipes.models import Ingredient, ManagedIngredient, Recipe
+
+
+def formset_data(*rows, initial=0):
+    data = {
+        "ingredient_set-TOTAL_FORMS": str(len(rows)),
+        "ingredient_set-INITIAL_FORMS": str(initial),
+    }
+    for i, row in enumerate(rows):
+        data.update({f"ingredient_set-{i}-{field}": value for field, value in row.items()})
+    return data
+
+
+class IngredientFormSetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.flour = ManagedIngredient.objects.create(name="Vetemjöl")
+        cls.milk = ManagedIngredient.objects.create(name="Mjölk")
+        cls.recipe = Recipe.objects.create(title="Pannkakor", description="", servings=4)
+
+    def test_submitted_ids_are_loaded_in_one_query(self):
+        formset = IngredientFormSet(formset_data(
+            {"name": self.flour.id, "quantity": "2.5", "unit": "dl"},
+            {"name": self.milk.id, "quantity": "6", "unit": "dl"},
+            {"name": self.flour.id, "quantity": "1", "unit": "msk"},
+        ), instance=self.recipe)
+        with self.assertNumQueries(1):
+            self.assertTrue(formset.is_valid(), formset.errors)
+        self.assertEqual([form.cleaned_data["name"] for form in formset.forms], [self.flour, self.milk, self.flour])
+
+    def test_unknown_ids_are_invalid(self):
+        formset = IngredientFormSet(formset_data(
+            {"name": self.flour.id + self.milk.id + 100, "quantity": "1", "unit": "st"},
+            {"name": "Vetemjöl", "quantity": "1", "unit": "st"},
+        ), instance=self.recipe)
+        self.assertFalse(formset.is_valid())
+        self.assertEqual([form.errors["name"][0].startswith("Select a valid choice") for form in formset.forms], [True, True])
+
+    def test_empty_extra_form_is_skipped(self):
+        formset = IngredientFormSet(formset_data(
+            {"name": self.flour.id, "quantity": "2", "unit": "dl"},
+            {"name": "", "quantity": "", "unit": ""},
+        ), instance=self.recipe)
+        self.assertTrue(formset.is_valid(), formset.errors)
+        formset.save()
+        self.assertEqual(list(self.recipe.ingredient_set.values_list("name_id", flat=True)), [self.flour.id])
+
+    def test_edit_formset_renders_names_without_a_query_per_row(self):
+        for ingredient in [self.flour, self.milk, self.flour]:
+            Ingredient.objects.create(recipe=self.recipe, name=ingredient, quantity=1, unit="dl")
+        formset = IngredientEditFormSet(instance=self.recipe)
+        with self.assertNumQueries(1):
+            html = str(formset)
+        self.assertEqual(html.count('value="Vetemjöl"'), 2)
+        self.assertEqual(html.count('value="Mjölk"'), 1)
+
+    def test_delete_saved_ingredient(self):
+        kept = Ingredient.objects.create(recipe=self.recipe, name=self.flour, quantity=1, unit="dl")
+        removed = Ingredient.objects.create(recipe=self.recipe, name=self.milk, quantity=1, unit="dl")
+        formset = IngredientEditFormSet(formset_data(
+            {"id": kept.id, "name": self.flour.id, "quantity": "2", "unit": "dl"},
+            {"id": removed.id, "name": self.milk.id, "quantity": "1", "unit": "dl", "DELETE": "on"},
+            initial=2,
+        ), instance=self.recipe)
+        self.assertTrue(formset.is_valid(), formset.errors)
+        formset.save()
+        self.assertEqual(list(self.recipe.ingredient_set.values_list("id", "quantity")), [(kept.id, 2.0)])
@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from recipes.models import Ingredient, ManagedIngredient, Recipe
+from recipes.views.ingredientMerge import apply_merges, duplicate_clusters, edited_at_end, merge_key, merge_plan
+
+
+class DuplicateClusterTests(SimpleTestCase):
+    def clusters(self, *names):
+        rows = list(enumerate(names))
+        return sorted(sorted(names[i] for i in cluster) for cluster in duplicate_clusters(rows))
+
+    def test_merge_key(self):
+        self.assertEqual({merge_key(name) for name in ["Gul lök", "gullök", "lök, gul", "Gul-lök"]}, {"gullök"})
+
+    def test_same_spelling_and_word_order(self):
+        self.assertEqual(
+            self.clusters("Gul lök", "gullök", "lök, gul", "Rödlök", "Tomater, krossade", "krossade tomater"),
+            [["Gul lök", "gullök", "lök, gul"], ["Tomater, krossade", "krossade tomater"]],
+        )
+
+    def test_typos_in_long_names(self):
+        self.assertEqual(
+            self.clusters("Vitlöksklyfta", "Vitlöksklyfa", "Vitlköksklyfta", "Potatis", "Ptatis"),
+            [["Vitlköksklyfta", "Vitlöksklyfa", "Vitlöksklyfta"]],
+        )
+
+    def test_names_differing_at_the_end_stay_apart(self):
+        self.assertEqual(self.clusters(
+            "Kokosmjölk", "Kokosmjöl", "Havremjölk", "Havremjöl", "Rismjöl", "Rismjölk",
+            "Mandelmjölk", "Mandelmjöl", "Sojamjölk", "Sojamjöl",
+        ), [])
+
+    def test_edited_at_end(self):
+        self.assertTrue(edited_at_end("kokosmjölk", "kokosmjöl"))
+        self.assertTrue(edited_at_end("sojamjöla", "sojamjölk"))
+        self.assertFalse(edited_at_end("vitlöksklyfta", "vitlöksklyfa"))
+
+
+class MergeIngredientsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.onion = ManagedIngredient.objects.create(name="Gul lök", common_denonyms=["lök"])
+        cls.duplicate = ManagedIngredient.objects.create(name="gullök", category="Grönsaker")
+        cls.recipe = Recipe.objects.create(title="Löksoppa", description="", servings=4)
+        Ingredient.objects.create(recipe=cls.recipe, name=cls.duplicate, quantity=4, unit="st")
+        Ingredient.objects.create(recipe=cls.recipe, name=cls.duplicate, quantity=1, unit="st")
+        Ingredient.objects.create(recipe=cls.recipe, name=cls.onion, quantity=1, unit="st")
+
+    def test_plan_keeps_the_most_used(self):
+        self.assertEqual(merge_plan(), [{
+            "keep": {"id": self.duplicate.id, "name": "gullök", "uses": 2},
+            "merge": [{"id": self.onion.id, "name": "Gul lök", "uses": 1}],
+        }])
+
+    def test_apply(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(apply_merges(merge_plan()), (1, 1))
+        self.assertFalse(ManagedIngredient.objects.filter(id=self.onion.id).exists())
+        kept = ManagedIngredient.objects.get(id=self.duplicate.id)
+        self.assertEqual((kept.common_denonyms, kept.category), (["Gul lök", "lök"], "Grönsaker"))
+        self.assertEqual(set(self.recipe.ingredient_set.values_list("name_id", flat=True)), {self.duplicate.id})
+
+    def test_command_only_applies_a_reviewed_plan(self):
+        with self.assertRaises(CommandError):
+            call_command("mergeingredients", "--apply", stdout=StringIO())
+
+        with tempfile.TemporaryDirectory() as directory:
+            plan = os.path.join(directory, "plan.json")
+            call_command("mergeingredients", "--output", plan, stdout=StringIO())
+            self.assertTrue(ManagedIngredient.objects.filter(id=self.onion.id).exists())
+            with open(plan, encoding="utf-8") as plan_file:
+                self.assertEqual(json.load(plan_file), merge_plan())
+
+            output = StringIO()
+            call_command("mergeingredients", "--plan", plan, "--apply", stdout=output)
+        self.assertIn("Merged 1 ingredients, 1 recipes changed", output.getvalue())
+        self.assertFalse(ManagedIngredient.objects.filter(id=self.onion.id).exists())
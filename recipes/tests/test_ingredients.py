@@ -0,0 +1,114 @@
+import random
+from difflib import SequenceMatcher, get_close_matches
+
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase
+
+from benchmarks.fuzzy_matcher import catalog, misspell
+from recipes.models import ManagedIngredient
+from recipes.views.ingredientIndex import IngredientIndex, get_ingredient_index
+from recipes.views.ingridientHandler import catalog_version, rank_ingredients, resolve_ingredients
+
+
+class IngredientIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = IngredientIndex()
+        self.index.build([
+            (1, "Gul lök", ["lök", "gullök"]),
+            (2, "Vetemjöl", ["mjöl"]),
+            (3, "Mjölk", []),
+        ])
+
+    def test_exact_name_and_denonym(self):
+        self.assertEqual(self.index.best_match("GUL LÖK"), (1, "Gul lök"))
+        self.assertEqual(self.index.best_match("gullök"), (1, "Gul lök"))
+
+    def test_close_match(self):
+        self.assertEqual(self.index.best_match("vetemjl"), (2, "Vetemjöl"))
+
+    def test_nothing_above_cutoff(self):
+        self.assertIsNone(self.index.best_match("köttfärs"))
+
+    def test_real_name_wins_over_denonym(self):
+        self.index.add(4, "Lök", [])
+        self.assertEqual(self.index.best_match("lök"), (4, "Lök"))
+
+    def test_remove(self):
+        self.index.remove(2)
+        self.assertIsNone(self.index.best_match("vetemjöl"))
+        self.assertEqual(self.index.best_match("mjöl"), (3, "Mjölk"))
+
+    def test_as_close_as_difflib(self):
+        names = catalog(2000)
+        index = IngredientIndex()
+        index.build((i, name, []) for i, name in enumerate(names))
+        rng = random.Random(42)
+        for _ in range(100):
+            query = misspell(rng.choice(names), rng).strip()
+            expected = get_close_matches(query, names, n=1, cutoff=0.8)
+            found = index.best_match(query)
+            self.assertEqual(found is None, not expected, query)
+            if expected:
+                self.assertGreaterEqual(
+                    SequenceMatcher(None, found[1], query).ratio(), SequenceMatcher(None, expected[0], query).ratio(), query
+                )
+
+    def test_containing_only_looks_at_denonyms(self):
+        self.assertEqual(self.index.containing("ull", 10), [1])
+        self.assertEqual(self.index.containing("mjölk", 10), [])
+
+
+class IngredientLookupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.onion = ManagedIngredient.objects.create(name="Gul lök", common_denonyms=["gullök"])
+        cls.red_onion = ManagedIngredient.objects.create(name="Rödlök")
+        cls.leek = ManagedIngredient.objects.create(name="Purjolök")
+        cls.flour = ManagedIngredient.objects.create(name="Vetemjöl", common_denonyms=["mjöl"])
+
+    def setUp(self):
+        # The index is shared by the process, other tests may have left their ingredients in it.
+        get_ingredient_index().build(ManagedIngredient.objects.values_list("id", "name", "common_denonyms"))
+
+    def test_resolve_keeps_input_order(self):
+        resolved = resolve_ingredients(["vetemjöl", "GUL LÖK", "gul lök"])
+        self.assertEqual([r["id"] for r in resolved], [self.flour.id, self.onion.id, self.onion.id])
+        self.assertEqual({r["action"] for r in resolved}, {"match"})
+
+    def test_resolve_fuzzy_and_create(self):
+        match, create = resolve_ingredients(["vetemjl", "saffran"])
+        self.assertEqual((match["id"], match["name"], match["action"]), (self.flour.id, "Vetemjöl", "match"))
+        self.assertEqual(create, {"id": None, "name": "saffran", "action": "create"})
+
+    def test_resolve_matches_denonyms(self):
+        self.assertEqual(resolve_ingredients(["gullök"])[0]["id"], self.onion.id)
+
+    def test_rank_prefix_then_word_then_contains(self):
+        names = [r["name"] for r in rank_ingredients("lök", 10)]
+        self.assertEqual(names, ["Gul lök", "Rödlök", "Purjolök"])
+
+    def test_rank_denonyms_last(self):
+        self.assertEqual([r["name"] for r in rank_ingredients("mjöl", 10)], ["Vetemjöl"])
+        self.assertEqual([r["name"] for r in rank_ingredients("llök", 10)], ["Gul lök"])
+
+    def test_rank_limit(self):
+        self.assertEqual(len(rank_ingredients("lök", 2)), 2)
+
+
+class CatalogVersionTests(TestCase):
+    def test_moves_on_commit_only(self):
+        version = catalog_version()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            ManagedIngredient.objects.create(name="Saffran")
+            self.assertEqual(catalog_version(), version)
+            raise RuntimeError
+        self.assertEqual(catalog_version(), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            saffron = ManagedIngredient.objects.create(name="Saffran")
+        self.assertNotEqual(catalog_version(), version)
+
+        version = catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            saffron.delete()
+        self.assertNotEqual(catalog_version(), version)
@@ -0,0 +1,79 @@
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from recipes.models import Ingredient, ManagedIngredient, Recipe
+from recipes.views.pantryHandler import cookable_recipes
+from recipes.views.pantryIndex import PantryIndex, get_pantry_index
+
+
+class PantryIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = PantryIndex()
+        self.index.build([
+            (1, 10), (1, 11),           # needs 10 and 11
+            (2, 10), (2, 11), (2, 12),  # one more than recipe 1
+            (3, 10),                    # only 10
+            (4, 13),                    # nothing in common
+        ])
+
+    def test_ranking(self):
+        self.assertEqual(self.index.match([10, 11], 10), [
+            (1, [], 2),
+            (3, [], 1),
+            (2, [12], 3),
+        ])
+
+    def test_limit(self):
+        self.assertEqual([recipe_id for recipe_id, _, _ in self.index.match([10, 11], 2)], [1, 3])
+
+    def test_no_shared_ingredient(self):
+        self.assertEqual(self.index.match([99], 10), [])
+
+    def test_update_and_remove(self):
+        self.index.update({3: {10, 12}, 1: set(), 5: {11}})
+        self.assertEqual(self.index.match([10, 11], 10), [
+            (5, [], 1),
+            (2, [12], 3),
+            (3, [12], 2),
+        ])
+
+
+class PantryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.egg = ManagedIngredient.objects.create(name="Ägg")
+        cls.milk = ManagedIngredient.objects.create(name="Mjölk")
+        cls.flour = ManagedIngredient.objects.create(name="Vetemjöl")
+        cls.omelette = Recipe.objects.create(title="Omelett", description="", servings=1)
+        cls.pancakes = Recipe.objects.create(title="Pannkakor", description="", servings=4)
+        Ingredient.objects.bulk_create([
+            Ingredient(recipe=cls.omelette, name=cls.egg, quantity=2, unit="st"),
+            Ingredient(recipe=cls.omelette, name=cls.milk, quantity=1, unit="msk"),
+            Ingredient(recipe=cls.pancakes, name=cls.egg, quantity=3, unit="st"),
+            Ingredient(recipe=cls.pancakes, name=cls.milk, quantity=6, unit="dl"),
+            Ingredient(recipe=cls.pancakes, name=cls.flour, quantity=2.5, unit="dl"),
+        ])
+
+    def setUp(self):
+        # The index is shared by the process, other tests may have left their recipes in it.
+        get_pantry_index().build(Ingredient.objects.values_list("recipe_id", "name_id"))
+
+    def test_cookable_recipes(self):
+        results = cookable_recipes([self.egg.id, self.milk.id])
+        self.assertEqual(
+            [(r["title"], r["missing"], r["total"]) for r in results],
+            [("Omelett", [], 2), ("Pannkakor", ["Vetemjöl"], 3)],
+        )
+
+    def test_api(self):
+        response = self.client.get(reverse("pantry_api"), {"ingredients": f"{self.flour.id}", "limit": "1"})
+        self.assertEqual(response.json(), {"recipes": [
+            {"id": self.pancakes.id, "title": "Pannkakor", "servings": 4, "missing": ["Ägg", "Mjölk"], "total": 3},
+        ]})
+        self.assertEqual(self.client.get(reverse("pantry_api")).status_code, 400)
+
+    def test_page_matches_names(self):
+        response = self.client.get(reverse("what_can_i_cook"), {"have": "ägg, mjölk\nsaffran"})
+        self.assertEqual(response.context["matched"], ["Mjölk", "Ägg"])
+        self.assertEqual(response.context["unknown"], ["saffran"])
+        self.assertEqual([card["title"] for card, _ in response.context["cards"]], ["Omelett", "Pannkakor"])
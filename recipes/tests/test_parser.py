@@ -0,0 +1,57 @@
+from django.test import SimpleTestCase
+
+from recipes.models import Ingredient
+from recipes.views.parser import UNIT_ALIASES, parse_ingredient, parse_ingredients
+
+
+class ParseIngredientTests(SimpleTestCase):
+    def assertParses(self, line, *expected):
+        self.assertEqual(
+            [(ing["amount"], ing["unit"], ing["item"]) for ing in parse_ingredient(line)],
+            list(expected),
+        )
+
+    def test_amount_unit_and_item(self):
+        self.assertParses("2 dl grädde", (2.0, "dl", "grädde"))
+
+    def test_fractions(self):
+        self.assertParses("ca 1 1/2 msk socker", (1.5, "msk", "socker"))
+        self.assertParses("½ tsk salt", (0.5, "tsk", "salt"))
+        self.assertParses("1,5 liter mjölk", (1.5, "liter", "mjölk"))
+
+    def test_range_keeps_the_larger_amount(self):
+        self.assertParses("2-3 st. gula lökar", (3.0, "st", "gula lökar"))
+
+    def test_unit_aliases(self):
+        self.assertParses("3 matskedar smör", (3.0, "msk", "smör"))
+        self.assertParses("2 teskedar honung", (2.0, "tsk", "honung"))
+        self.assertParses("500 gram köttfärs", (500.0, "g", "köttfärs"))
+
+    def test_aliases_map_onto_unit_choices(self):
+        self.assertLessEqual(set(UNIT_ALIASES.values()), {unit for unit, _ in Ingredient.UNIT_CHOICES})
+
+    def test_word_after_amount_that_is_no_unit_stays_in_the_item(self):
+        self.assertParses("1 gul lök", (1.0, "", "gul lök"))
+
+    def test_unit_without_item_is_the_item(self):
+        self.assertParses("1 kg", (1.0, "", "kg"))
+
+    def test_no_amount(self):
+        self.assertParses("några droppar citron", (None, "", "några droppar citron"))
+
+    def test_parentheses_are_left_out(self):
+        self.assertParses("400 g krossade tomater (1 burk)", (400.0, "g", "krossade tomater"))
+
+    def test_eller_keeps_the_first_option(self):
+        self.assertParses("3 msk smör eller margarin", (3.0, "msk", "smör"))
+
+    def test_och_splits_into_two_ingredients(self):
+        self.assertParses("1 st lök och vitlök", (1.0, "st", "lök"), (1.0, "st", "vitlök"))
+
+    def test_cached_results_are_not_shared(self):
+        parse_ingredient("2 dl grädde")[0]["item"] = "mjölk"
+        self.assertParses("2 dl grädde", (2.0, "dl", "grädde"))
+
+    def test_parse_ingredients_keeps_the_order(self):
+        lines = ["1 dl mjölk", "2 ägg"]
+        self.assertEqual(parse_ingredients(lines), [parse_ingredient(line) for line in lines])
@@ -0,0 +1,73 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes.models import Recipe
+from recipes.views.recipeHandler import recipe_page
+
+
+class RecipePageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recipes = [
+            Recipe.objects.create(title=f"Recept {i}", description="Lång beskrivning " * 20, servings=4) for i in range(5)
+        ]
+
+    def test_pages_follow_the_cursor(self):
+        ids = []
+        cursor = None
+        while True:
+            cards, cursor = recipe_page(cursor, limit=2)
+            ids.extend(card["id"] for card in cards)
+            if cursor is None:
+                break
+            self.assertEqual(cursor, cards[-1]["id"])
+        self.assertEqual(ids, [recipe.id for recipe in self.recipes])
+
+    def test_last_full_page_has_no_cursor(self):
+        cards, cursor = recipe_page(self.recipes[2].id, limit=2)
+        self.assertEqual([card["id"] for card in cards], [self.recipes[3].id, self.recipes[4].id])
+        self.assertIsNone(cursor)
+
+    def test_summary_only_when_asked(self):
+        cards, _ = recipe_page(limit=1)
+        self.assertLess(len(cards[0]["summary"]), len(self.recipes[0].description))
+        cards, _ = recipe_page(limit=1, summary=False)
+        self.assertNotIn("summary", cards[0])
+
+    @override_settings(RECIPE_PAGE_SIZE=3)
+    def test_json_pages(self):
+        first = self.client.get(reverse("list_recipes_page")).json()
+        self.assertEqual(len(first["recipes"]), 3)
+        self.assertEqual(first["recipes"][0]["url"], reverse("view_recipe", kwargs={"pk": self.recipes[0].id}))
+        second = self.client.get(reverse("list_recipes_page"), {"after": first["next"]}).json()
+        self.assertEqual([r["id"] for r in second["recipes"]], [r.id for r in self.recipes[3:]])
+        self.assertIsNone(second["next"])
+
+
+class RecipeDetailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recipe = Recipe.objects.create(title="Pannkakor", description="", servings=4)
+
+    def test_not_modified(self):
+        url = reverse("view_recipe", kwargs={"pk": self.recipe.id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        etag = response["ETag"]
+
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_changed_recipe_is_sent_again(self):
+        url = reverse("view_recipe", kwargs={"pk": self.recipe.id})
+        etag = self.client.get(url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.title = "Tunna pannkakor"
+            self.recipe.save()
+
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, "Tunna pannkakor")
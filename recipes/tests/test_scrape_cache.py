@@ -0,0 +1,81 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from recipes.models import ScrapedPage
+from recipes.views.scrapeCache import cache_recipe, canonicalize_url, evict, get_cached_recipe, invalidate
+
+ICA = "https://www.ica.se/recept/pannkakor-123456/"
+KOKET = "https://www.koket.se/kottbullar"
+
+
+class CanonicalizeUrlTests(SimpleTestCase):
+    def test_spellings_of_the_same_page(self):
+        for url in [
+            "HTTPS://WWW.ICA.SE/recept/pannkakor-123456/",
+            "https://www.ica.se:443/recept/pannkakor-123456/#ingredienser",
+            "https://www.ica.se/recept/pannkakor-123456/?utm_source=mail&fbclid=abc",
+            "  https://www.ica.se/recept/pannkakor-123456/  ",
+        ]:
+            self.assertEqual(canonicalize_url(url), ICA, url)
+
+    def test_query_is_sorted_and_kept(self):
+        self.assertEqual(canonicalize_url("https://ica.se/s?b=2&a=1&gclid=x"), "https://ica.se/s?a=1&b=2")
+
+    def test_other_ports_and_path_case_are_kept(self):
+        self.assertEqual(canonicalize_url("http://ica.se:8080/Recept"), "http://ica.se:8080/Recept")
+        self.assertEqual(canonicalize_url("http://ica.se"), "http://ica.se/")
+
+
+@override_settings(SCRAPE_CACHE_TTL=60, SCRAPE_CACHE_MAX_ENTRIES=2)
+class ScrapeCacheTests(TestCase):
+    def age(self, url, seconds):
+        ScrapedPage.objects.filter(url=canonicalize_url(url)).update(created_at=timezone.now() - timedelta(seconds=seconds))
+
+    def test_hit_for_any_spelling(self):
+        cache_recipe(ICA, "ica.se", {"title": "Pannkakor"})
+        self.assertEqual(get_cached_recipe("https://WWW.ICA.SE/recept/pannkakor-123456/?utm_medium=x", "ica.se"), {"title": "Pannkakor"})
+        cache_recipe(ICA, "ica.se", {"title": "Tunna pannkakor"})
+        self.assertEqual(ScrapedPage.objects.count(), 1)
+        self.assertEqual(get_cached_recipe(ICA, "ica.se"), {"title": "Tunna pannkakor"})
+
+    def test_expired_entries_are_deleted(self):
+        cache_recipe(ICA, "ica.se", {"title": "Pannkakor"})
+        self.age(ICA, 61)
+        self.assertIsNone(get_cached_recipe(ICA, "ica.se"))
+        self.assertFalse(ScrapedPage.objects.exists())
+
+    def test_evict_oldest_above_max_entries(self):
+        for i, url in enumerate([ICA, KOKET, "https://www.koket.se/pannkakor"]):
+            cache_recipe(url, "ica.se" if "ica" in url else "koket.se", {"title": url})
+            self.age(url, 30 - i)
+        self.assertEqual(evict(), 1)
+        self.assertIsNone(get_cached_recipe(ICA, "ica.se"))
+        self.assertEqual(evict(), 0)
+
+    @override_settings(SCRAPE_CACHE_EVICT_INTERVAL=0)
+    def test_store_evicts(self):
+        for url in [ICA, KOKET, "https://www.koket.se/pannkakor"]:
+            cache_recipe(url, "ica.se" if "ica" in url else "koket.se", {"title": url})
+        self.assertEqual(ScrapedPage.objects.count(), 2)
+
+    def test_invalidate_filters(self):
+        cache_recipe(ICA, "ica.se", {})
+        cache_recipe(KOKET, "koket.se", {})
+        self.age(KOKET, 61)
+        self.assertEqual(invalidate(expired_only=True), 1)
+        cache_recipe(KOKET, "koket.se", {})
+        self.assertEqual(invalidate(site_key="koket.se"), 1)
+        self.assertEqual(invalidate(url=ICA + "#top"), 1)
+        self.assertFalse(ScrapedPage.objects.exists())
+
+    def test_purgescrapecache(self):
+        cache_recipe(ICA, "ica.se", {})
+        cache_recipe(KOKET, "koket.se", {})
+        output = StringIO()
+        call_command("purgescrapecache", "--site", "ica.se", stdout=output)
+        self.assertEqual(output.getvalue().strip(), "Deleted 1 cached pages")
+        self.assertEqual(list(ScrapedPage.objects.values_list("site_key", flat=True)), ["koket.se"])
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from recipes.models import ScrapeJob
+from recipes.views.scrapeCache import cache_recipe
+from recipes.views.scrapeJobs import claim_job, fail_job, finish_job, requeue_stale_jobs, submit_job
+
+URL = "https://www.ica.se/recept/pannkakor-123456/"
+
+
+@override_settings(SCRAPE_JOB_MAX_ATTEMPTS=2, SCRAPE_JOB_TIMEOUT=60)
+class ScrapeJobQueueTests(TestCase):
+    def test_submit_reuses_open_jobs(self):
+        job = submit_job(URL + "?utm_source=mail", "ica.se")
+        self.assertEqual(job.url, URL)
+        self.assertEqual(submit_job(URL, "ica.se").id, job.id)
+        finish_job(job, {"title": "Pannkakor"})
+        self.assertNotEqual(submit_job(URL, "ica.se").id, job.id)
+
+    def test_claim_once_oldest_first(self):
+        first = submit_job(URL, "ica.se")
+        second = submit_job("https://www.koket.se/kottbullar", "koket.se")
+        claimed = claim_job()
+        self.assertEqual((claimed.id, claimed.status, claimed.attempts), (first.id, "running", 1))
+        self.assertIsNotNone(claimed.started_at)
+        self.assertEqual(claim_job().id, second.id)
+        self.assertIsNone(claim_job())
+
+    def test_fail_retries_then_fails(self):
+        submit_job(URL, "ica.se")
+        fail_job(claim_job(), "429")
+        job = ScrapeJob.objects.get()
+        self.assertEqual((job.status, job.error, job.finished_at), ("pending", "429", None))
+
+        fail_job(claim_job(), "503")
+        job = ScrapeJob.objects.get()
+        self.assertEqual((job.status, job.error, job.attempts), ("failed", "503", 2))
+        self.assertIsNotNone(job.finished_at)
+        self.assertIsNone(claim_job())
+
+    def test_requeue_stale_jobs(self):
+        retried = submit_job(URL, "ica.se")
+        exhausted = submit_job("https://www.koket.se/kottbullar", "koket.se")
+        fresh = submit_job("https://www.koket.se/pannkakor", "koket.se")
+        for _ in range(3):
+            claim_job()
+        long_ago = timezone.now() - timedelta(seconds=120)
+        ScrapeJob.objects.filter(id=retried.id).update(started_at=long_ago)
+        ScrapeJob.objects.filter(id=exhausted.id).update(started_at=long_ago, attempts=2)
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        statuses = dict(ScrapeJob.objects.values_list("id", "status"))
+        self.assertEqual(statuses, {retried.id: "pending", exhausted.id: "failed", fresh.id: "running"})
+        self.assertEqual(ScrapeJob.objects.get(id=exhausted.id).error, "Scrape timed out.")
+
+
+class SubmitScrapeJobTests(TestCase):
+    def test_post_only(self):
+        self.assertEqual(self.client.get(reverse("submit_scrape_job"), {"url": URL}).status_code, 405)
+
+    def test_invalid_urls(self):
+        for data in [{}, {"url": "https://www.example.com/recept/1"}]:
+            response = self.client.post(reverse("submit_scrape_job"), data)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("error", response.json())
+
+    def test_queued(self):
+        response = self.client.post(reverse("submit_scrape_job"), {"url": URL})
+        self.assertEqual(response.status_code, 202)
+        job = ScrapeJob.objects.get()
+        self.assertEqual(response.json(), {
+            "id": job.id, "status": "pending", "result": None, "error": "",
+            "poll_url": reverse("scrape_job_status", kwargs={"pk": job.id}),
+        })
+        self.assertEqual(self.client.get(response.json()["poll_url"]).json()["status"], "pending")
+
+    def test_cached_page_is_done_right_away(self):
+        cache_recipe(URL, "ica.se", {
+            "title": "Pannkakor", "description": "", "servings": 4, "ingredients": ["2 dl mjölk"], "tier": "static",
+        })
+        response = self.client.post(reverse("submit_scrape_job"), {"url": URL})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body["id"], body["status"]), (None, "done"))
+        self.assertEqual(body["result"]["title"], "Pannkakor")
+        self.assertEqual(body["result"]["ingredients"][0]["original_name"], "mjölk")
+        self.assertFalse(ScrapeJob.objects.exists())
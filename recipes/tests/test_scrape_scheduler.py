@@ -0,0 +1,33 @@
+import time
+
+from django.test import SimpleTestCase
+from django.utils.http import http_date
+
+from recipes.views.scrapeScheduler import retry_after_seconds, site_key_for_url
+
+
+class SiteKeyTests(SimpleTestCase):
+    def test_host_and_parent_domains(self):
+        self.assertEqual(site_key_for_url("https://www.ica.se/recept/pannkakor-123456/"), "ica.se")
+        self.assertEqual(site_key_for_url("https://ica.se/"), "ica.se")
+        self.assertEqual(site_key_for_url("https://recept.WWW.KOKET.SE/kottbullar"), "koket.se")
+
+    def test_other_sites(self):
+        self.assertIsNone(site_key_for_url("https://www.example.com/"))
+        self.assertIsNone(site_key_for_url("https://notica.se/"))
+        self.assertIsNone(site_key_for_url("https://ica.se.example.com/"))
+        self.assertIsNone(site_key_for_url("not a url"))
+
+
+class RetryAfterTests(SimpleTestCase):
+    def test_seconds(self):
+        self.assertEqual(retry_after_seconds("120"), 120)
+        self.assertEqual(retry_after_seconds(" 5 "), 5)
+
+    def test_http_date(self):
+        self.assertAlmostEqual(retry_after_seconds(http_date(time.time() + 60)), 60, delta=2)
+        self.assertEqual(retry_after_seconds(http_date(time.time() - 60)), 0)
+
+    def test_missing_or_invalid(self):
+        for value in [None, "", "soon", "-5"]:
+            self.assertIsNone(retry_after_seconds(value), value)
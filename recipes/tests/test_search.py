@@ -0,0 +1,66 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from recipes.models import Ingredient, ManagedIngredient, Recipe
+from recipes.views.recipeSearch import index_recipes, search_page, search_recipe_ids
+
+
+class RecipeSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        flour = ManagedIngredient.objects.create(name="Vetemjöl", common_denonyms=["vitt mjöl"])
+        milk = ManagedIngredient.objects.create(name="Mjölk")
+        cls.pancakes = Recipe.objects.create(title="Pannkakor", description="Tunna som i Frankrike", servings=4)
+        cls.waffles = Recipe.objects.create(title="Våfflor", description="Frasiga pannkakor i järn", servings=4)
+        cls.porridge = Recipe.objects.create(title="Gröt", description="", servings=2)
+        Ingredient.objects.bulk_create([
+            Ingredient(recipe=cls.pancakes, name=flour, quantity=2, unit="dl"),
+            Ingredient(recipe=cls.pancakes, name=milk, quantity=6, unit="dl"),
+            Ingredient(recipe=cls.waffles, name=flour, quantity=3, unit="dl"),
+            Ingredient(recipe=cls.porridge, name=milk, quantity=4, unit="dl"),
+        ])
+        index_recipes([cls.pancakes.id, cls.waffles.id, cls.porridge.id])
+
+    def ids(self, query):
+        return [recipe_id for recipe_id, _ in search_recipe_ids(query, 10)]
+
+    def test_last_word_is_a_prefix(self):
+        self.assertEqual(self.ids("pannk"), [self.pancakes.id, self.waffles.id])
+        self.assertEqual(self.ids("pannk tunna"), [])
+        self.assertEqual(self.ids("tunna pannk"), [self.pancakes.id])
+
+    def test_every_word_is_required(self):
+        self.assertEqual(self.ids("mjölk tunna"), [self.pancakes.id])
+        self.assertEqual(self.ids("gröt tunna"), [])
+
+    def test_matches_denonyms(self):
+        self.assertEqual(sorted(self.ids("vitt")), [self.pancakes.id, self.waffles.id])
+
+    def test_title_ranks_above_description(self):
+        ranked = search_recipe_ids("pannkakor", 10)
+        self.assertEqual([recipe_id for recipe_id, _ in ranked], [self.pancakes.id, self.waffles.id])
+        self.assertGreater(ranked[0][1], ranked[1][1])
+
+    def test_removed_recipes_leave_the_index(self):
+        pancakes_id = self.pancakes.id
+        self.pancakes.delete()
+        index_recipes([pancakes_id])
+        self.assertEqual(self.ids("pannkakor"), [self.waffles.id])
+
+    def test_pages(self):
+        results, has_next = search_page("mjöl", 1, limit=2)
+        self.assertEqual(len(results), 2)
+        self.assertTrue(has_next)
+        last, has_next = search_page("mjöl", 2, limit=2)
+        self.assertEqual(len(last), 1)
+        self.assertFalse(has_next)
+        self.assertEqual(
+            {result["id"] for result in results + last}, {self.pancakes.id, self.waffles.id, self.porridge.id}
+        )
+
+    def test_api(self):
+        response = self.client.get(reverse("search_recipes_api"), {"q": "pannkakor"})
+        self.assertEqual([result["id"] for result in response.json()["results"]], [self.pancakes.id, self.waffles.id])
+        self.assertIsNone(response.json()["next"])
+        for params in [{}, {"q": "  "}]:
+            self.assertEqual(self.client.get(reverse("search_recipes_api"), params).status_code, 400)
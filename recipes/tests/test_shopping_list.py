@@ -0,0 +1,83 @@
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from recipes.models import Ingredient, ManagedIngredient, Recipe
+from recipes.views.ingredientVectors import pack_vector, rebuild_ingredient_vectors, sum_vectors, unpack_vector
+from recipes.views.shoppingListHandler import _merge_in_python, aggregate_shopping_list, parse_meal_plan
+
+
+class ParseMealPlanTests(SimpleTestCase):
+    def test_guests_per_recipe(self):
+        self.assertEqual(parse_meal_plan("1, 2:8,1", 4), {1: 8, 2: 8})
+
+    def test_invalid_entries(self):
+        for value in ["1,x", "1:-2", "1:a"]:
+            with self.assertRaises(ValueError):
+                parse_meal_plan(value, 4)
+
+
+class PackVectorTests(SimpleTestCase):
+    def test_canonical_units_per_serving(self):
+        vector = unpack_vector(pack_vector([(1, "dl", 2), (1, "msk", 2), (2, "kg", 1), (3, "burk", 2)], 2))
+        self.assertEqual(
+            sorted((int(e["ingredient"]), int(e["unit"]), float(e["quantity"])) for e in vector),
+            [(1, 1, 115.0), (2, 0, 500.0), (3, 2, 1.0)],
+        )
+
+    def test_no_servings(self):
+        self.assertEqual(pack_vector([(1, "g", 100)], 0), b"")
+
+
+class ShoppingListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.flour = ManagedIngredient.objects.create(name="Vetemjöl")
+        cls.milk = ManagedIngredient.objects.create(name="Mjölk")
+        cls.pancakes = Recipe.objects.create(title="Pannkakor", description="", servings=4)
+        cls.waffles = Recipe.objects.create(title="Våfflor", description="", servings=2)
+        cls.unknown = Recipe.objects.create(title="Okänt", description="", servings=0)
+        Ingredient.objects.bulk_create([
+            Ingredient(recipe=cls.pancakes, name=cls.flour, quantity=2, unit="dl"),
+            Ingredient(recipe=cls.pancakes, name=cls.milk, quantity=6, unit="dl"),
+            Ingredient(recipe=cls.waffles, name=cls.flour, quantity=3, unit="dl"),
+            Ingredient(recipe=cls.waffles, name=cls.flour, quantity=100, unit="g"),
+            Ingredient(recipe=cls.unknown, name=cls.milk, quantity=1, unit="liter"),
+        ])
+        rebuild_ingredient_vectors([cls.pancakes.id, cls.waffles.id, cls.unknown.id])
+
+    def rows(self, shopping_list):
+        return [(item["name"], item["unit"], item["quantity"]) for item in shopping_list]
+
+    def test_grouped_per_ingredient_and_unit(self):
+        ids = [self.pancakes.id, self.waffles.id, self.unknown.id]
+        self.assertEqual(self.rows(aggregate_shopping_list(ids, 4)), [
+            ("Mjölk", "dl", 6.0),
+            ("Vetemjöl", "dl", 8.0),
+            ("Vetemjöl", "g", 200.0),
+        ])
+
+    def test_fallback_gives_the_same_list(self):
+        ids = [self.pancakes.id, self.waffles.id, self.unknown.id]
+        self.assertEqual(self.rows(_merge_in_python(ids, 6)), self.rows(aggregate_shopping_list(ids, 6)))
+
+    def test_vector_sums_in_canonical_units(self):
+        totals = sum_vectors({self.pancakes.id: 8, self.waffles.id: 1, self.unknown.id: 4})
+        self.assertEqual(
+            [(ingredient_id, unit, round(quantity, 6)) for ingredient_id, unit, quantity in totals],
+            [(self.flour.id, "g", 50.0), (self.flour.id, "ml", 550.0), (self.milk.id, "ml", 1200.0)],
+        )
+
+    def test_api(self):
+        response = self.client.get(reverse("shopping_list_api"), {"recipes": f"{self.pancakes.id},{self.waffles.id}:2", "num_guests": 4})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"recipes": 2, "items": [
+            {"id": self.milk.id, "name": "Mjölk", "quantity": 600.0, "unit": "ml"},
+            {"id": self.flour.id, "name": "Vetemjöl", "quantity": 100.0, "unit": "g"},
+            {"id": self.flour.id, "name": "Vetemjöl", "quantity": 500.0, "unit": "ml"},
+        ]})
+
+    def test_api_errors(self):
+        url = reverse("shopping_list_api")
+        self.assertEqual(self.client.get(url, {"recipes": "1", "num_guests": "-1"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"recipes": "1:x"}).status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 400)
@@ -0,0 +1,91 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from recipes.models import ManagedIngredient, Recipe
+from recipes.views.ingredientIndex import get_ingredient_index
+from recipes.views.pages import SITE_CONFIGS
+from recipes.views.recipeSources import fetch_source, recipe_hash, site_sources, with_source
+from recipes.views.scrapingHandler import save_scraped_recipes
+
+URL = "https://www.ica.se/recept/pannkakor-123456/"
+PANCAKES = {"title": "Pannkakor", "description": "Tunna", "servings": 4, "ingredients": ["3 dl mjöl", "6 dl mjölk"]}
+
+
+class RecipeHashTests(SimpleTestCase):
+    def test_stable_for_the_same_recipe(self):
+        self.assertEqual(recipe_hash(PANCAKES), recipe_hash(dict(PANCAKES, tier="html", url=URL)))
+
+    def test_changes_with_the_recipe(self):
+        self.assertNotEqual(recipe_hash(PANCAKES), recipe_hash(dict(PANCAKES, servings=6)))
+        self.assertNotEqual(recipe_hash(PANCAKES), recipe_hash(dict(PANCAKES, ingredients=["3 dl mjöl"])))
+
+
+class FetchSourceTests(SimpleTestCase):
+    def response(self, status_code, headers=None):
+        return mock.Mock(status_code=status_code, headers=headers or {}, content=b"")
+
+    @mock.patch("recipes.views.newScraper.requests.get")
+    def test_not_modified(self, get):
+        get.return_value = self.response(304)
+        source = {"source_etag": '"v1"', "source_last_modified": "Mon, 06 Oct 2025 10:00:00 GMT"}
+        not_modified, recipe, validators = fetch_source(URL, SITE_CONFIGS["ica.se"], source)
+        self.assertTrue(not_modified)
+        self.assertIsNone(recipe)
+        self.assertEqual(validators, source)
+        headers = get.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertEqual(headers["If-Modified-Since"], "Mon, 06 Oct 2025 10:00:00 GMT")
+
+    @mock.patch("recipes.views.newScraper.requests.get")
+    def test_modified_page_is_extracted_with_new_validators(self, get):
+        get.return_value = self.response(200, {"ETag": '"v2"'})
+        with mock.patch("recipes.views.recipeSources.extract_content", return_value=PANCAKES):
+            not_modified, recipe, validators = fetch_source(URL, SITE_CONFIGS["ica.se"], {"source_etag": '"v1"'})
+        self.assertFalse(not_modified)
+        self.assertEqual(recipe, PANCAKES)
+        self.assertEqual(validators, {"source_etag": '"v2"', "source_last_modified": ""})
+
+
+class SaveScrapedRecipesTests(TestCase):
+    def setUp(self):
+        # The index is shared by the process, other tests may have left their ingredients in it.
+        get_ingredient_index().build(ManagedIngredient.objects.values_list("id", "name", "common_denonyms"))
+
+    def test_recipe_id_replaces_the_recipe(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            [recipe] = save_scraped_recipes([with_source(PANCAKES, URL, {"source_etag": '"v1"'})])
+        changed = dict(PANCAKES, servings=6, ingredients=["4 dl mjöl"], recipe_id=recipe.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            [saved] = save_scraped_recipes([with_source(changed, URL, {"source_etag": '"v2"'})])
+
+        self.assertEqual(saved.id, recipe.id)
+        self.assertEqual(Recipe.objects.count(), 1)
+        recipe = Recipe.objects.get()
+        self.assertEqual((recipe.servings, recipe.source_etag), (6, '"v2"'))
+        self.assertEqual(recipe.source_hash, recipe_hash(changed))
+        self.assertEqual(
+            [(i.name.name, i.quantity, i.unit) for i in recipe.ingredient_set.all()], [("mjöl", 4, "dl")]
+        )
+
+    def test_deleted_recipe_is_created_again(self):
+        [saved] = save_scraped_recipes([dict(PANCAKES, recipe_id=12345)])
+        self.assertNotEqual(saved.id, 12345)
+        self.assertEqual(Recipe.objects.get().title, "Pannkakor")
+
+
+class SiteSourcesTests(TestCase):
+    def setUp(self):
+        # The index is shared by the process, other tests may have left their ingredients in it.
+        get_ingredient_index().build(ManagedIngredient.objects.values_list("id", "name", "common_denonyms"))
+
+    def test_only_recipes_of_the_site(self):
+        ica = save_scraped_recipes([with_source(PANCAKES, URL, {})])[0]
+        save_scraped_recipes([with_source(PANCAKES, "https://www.koket.se/pannkakor", {})])
+        save_scraped_recipes([with_source(PANCAKES, "https://www.ica.se.example.com/recept/x", {})])
+        save_scraped_recipes([PANCAKES])
+
+        sources = site_sources("ica.se")
+        self.assertEqual(list(sources), [URL])
+        self.assertEqual(sources[URL]["id"], ica.id)
+        self.assertEqual(sources[URL]["source_hash"], recipe_hash(PANCAKES))
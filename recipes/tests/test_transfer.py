@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+
+from recipes.models import Ingredient, ManagedIngredient, Recipe
+from recipes.views.ingredientIndex import get_ingredient_index
+from recipes.views.recipeSearch import search_recipe_ids
+from recipes.views.recipeTransfer import RecipeImporter
+
+
+class RecipeTransferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        flour = ManagedIngredient.objects.create(name="Vetemjöl", common_denonyms=["mjöl"], category="Skafferi")
+        milk = ManagedIngredient.objects.create(name="Mjölk", weight_to_volume_conversion=1.03)
+        pancakes = Recipe.objects.create(title="Pannkakor", description="Tunna", servings=4)
+        Recipe.objects.create(title="Vatten", description="", servings=1)
+        porridge = Recipe.objects.create(title="Gröt", description="", servings=2)
+        Ingredient.objects.bulk_create([
+            Ingredient(recipe=pancakes, name=flour, quantity=2.5, unit="dl"),
+            Ingredient(recipe=pancakes, name=milk, quantity=6, unit="dl"),
+            Ingredient(recipe=porridge, name=milk, quantity=4, unit="dl"),
+        ])
+
+    def export(self):
+        output = StringIO()
+        call_command("exportrecipes", stdout=output, stderr=StringIO())
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def import_lines(self, lines):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as source:
+            source.write("\n".join(lines) + "\n")
+        self.addCleanup(os.unlink, source.name)
+        output = StringIO()
+        call_command("importrecipes", source.name, stdout=output, stderr=StringIO())
+        return output.getvalue()
+
+    def test_export(self):
+        records = self.export()
+        self.assertEqual([r["type"] for r in records], ["managed_ingredient"] * 2 + ["recipe"] * 3)
+        self.assertEqual([r.get("title") for r in records[2:]], ["Pannkakor", "Vatten", "Gröt"])
+        self.assertEqual([len(r["ingredients"]) for r in records[2:]], [2, 0, 1])
+
+    def test_round_trip(self):
+        exported = self.export()
+        Ingredient.objects.all().delete()
+        Recipe.objects.all().delete()
+        ManagedIngredient.objects.all().delete()
+
+        summary = self.import_lines(json.dumps(record, ensure_ascii=False) for record in exported)
+        self.assertIn("Imported 3 recipes with 3 ingredients and 2 new managed ingredients", summary)
+        self.assertEqual(self.export(), exported)
+        # Bulk imports skip the signals, the search index is written by the importer.
+        pancakes = Recipe.objects.get(title="Pannkakor")
+        self.assertEqual([recipe_id for recipe_id, _ in search_recipe_ids("vetemjöl", 10)], [pancakes.id])
+
+    def test_import_creates_missing_ingredients_and_skips_invalid_records(self):
+        summary = self.import_lines([
+            json.dumps({"type": "recipe", "title": "Te", "servings": 1,
+                        "ingredients": [{"name": "vetemjöl", "quantity": 1, "unit": "msk"}, {"name": "Te", "quantity": 1, "unit": "st"}]}),
+            json.dumps({"type": "recipe", "title": "", "servings": 1}),
+            json.dumps({"type": "menu"}),
+        ])
+        self.assertIn("Imported 1 recipes with 2 ingredients and 1 new managed ingredients", summary)
+        self.assertIn("skipped 2 invalid records", summary)
+        tea = Recipe.objects.get(title="Te")
+        self.assertEqual(
+            sorted(tea.ingredient_set.values_list("name__name", "unit")),
+            [("Te", "st"), ("Vetemjöl", "msk")],
+        )
+
+    def test_new_ingredients_are_indexed_on_commit(self):
+        index = get_ingredient_index()
+        index.build(ManagedIngredient.objects.values_list("id", "name", "common_denonyms"))
+        tea = {"type": "recipe", "title": "Te", "servings": 1, "ingredients": [{"name": "Saffran", "quantity": 1, "unit": "krm"}]}
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            importer = RecipeImporter()
+            importer.add(tea)
+            importer.close()
+            raise RuntimeError
+        self.assertIsNone(index.best_match("saffran"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            importer = RecipeImporter()
+            importer.add(tea)
+            importer.close()
+        self.assertEqual(index.best_match("saffran"), (ManagedIngredient.objects.get(name="Saffran").id, "Saffran"))
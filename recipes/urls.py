@@ -1,19 +1,37 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 from . import views
 
+
+def sync_or_async(sync_view, async_view):
+    """
+    Picks the async view when the project runs under ASGI, see makeRecipe/asgi.py.
+    """
+    return async_view if settings.ASYNC_VIEWS else sync_view
+
 urlpatterns = [
     path('', views.list_recipes, name='list_recipes'),
+    path('page/', views.list_recipes_page, name='list_recipes_page'),
+    path('search/', views.search_recipes, name='search_recipes'),
+    path('search/api/', views.search_recipes_api, name='search_recipes_api'),
+    path('pantry/', views.what_can_i_cook, name='what_can_i_cook'),
+    path('pantry/api/', views.pantry_api, name='pantry_api'),
     path('<int:pk>/', views.view_recipe, name='view_recipe'),
     path('add/', views.create_recipe, name='create_recipe'),
     path('<int:pk>/edit/', views.update_recipe, name='update_recipe'),
     path('<int:pk>/delete/', views.delete_recipe, name='delete_recipe'),
     path('shopping-list/', views.create_shopping_list, name='create_shopping_list'),
+    path('shopping-list/api/', views.shopping_list_api, name='shopping_list_api'),
     path('ingredients/manage/', views.manage_ingredients, name='manage_ingredients'),
     path('ingredients/<int:pk>/edit/', views.update_managed_ingredient, name='update_managed_ingredient'),
     path('ingredients/delete/<int:pk>/', views.delete_managed_ingredient, name='delete_managed_ingredient'),
-    path('ingredients/autocomplete/', views.autocomplete_ingredient, name='autocomplete_ingredient'),
-    path('scrape-recipe/', views.scrape_recipe, name='scrape_recipe'),
-    path('scrape-recipe-details/', views.scrape_recipe_details, name='scrape_recipe_details'),
+    path('ingredients/autocomplete/', sync_or_async(views.autocomplete_ingredient, views.autocomplete_ingredient_async), name='autocomplete_ingredient'),
+    path('scrape-recipe/', sync_or_async(views.scrape_recipe, views.scrape_recipe_async), name='scrape_recipe'),
+    path('scrape-recipe-details/', sync_or_async(views.scrape_recipe_details, views.scrape_recipe_details_async), name='scrape_recipe_details'),
+    path('scrape-recipe-full/', sync_or_async(views.scrape_recipe_full, views.scrape_recipe_full_async), name='scrape_recipe_full'),
+    path('scrape-jobs/', views.submit_scrape_job, name='submit_scrape_job'),
+    path('scrape-jobs/<int:pk>/', views.scrape_job_status, name='scrape_job_status'),
+    path('scraper/stats/', views.scraper_stats, name='scraper_stats'),
     path('add-managed-ingredient/', views.create_managed_ingredient_from_recipe, name='create_managed_ingredient_from_recipe'),
 ]
\ No newline at end of file
@@ -1,7 +1,9 @@
 from .ingridientHandler import *
 from .recipeHandler import *
+from .recipeSearch import *
 from .scrapingHandler import *
 from .shoppingListHandler import *
+from .pantryHandler import *
 from .newScraper import *
 from .pages import *
 from .parser import *
\ No newline at end of file
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from playwright.async_api import async_playwright
+
+from .newScraper import extract_static
+from .pageLoading import open_page_async
+from .pages import SITE_CONFIGS
+from .scrapeCache import cache_recipe, canonicalize_url, get_cached_recipe
+from .scrapeScheduler import politely_async
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBrowser:
+    """
+    One warm Chromium shared by every async scrape on an event loop.
+    Each scrape gets a fresh context, at most `max_pages` of them are open at the same time.
+    """
+
+    def __init__(self, max_pages, timeout, launch_options=None):
+        self.timeout = timeout
+        self.launch_options = launch_options or {}
+        self.playwright = None
+        self.browser = None
+        self.pages = asyncio.Semaphore(max_pages)
+        self.launch_lock = asyncio.Lock()
+
+    async def _ensure_browser(self):
+        async with self.launch_lock:
+            if self.playwright is None:
+                self.playwright = await async_playwright().start()
+            if self.browser is None or not self.browser.is_connected():
+                if self.browser is not None:
+                    logger.warning("Async browser disconnected, relaunching")
+                self.browser = await self.playwright.chromium.launch(**self.launch_options)
+
+    async def run(self, fn, *args):
+        """
+        Runs `await fn(page, *args)` on a new page and returns its result.
+        """
+        async with self.pages:
+            await self._ensure_browser()
+            context = await self.browser.new_context()
+            try:
+                page = await context.new_page()
+                return await asyncio.wait_for(fn(page, *args), self.timeout)
+            finally:
+                await context.close()
+
+
+_browsers = weakref.WeakKeyDictionary()
+_in_flight = weakref.WeakKeyDictionary()
+
+
+def get_async_browser():
+    """
+    Returns the browser of the running event loop, an ASGI worker has one loop for its lifetime.
+    """
+    loop = asyncio.get_running_loop()
+    browser = _browsers.get(loop)
+    if browser is None:
+        browser = _browsers[loop] = AsyncBrowser(settings.ASYNC_SCRAPER_MAX_PAGES, settings.SCRAPER_POOL_TIMEOUT)
+    return browser
+
+async def _eval(page, config, field):
+    try:
+        return await page.eval_on_selector(config[f"{field}_selector"], config[f"{field}_extractor"])
+    except Exception:
+        return None
+
+async def collect_links(page, url, config):
+    """
+    Returns every href on the page, recipe or not.
+    """
+    await open_page_async(page, url, config, [config["link_selector"]])
+    return await page.eval_on_selector_all(config["link_selector"], config["href_extractor"])
+
+async def collect_recipe(page, url, config):
+    """
+    Async counterpart of newScraper.find_recipe for an already opened page.
+    Returns the title, description, servings and raw ingredient lines.
+    """
+    await open_page_async(page, url, config)
+    return {
+        "title": await _eval(page, config, "title") or "",
+        "description": await _eval(page, config, "description") or "",
+        "servings": await _eval(page, config, "servings") or "",
+        "ingredients": await page.eval_on_selector_all(
+            config["ingredients_selector"], config["ingredients_extractor"]
+        ),
+    }
+
+async def find_recipe_async(url, site_key, refresh=False):
+    """
+    Async counterpart of newScraper.find_recipe for the ASGI views: same cache, same tiers,
+    but the browser tier runs on playwright.async_api so one worker serves many scrapes at once.
+    """
+    if not refresh:
+        cached = await sync_to_async(get_cached_recipe)(url, site_key)
+        if cached is not None:
+            return cached
+
+    key = (canonicalize_url(url), site_key)
+    flights = _in_flight.setdefault(asyncio.get_running_loop(), {})
+    if key in flights:
+        return await asyncio.shield(flights[key])
+
+    flight = flights[key] = asyncio.ensure_future(_scrape_and_cache_async(url, site_key))
+
+    def landed(_):
+        # Also when every caller has been cancelled, the scrape itself runs to the end.
+        flights.pop(key, None)
+
+    flight.add_done_callback(landed)
+    return await asyncio.shield(flight)
+
+async def _scrape_and_cache_async(url, site_key):
+    result = await _scrape_tiered_async(url, SITE_CONFIGS[site_key])
+    await sync_to_async(cache_recipe)(url, site_key, result)
+    return result
+
+async def _scrape_tiered_async(url, config):
+    # requests is blocking, the static tier runs in a thread of its own.
+    recipe = await politely_async(url, sync_to_async(extract_static, thread_sensitive=False), url, config)
+    if recipe is None:
+        recipe = await politely_async(url, get_async_browser().run, collect_recipe, url, config)
+        recipe["tier"] = "browser"
+    logger.info("Scraped %s with the %s tier", url, recipe["tier"])
+    return recipe
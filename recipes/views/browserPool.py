@@ -0,0 +1,211 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+from django.conf import settings
+from playwright.sync_api import sync_playwright
+
+logger = logging.getLogger(__name__)
+
+
+def _rss_mb(pids):
+    """
+    Sums the resident memory of the given process ids in megabytes.
+    Only works where /proc is available, returns 0 elsewhere.
+    """
+    total_kb = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024
+
+
+class BrowserSlot(threading.Thread):
+    """
+    A worker thread that owns one warm Chromium instance.
+    Playwright's sync API is bound to the thread that started it, so every
+    browser lives on its own thread and jobs are handed to it through the pool queue.
+    """
+
+    def __init__(self, pool, index):
+        super().__init__(name=f"browser-pool-{index}", daemon=True)
+        self.pool = pool
+        self.playwright = None
+        self.browser = None
+        self.pages_served = 0
+
+    def run(self):
+        try:
+            self._ensure_browser()
+        except Exception:
+            logger.exception("Could not warm up %s, will retry on first job", self.name)
+
+        while True:
+            job = self.pool._jobs.get()
+            if job is None:
+                break
+            fn, args, kwargs, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = self._run_job(fn, args, kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+        self._close_browser()
+        if self.playwright is not None:
+            self.playwright.stop()
+            self.playwright = None
+
+    def _ensure_browser(self):
+        """
+        Health check before every job: relaunches the browser if it crashed or was recycled.
+        """
+        if self.playwright is None:
+            self.playwright = sync_playwright().start()
+        if self.browser is not None and not self.browser.is_connected():
+            logger.warning("Browser in %s disconnected, relaunching", self.name)
+            self._close_browser()
+        if self.browser is None:
+            self.browser = self.playwright.chromium.launch(**self.pool.launch_options)
+            self.pages_served = 0
+
+    def _run_job(self, fn, args, kwargs):
+        self._ensure_browser()
+        # Every job gets its own context so cookies and storage never leak between scrapes.
+        context = self.browser.new_context()
+        try:
+            page = context.new_page()
+            return fn(page, *args, **kwargs)
+        finally:
+            try:
+                context.close()
+            except Exception:
+                logger.warning("Could not close browser context in %s", self.name)
+            self.pages_served += 1
+            if self._needs_recycle():
+                self._close_browser()
+
+    def _needs_recycle(self):
+        if self.pool.max_pages and self.pages_served >= self.pool.max_pages:
+            logger.info("Recycling %s after %d pages", self.name, self.pages_served)
+            return True
+        if self.pool.max_rss_mb:
+            rss = self.browser_rss_mb()
+            if rss >= self.pool.max_rss_mb:
+                logger.info("Recycling %s at %.0f MB RSS", self.name, rss)
+                return True
+        return False
+
+    def browser_rss_mb(self):
+        """
+        Returns the combined RSS of the browser and its renderer processes.
+        """
+        if self.browser is None or not self.browser.is_connected():
+            return 0
+        try:
+            session = self.browser.new_browser_cdp_session()
+            try:
+                info = session.send("SystemInfo.getProcessInfo")
+            finally:
+                session.detach()
+        except Exception:
+            return 0
+        return _rss_mb(process["id"] for process in info.get("processInfo", []))
+
+    def _close_browser(self):
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except Exception:
+                logger.warning("Could not close browser in %s", self.name)
+            self.browser = None
+
+
+class BrowserPool:
+    """
+    A process-wide pool of warm Chromium browsers.
+    At most `size` pages are rendered at the same time, further jobs wait in the queue.
+    Browsers are recycled after `max_pages` pages or when they grow past `max_rss_mb`.
+    """
+
+    def __init__(self, size=2, max_pages=50, max_rss_mb=512, timeout=None, launch_options=None):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.timeout = timeout
+        self.launch_options = launch_options or {}
+        self._jobs = queue.Queue()
+        self._slots = []
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            # Threads do not survive a fork, so a forked worker starts its own browsers.
+            if self._slots and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._jobs = queue.Queue()
+            self._slots = [BrowserSlot(self, i) for i in range(self.size)]
+            for slot in self._slots:
+                slot.start()
+
+    def run(self, fn, *args, **kwargs):
+        """
+        Runs fn(page, *args, **kwargs) on a pooled browser in a fresh context.
+        Blocks until a browser is free and returns whatever fn returns.
+        """
+        self._start()
+        future = Future()
+        self._jobs.put((fn, args, kwargs, future))
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # A job still waiting in the queue is skipped by the slot that picks it up,
+            # one that already runs finishes on its own.
+            future.cancel()
+            raise
+
+    def close(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._slots = []
+                return
+            for _ in self._slots:
+                self._jobs.put(None)
+            for slot in self._slots:
+                slot.join(timeout=10)
+            self._slots = []
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """
+    Returns the shared browser pool, created from settings on first use.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(
+                size=settings.SCRAPER_POOL_SIZE,
+                max_pages=settings.SCRAPER_POOL_MAX_PAGES,
+                max_rss_mb=settings.SCRAPER_POOL_MAX_RSS_MB,
+                timeout=settings.SCRAPER_POOL_TIMEOUT,
+            )
+            atexit.register(_pool.close)
+        return _pool
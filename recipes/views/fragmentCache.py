@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models.functions import Substr
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from recipes.models import Recipe
+
+FRAGMENT_CACHE_ALIAS = 'fragments'
+# Fragment names, also used by the {% cache %} tags in the templates.
+RECIPE_CARD = 'recipe_card'
+INGREDIENT_LIST = 'recipe_ingredients'
+
+# The list cards show 100 characters, one more tells truncatechars that the text goes on.
+SUMMARY_LENGTH = 101
+
+
+def fragment_cache():
+    return caches[FRAGMENT_CACHE_ALIAS]
+
+def fragment_key(name, recipe_id, version):
+    return make_template_fragment_key(name, [recipe_id, version])
+
+def invalidate_fragments(versions):
+    """
+    Drops the cached fragments of recipes given as (id, updated_at) pairs.
+    A new version gets new keys anyway, this only frees the space of the old ones.
+    """
+    fragment_cache().delete_many([
+        fragment_key(name, recipe_id, version)
+        for recipe_id, version in versions
+        for name in (RECIPE_CARD, INGREDIENT_LIST)
+    ])
+
+def render_recipe_cards(recipes):
+    """
+    Returns the rendered card body of each recipe, given as dicts with id and updated_at.
+    Cached cards are fetched in one round trip, only the missing ones load their
+    description and are rendered. The card footer holds the CSRF token and is never cached.
+    """
+    keys = [fragment_key(RECIPE_CARD, recipe['id'], recipe['updated_at']) for recipe in recipes]
+    cache = fragment_cache()
+    cards = cache.get_many(keys)
+
+    missing = {recipe['id']: key for recipe, key in zip(recipes, keys) if key not in cards}
+    if missing:
+        rendered = {}
+        for recipe in (
+            Recipe.objects.filter(id__in=missing)
+            .annotate(summary=Substr('description', 1, SUMMARY_LENGTH))
+            .values('id', 'title', 'summary')
+        ):
+            rendered[missing[recipe['id']]] = render_to_string('recipes/recipe_card.html', {'recipe': recipe})
+        cache.set_many(rendered, settings.FRAGMENT_CACHE_TIMEOUT)
+        cards.update(rendered)
+
+    return [mark_safe(cards.get(key, '')) for key in keys]
@@ -0,0 +1,175 @@
+import heapq
+import threading
+import time
+from collections import Counter
+from difflib import SequenceMatcher
+
+from django.conf import settings
+
+from recipes.models import ManagedIngredient
+
+
+def trigrams(text):
+    """
+    Returns the set of character trigrams of a padded, lowercased string.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class IngredientIndex:
+    """
+    In-memory trigram index over managed ingredient names and their common denonyms.
+    A lookup only scores the few terms that share the most trigrams with the query
+    instead of running difflib against the whole catalog.
+    """
+
+    def __init__(self, candidates=50):
+        self.candidates = candidates
+        self.terms = {}        # term -> ingredient id
+        self.names = {}        # ingredient id -> name
+        self.ingredient_terms = {}  # ingredient id -> terms pointing at it
+        self.postings = {}     # trigram -> set of terms
+        self.built_at = None
+        self.lock = threading.RLock()
+
+    def build(self, rows):
+        """
+        Replaces the index contents with (id, name, common_denonyms) rows.
+        The new index is built on the side, lookups keep using the old one until it is swapped in.
+        """
+        fresh = IngredientIndex(self.candidates)
+        for ingredient_id, name, denonyms in rows:
+            fresh.add(ingredient_id, name, denonyms)
+        with self.lock:
+            self.terms, self.names = fresh.terms, fresh.names
+            self.ingredient_terms, self.postings = fresh.ingredient_terms, fresh.postings
+            self.built_at = time.monotonic()
+
+    def add(self, ingredient_id, name, denonyms=()):
+        with self.lock:
+            self.remove(ingredient_id)
+            self.names[ingredient_id] = name
+            terms = []
+            for term in [name, *(denonyms or [])]:
+                term = str(term).strip().lower()
+                # A real name always wins over another ingredient's denonym.
+                if not term or (term in self.terms and term != name.lower()):
+                    continue
+                self._remove_term(term)
+                self.terms[term] = ingredient_id
+                terms.append(term)
+                for gram in trigrams(term):
+                    self.postings.setdefault(gram, set()).add(term)
+            self.ingredient_terms[ingredient_id] = terms
+
+    def remove(self, ingredient_id):
+        with self.lock:
+            self.names.pop(ingredient_id, None)
+            for term in self.ingredient_terms.pop(ingredient_id, []):
+                if self.terms.get(term) == ingredient_id:
+                    self._remove_term(term)
+
+    def _remove_term(self, term):
+        owner = self.terms.pop(term, None)
+        if owner is None:
+            return
+        if term in self.ingredient_terms.get(owner, []):
+            self.ingredient_terms[owner].remove(term)
+        for gram in trigrams(term):
+            terms = self.postings.get(gram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self.postings[gram]
+
+    def best_match(self, name, cutoff=0.8):
+        """
+        Returns (id, name) of the closest managed ingredient, or None if nothing scores above cutoff.
+        Scores with the same ratio as difflib.get_close_matches, but only the `candidates` terms
+        most similar by trigrams, a better match outside them is missed.
+        """
+        query = name.strip().lower()
+        with self.lock:
+            if query in self.terms:
+                ingredient_id = self.terms[query]
+                return ingredient_id, self.names[ingredient_id]
+
+            # Every term sharing a trigram with the query is counted, then ranked by the Dice
+            # coefficient of their trigram sets, a term has len(term) + 1 of them. Only the best
+            # `candidates` are scored with difflib.
+            grams = trigrams(query)
+            shared = Counter()
+            for gram in grams:
+                terms = self.postings.get(gram)
+                if terms:
+                    shared.update(terms)
+            ranked = heapq.nlargest(
+                self.candidates, shared.items(), key=lambda item: item[1] / (len(item[0]) + 1 + len(grams))
+            )
+
+            best, best_score = None, cutoff
+            matcher = SequenceMatcher(b=query)
+            for term, _ in ranked:
+                matcher.set_seq1(term)
+                if matcher.real_quick_ratio() < best_score or matcher.quick_ratio() < best_score:
+                    continue
+                score = matcher.ratio()
+                if score >= best_score:
+                    best, best_score = term, score
+
+            if best is None:
+                return None
+            ingredient_id = self.terms[best]
+            return ingredient_id, self.names[ingredient_id]
+
+    def containing(self, text, limit):
+        """
+        Returns up to `limit` ingredient ids with a common denonym that contains `text`.
+        Needs at least three characters, shorter text has no trigram to look up.
+        """
+        text = text.strip().lower()
+        grams = {text[i:i + 3] for i in range(len(text) - 2)}
+        if not grams:
+            return []
+        with self.lock:
+            postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+            found = []
+            for term in sorted(set.intersection(*postings), key=len):
+                ingredient_id = self.terms[term]
+                if text in term and term != self.names[ingredient_id].lower() and ingredient_id not in found:
+                    found.append(ingredient_id)
+                    if len(found) >= limit:
+                        break
+            return found
+
+    def is_stale(self):
+        return self.built_at is None or time.monotonic() - self.built_at > settings.INGREDIENT_INDEX_TTL
+
+
+_index = IngredientIndex()
+_rebuild_lock = threading.Lock()
+
+
+def get_ingredient_index():
+    """
+    Returns the process-wide index, built from the database on first use.
+    Signals keep it current for changes made in this process, other worker
+    processes are picked up when it is rebuilt after INGREDIENT_INDEX_TTL seconds.
+    """
+    # Only the first build makes callers wait, later rebuilds run while others use the old index.
+    if _index.is_stale() and _rebuild_lock.acquire(blocking=_index.built_at is None):
+        try:
+            if _index.is_stale():
+                _index.build(ManagedIngredient.objects.values_list('id', 'name', 'common_denonyms').iterator())
+        finally:
+            _rebuild_lock.release()
+    return _index
+
+def index_managed_ingredient(ingredient):
+    if _index.built_at is not None:
+        _index.add(ingredient.id, ingredient.name, ingredient.common_denonyms)
+
+def unindex_managed_ingredient(ingredient_id):
+    if _index.built_at is not None:
+        _index.remove(ingredient_id)
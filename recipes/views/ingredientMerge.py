@@ -0,0 +1,191 @@
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from django.db import transaction
+from django.db.models import Count
+
+from recipes.models import Ingredient, ManagedIngredient
+from .ingredientIndex import index_managed_ingredient
+from .ingridientHandler import bump_catalog_version
+from .recipeChanges import recipes_changed
+
+# Names scoring at least this much against each other are merged.
+DEFAULT_MERGE_THRESHOLD = 0.9
+# Shorter names are only merged when they are spelled the same, a letter decides more of them.
+TYPO_MIN_LENGTH = 8
+
+
+def _words(name):
+    name = unicodedata.normalize('NFKC', name).lower()
+    head, comma, modifier = name.partition(',')
+    if comma:
+        name = f'{modifier} {head}'
+    return re.findall(r'[^\W_]+', name)
+
+def merge_key(name):
+    """
+    Spelling of a name that ignores case, punctuation and spaces, with "lök, gul" turned
+    into "gul lök" first. "Gul lök", "gullök" and "lök, gul" all become "gullök".
+    """
+    return ''.join(_words(name))
+
+def edited_at_end(first, second):
+    """
+    True when two merge keys only differ in their last letter, or one is the other with a
+    letter added at the end. In Swedish that is a different word more often than a typo:
+    "kokosmjölk" and "kokosmjöl" are a milk and a flour.
+    """
+    first, second = sorted([first, second], key=len)
+    if len(first) == len(second):
+        return first[:-1] == second[:-1]
+    return len(second) == len(first) + 1 and second.startswith(first)
+
+def blocking_keys(name):
+    """
+    The (kind, key) blocks a name is filed under: its merge key, its words in sorted order,
+    and as 'typo' its merge key as is and with each character but the last left out.
+    Names sharing none of them are never compared. Names a typo apart share a 'typo' block,
+    the one that leaves out the typo (or the shorter name itself when a character was left out).
+    Names shorter than TYPO_MIN_LENGTH are left out, except as the shorter name of a pair.
+    """
+    key = merge_key(name)
+    if not key:
+        return set()
+    blocks = {('name', key), ('words', ' '.join(sorted(_words(name))))}
+    if len(key) >= TYPO_MIN_LENGTH - 1:
+        blocks.add(('typo', key))
+    if len(key) >= TYPO_MIN_LENGTH:
+        blocks.update(('typo', key[:i] + key[i + 1:]) for i in range(len(key) - 1))
+    return blocks
+
+def duplicate_pairs(rows, threshold=DEFAULT_MERGE_THRESHOLD):
+    """
+    Yields (id, id, score) for pairs of (id, name) rows whose merge keys score at least threshold
+    with difflib's ratio, 1.0 for names with the same merge key or words. Only names sharing a
+    block of blocking_keys are compared, instead of every name with every other.
+    """
+    keys, blocks = {}, defaultdict(list)
+    for ingredient_id, name in rows:
+        keys[ingredient_id] = merge_key(name)
+        for block in blocking_keys(name):
+            blocks[block].append(ingredient_id)
+
+    compared = set()
+    matcher = SequenceMatcher(autojunk=False)
+    for (kind, _), ids in blocks.items():
+        for i, first in enumerate(ids):
+            matcher.set_seq2(keys[first])
+            for second in ids[i + 1:]:
+                pair = (first, second) if first < second else (second, first)
+                if pair in compared:
+                    continue
+                compared.add(pair)
+                if kind != 'typo' or keys[first] == keys[second]:
+                    yield *pair, 1.0
+                    continue
+                if edited_at_end(keys[first], keys[second]):
+                    continue
+                matcher.set_seq1(keys[second])
+                if matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold:
+                    score = matcher.ratio()
+                    if score >= threshold:
+                        yield *pair, score
+
+def duplicate_clusters(rows, threshold=DEFAULT_MERGE_THRESHOLD):
+    """
+    Groups (id, name) rows into sets of ids that are likely the same ingredient,
+    leaving out every name without a duplicate.
+    """
+    parent = {}
+
+    def find(ingredient_id):
+        root = ingredient_id
+        while parent.get(root, root) != root:
+            root = parent[root]
+        parent[ingredient_id] = root
+        return root
+
+    for first, second, _ in duplicate_pairs(rows, threshold):
+        first, second = find(first), find(second)
+        if first != second:
+            parent[max(first, second)] = min(first, second)
+
+    clusters = defaultdict(set)
+    for ingredient_id in parent:
+        clusters[find(ingredient_id)].add(ingredient_id)
+    return list(clusters.values())
+
+def merge_plan(threshold=DEFAULT_MERGE_THRESHOLD):
+    """
+    Returns the merges duplicate_clusters suggests for the whole catalog, as dicts with the
+    ingredient to keep and the ones to merge into it. The one used by the most recipe
+    ingredients is kept, so the fewest rows have to be repointed.
+    """
+    names = dict(ManagedIngredient.objects.values_list('id', 'name').iterator())
+    clusters = duplicate_clusters(names.items(), threshold)
+    uses = dict(
+        Ingredient.objects.filter(name_id__in={i for cluster in clusters for i in cluster})
+        .values('name_id').annotate(uses=Count('id')).values_list('name_id', 'uses')
+    )
+
+    def entry(ingredient_id):
+        return {'id': ingredient_id, 'name': names[ingredient_id], 'uses': uses.get(ingredient_id, 0)}
+
+    plan = []
+    for cluster in clusters:
+        ordered = sorted(cluster, key=lambda i: (-uses.get(i, 0), i))
+        plan.append({'keep': entry(ordered[0]), 'merge': [entry(i) for i in ordered[1:]]})
+    return sorted(plan, key=lambda merge: merge['keep']['name'].lower())
+
+def _fold_denonyms(keep, duplicates):
+    denonyms = list(keep.common_denonyms or [])
+    seen = {str(term).strip().lower() for term in [keep.name, *denonyms]}
+    for duplicate in duplicates:
+        for term in [duplicate.name, *(duplicate.common_denonyms or [])]:
+            if str(term).strip().lower() not in seen:
+                seen.add(str(term).strip().lower())
+                denonyms.append(term)
+    keep.common_denonyms = denonyms
+    keep.category = keep.category or next((d.category for d in duplicates if d.category), '')
+
+def apply_merges(plan):
+    """
+    Merges every {'keep': {'id'}, 'merge': [{'id'}]} entry of a plan in one transaction:
+    recipe ingredients are repointed to the kept ingredient, the names and common denonyms
+    of the others are added to its common denonyms and the others are deleted.
+    Entries whose kept ingredient no longer exists are skipped, as are deleted duplicates.
+    Returns the number of ingredients merged away and the number of recipes changed.
+    """
+    merges = {
+        merge['keep']['id']: [d['id'] for d in merge['merge'] if d['id'] != merge['keep']['id']]
+        for merge in plan
+    }
+    with transaction.atomic():
+        managed = ManagedIngredient.objects.in_bulk({i for keep, ids in merges.items() for i in [keep, *ids]})
+        kept, merged_ids, recipe_ids = [], [], set()
+        for keep_id, ids in merges.items():
+            duplicates = [managed[i] for i in ids if i in managed]
+            if keep_id not in managed or not duplicates:
+                continue
+            keep = managed[keep_id]
+            _fold_denonyms(keep, duplicates)
+            kept.append(keep)
+            repointed = Ingredient.objects.filter(name_id__in=[d.id for d in duplicates])
+            recipe_ids.update(repointed.values_list('recipe_id', flat=True))
+            repointed.update(name=keep)
+            merged_ids.extend(d.id for d in duplicates)
+
+        ManagedIngredient.objects.bulk_update(kept, ['common_denonyms', 'category'], batch_size=1000)
+        # Deleting runs the post_delete signal, which drops the duplicates from the ingredient index.
+        ManagedIngredient.objects.filter(id__in=merged_ids).delete()
+        # bulk_update and update() skip post_save, the kept ingredients and the recipes are updated here.
+        def reindex_kept():
+            for keep in kept:
+                index_managed_ingredient(keep)
+            bump_catalog_version()
+
+        transaction.on_commit(reindex_kept)
+        recipes_changed(recipe_ids)
+    return len(merged_ids), len(recipe_ids)
@@ -0,0 +1,79 @@
+from collections import defaultdict
+
+import numpy as np
+
+from recipes.models import Ingredient, Recipe
+
+# Amounts are stored in the canonical unit of their kind so they can be added up
+# across recipes: weights in grams and volumes in milliliters.
+CANONICAL_UNITS = {
+    'g': ('g', 1), 'kg': ('g', 1000),
+    'ml': ('ml', 1), 'cl': ('ml', 10), 'dl': ('ml', 100), 'liter': ('ml', 1000),
+    'krm': ('ml', 1), 'tsk': ('ml', 5), 'msk': ('ml', 15),
+    'st': ('st', 1), 'nypa': ('nypa', 1), 'klyfta': ('klyfta', 1),
+}
+VECTOR_UNITS = ['g', 'ml', 'st', 'nypa', 'klyfta']
+UNIT_CODES = {unit: code for code, unit in enumerate(VECTOR_UNITS)}
+
+# One entry per managed ingredient and canonical unit, quantities are per serving.
+VECTOR_DTYPE = np.dtype([('ingredient', '<i8'), ('unit', 'u1'), ('quantity', '<f8')])
+
+REBUILD_BATCH_SIZE = 500
+
+
+def pack_vector(rows, servings):
+    """
+    Turns (managed ingredient id, unit, quantity) rows of one recipe into the bytes
+    stored in Recipe.ingredient_vector. Recipes without servings get an empty vector,
+    the same recipes the shopping list query leaves out.
+    """
+    if not servings or servings <= 0:
+        return b''
+    totals = defaultdict(float)
+    for ingredient_id, unit, quantity in rows:
+        # Units outside UNIT_CHOICES are counted as pieces, like scraped recipes do.
+        canonical, factor = CANONICAL_UNITS.get(unit, ('st', 1))
+        totals[ingredient_id, UNIT_CODES[canonical]] += (quantity or 0) * factor / servings
+    vector = np.array([(ingredient_id, code, quantity) for (ingredient_id, code), quantity in totals.items()], dtype=VECTOR_DTYPE)
+    return vector.tobytes()
+
+def unpack_vector(data):
+    return np.frombuffer(data or b'', dtype=VECTOR_DTYPE)
+
+def rebuild_ingredient_vectors(recipe_ids):
+    """
+    Recomputes the stored vectors of the given recipes from their Ingredient rows.
+    """
+    recipe_ids = sorted(set(recipe_ids))
+    for start in range(0, len(recipe_ids), REBUILD_BATCH_SIZE):
+        batch = recipe_ids[start:start + REBUILD_BATCH_SIZE]
+        rows = defaultdict(list)
+        for recipe_id, *row in Ingredient.objects.filter(recipe_id__in=batch).values_list('recipe_id', 'name_id', 'unit', 'quantity'):
+            rows[recipe_id].append(row)
+        recipes = list(Recipe.objects.filter(id__in=batch).only('id', 'servings'))
+        for recipe in recipes:
+            recipe.ingredient_vector = pack_vector(rows[recipe.id], recipe.servings)
+        Recipe.objects.bulk_update(recipes, ['ingredient_vector'])
+
+def sum_vectors(guests_per_recipe):
+    """
+    Adds up the vectors of many recipes, each scaled to its number of guests.
+    Takes a {recipe id: guests} dictionary and returns (managed ingredient id, unit, quantity)
+    tuples in canonical units, ordered by ingredient id and unit.
+    """
+    vectors, guests = [], []
+    for recipe_id, data in Recipe.objects.filter(id__in=list(guests_per_recipe)).values_list('id', 'ingredient_vector'):
+        vectors.append(unpack_vector(data))
+        guests.append(guests_per_recipe[recipe_id])
+    if not vectors:
+        return []
+
+    merged = np.concatenate(vectors)
+    weights = np.repeat(np.array(guests, dtype=np.float64), [len(vector) for vector in vectors])
+    keys = merged['ingredient'] * len(VECTOR_UNITS) + merged['unit']
+    unique_keys, positions = np.unique(keys, return_inverse=True)
+    totals = np.bincount(positions, weights=merged['quantity'] * weights)
+    return [
+        (key // len(VECTOR_UNITS), VECTOR_UNITS[key % len(VECTOR_UNITS)], total)
+        for key, total in zip(unique_keys.tolist(), totals.tolist())
+    ]
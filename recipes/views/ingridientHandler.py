@@ -1,8 +1,18 @@
 from recipes.models import ManagedIngredient
 from recipes.forms import ManagedIngredientForm
 from django.shortcuts import render, redirect, get_object_or_404
+from django.conf import settings
+from django.core.cache import cache
 from django.http import JsonResponse
-from difflib import get_close_matches
+from django.db.models import Q
+from django.db.models.functions import Length, Lower
+from django.utils.cache import patch_cache_control
+from .ingredientIndex import get_ingredient_index
+from asgiref.sync import sync_to_async
+import hashlib
+import time
+
+CATALOG_VERSION_KEY = 'managed_ingredients:version'
 
 
 def manage_ingredients(request):
@@ -45,43 +55,174 @@ def delete_managed_ingredient(request, pk):
         return redirect('manage_ingredients')
     return redirect('manage_ingredients')
 
+def catalog_version():
+    """
+    Returns a stamp that changes whenever a managed ingredient is saved or deleted.
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+async def acatalog_version():
+    version = await cache.aget(CATALOG_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CATALOG_VERSION_KEY, time.time_ns(), None)
+        version = await cache.aget(CATALOG_VERSION_KEY)
+    return version
+
+def bump_catalog_version():
+    cache.set(CATALOG_VERSION_KEY, time.time_ns(), None)
+
+def _name_matches(query, found, limit):
+    """
+    The name queries of rank_ingredients, best first: names starting with the query,
+    names with a word starting with it and names containing it. Shorter names rank first within a query.
+    """
+    for condition in [Q(name__istartswith=query), Q(name__icontains=f' {query}'), Q(name__icontains=query)]:
+        yield (
+            ManagedIngredient.objects.filter(condition).exclude(id__in=found)
+            .order_by(Length('name'), 'name').values('id', 'name')[:limit]
+        )
+
+def rank_ingredients(query, limit):
+    """
+    Returns up to `limit` managed ingredients matching the query, best first:
+    names starting with the query, names with a word starting with it, names containing it
+    and finally ingredients with a matching common denonym. Shorter names rank first within a group.
+    """
+    results = []
+    found = set()
+    for matches in _name_matches(query, found, limit):
+        for match in matches[:limit - len(results)]:
+            found.add(match['id'])
+            results.append(match)
+        if len(results) >= limit:
+            return results
+
+    ids = [i for i in get_ingredient_index().containing(query, limit * 2) if i not in found]
+    by_id = ManagedIngredient.objects.in_bulk(ids[:limit - len(results)])
+    results.extend({'id': i, 'name': by_id[i].name} for i in ids if i in by_id)
+    return results
+
+async def arank_ingredients(query, limit):
+    """
+    Async version of rank_ingredients on the async ORM.
+    """
+    results = []
+    found = set()
+    for matches in _name_matches(query, found, limit):
+        async for match in matches[:limit - len(results)]:
+            found.add(match['id'])
+            results.append(match)
+        if len(results) >= limit:
+            return results
+
+    # The index is built from the database on first use.
+    index = await sync_to_async(get_ingredient_index)()
+    ids = [i for i in index.containing(query, limit * 2) if i not in found]
+    by_id = await ManagedIngredient.objects.ain_bulk(ids[:limit - len(results)])
+    results.extend({'id': i, 'name': by_id[i].name} for i in ids if i in by_id)
+    return results
+
+def _autocomplete_key(query, version):
+    digest = hashlib.md5(query.lower().encode()).hexdigest()
+    return f'autocomplete:{version}:{settings.AUTOCOMPLETE_LIMIT}:{digest}'
+
+def _autocomplete_response(ingredients):
+    response = JsonResponse(ingredients, safe=False)
+    patch_cache_control(response, private=True, max_age=settings.AUTOCOMPLETE_BROWSER_MAX_AGE)
+    return response
+
 def autocomplete_ingredient(request):
     """
     Autocomplete for ingredients.
-    Returns a JSON response with ingredient names matching the query.
+    Returns a JSON response with the best ranked ingredients matching the query.
+    Queries shorter than AUTOCOMPLETE_MIN_LENGTH return an empty list.
+    """
+    query = request.GET.get('q', '').strip()
+    if len(query) < settings.AUTOCOMPLETE_MIN_LENGTH:
+        ingredients = []
+    else:
+        key = _autocomplete_key(query, catalog_version())
+        ingredients = cache.get(key)
+        if ingredients is None:
+            ingredients = rank_ingredients(query, settings.AUTOCOMPLETE_LIMIT)
+            cache.set(key, ingredients, settings.AUTOCOMPLETE_CACHE_TIMEOUT)
+    return _autocomplete_response(ingredients)
+
+async def autocomplete_ingredient_async(request):
+    """
+    Async version of autocomplete_ingredient, served instead of it under ASGI.
+    """
+    query = request.GET.get('q', '').strip()
+    if len(query) < settings.AUTOCOMPLETE_MIN_LENGTH:
+        ingredients = []
+    else:
+        key = _autocomplete_key(query, await acatalog_version())
+        ingredients = await cache.aget(key)
+        if ingredients is None:
+            ingredients = await arank_ingredients(query, settings.AUTOCOMPLETE_LIMIT)
+            await cache.aset(key, ingredients, settings.AUTOCOMPLETE_CACHE_TIMEOUT)
+    return _autocomplete_response(ingredients)
+
+def managed_ingredients_named(names):
+    """
+    Managed ingredients whose name is one of `names` in any case, annotated with lower_name.
+    Filters on lower(name), which has an index, unlike name__iexact.
     """
-    query = request.GET.get('q', '')
-    ingredients = ManagedIngredient.objects.filter(name__icontains=query).values('id', 'name')
-    return JsonResponse(list(ingredients), safe=False)
+    return ManagedIngredient.objects.annotate(lower_name=Lower('name')).filter(lower_name__in=[name.lower() for name in names])
+
+def get_or_create_managed_ingredient(name):
+    """
+    Returns the managed ingredient with this name in any case, created when there is none.
+    """
+    ingredient = next(iter(managed_ingredients_named([name])[:1]), None)
+    if ingredient is None:
+        ingredient, _ = ManagedIngredient.objects.get_or_create(name=name)
+    return ingredient
 
 def find_or_create_ingredient(name):
     """
     Finds a ManagedIngredient by name or prepares data for creation.
     Returns a dictionary with either the ingredient's ID or data for a new one.
     """
-    try:
-        # Try exact match (case-insensitive)
-        ingredient = ManagedIngredient.objects.get(name__iexact=name)
-        return {'id': ingredient.id, 'name': ingredient.name, 'action': 'match'}
-    except ManagedIngredient.DoesNotExist:
-        # Get all ingredient names for fuzzy matching if no exact match found
-        all_names = ManagedIngredient.objects.values_list('name', flat=True)
-        close_matches = get_close_matches(name, all_names, n=1, cutoff=0.8)
-        if close_matches:
-            # If close match found, return that ingredient's info
-            ingredient = ManagedIngredient.objects.get(name=close_matches[0])
-            return {'id': ingredient.id, 'name': ingredient.name, 'action': 'match'}
+    return resolve_ingredients([name])[0]
+
+def resolve_ingredients(names):
+    """
+    Matches many ingredient names at once.
+    Exact (case-insensitive) matches are found in a single query, the remaining names
+    are fuzzy matched through the ingredient index. Returns one dictionary per name in
+    input order, shaped like the result of find_or_create_ingredient.
+    """
+    unique = {}
+    for name in names:
+        unique.setdefault(name.strip().lower(), name)
+
+    exact = {}
+    matches = managed_ingredients_named(unique).values_list('lower_name', 'id', 'name')
+    for lower_name, ingredient_id, ingredient_name in matches:
+        exact.setdefault(lower_name, (ingredient_id, ingredient_name))
+
+    resolved = {}
+    index = get_ingredient_index() if len(exact) < len(unique) else None
+    for key, name in unique.items():
+        # Fuzzy match against names and common denonyms through the trigram index
+        match = exact.get(key) or index.best_match(name)
+        if match:
+            resolved[key] = {'id': match[0], 'name': match[1], 'action': 'match'}
         else:
             # No close match found, suggest creation
-            return {'id': None, 'name': name, 'action': 'create'}
+            resolved[key] = {'id': None, 'name': name, 'action': 'create'}
+
+    return [resolved[name.strip().lower()] for name in names]
 
 def create_managed_ingredient_from_recipe(request):
     if request.method == 'POST':
         ingredient_name = request.POST.get('name')
         if ingredient_name:
-            ingredient, created = ManagedIngredient.objects.get_or_create(
-                name__iexact=ingredient_name,
-                defaults={'name': ingredient_name}
-            )
+            ingredient = get_or_create_managed_ingredient(ingredient_name)
             return JsonResponse({'id': ingredient.id, 'name': ingredient.name})
     return JsonResponse({'error': 'Invalid request'}, status=400)
\ No newline at end of file
@@ -1,7 +1,177 @@
-from playwright.sync_api import sync_playwright
+from .browserPool import get_browser_pool
+from .pageLoading import open_page
 from .pages import SITE_CONFIGS
-from .parser import parse_ingredient
+from .scrapeCache import cache_recipe, canonicalize_url, get_cached_recipe
+from .scrapeScheduler import RETRY_STATUSES, RetryableStatus, politely, retry_after_seconds
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures import Future
+import html
+import json
+import logging
 import re
+import requests
+import threading
+
+logger = logging.getLogger(__name__)
+
+STATIC_FETCH_TIMEOUT = 10
+STATIC_FETCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept-Language": "sv-SE,sv;q=0.9,en;q=0.8",
+}
+
+_in_flight = {}
+_lock = threading.Lock()
+
+
+def _collect_links(page, config):
+    open_page(page, config["start_url"], config, [config["link_selector"]])
+    return page.eval_on_selector_all(config["link_selector"], config["href_extractor"])
+
+def _eval(page, config, field):
+    try:
+        return page.eval_on_selector(config[f"{field}_selector"], config[f"{field}_extractor"])
+    except Exception:
+        return None
+
+def _collect_recipe(page, url, config):
+    open_page(page, url, config)
+    return {
+        "title": _eval(page, config, "title") or "",
+        "description": _eval(page, config, "description") or "",
+        "servings": _eval(page, config, "servings") or "",
+        "ingredients": page.eval_on_selector_all(
+            config["ingredients_selector"], config["ingredients_extractor"]
+        ),
+    }
+
+def _is_recipe(node):
+    types = node.get("@type")
+    return types == "Recipe" or (isinstance(types, list) and "Recipe" in types)
+
+def _find_jsonld_recipe(node):
+    """
+    Finds the schema.org Recipe in a parsed JSON-LD document, which may be a list or an @graph.
+    """
+    if isinstance(node, list):
+        for item in node:
+            found = _find_jsonld_recipe(item)
+            if found:
+                return found
+    elif isinstance(node, dict):
+        if _is_recipe(node):
+            return node
+        return _find_jsonld_recipe(node.get("@graph", []))
+    return None
+
+def _first_number(value):
+    if isinstance(value, list):
+        value = " ".join(str(v) for v in value)
+    match = re.search(r"\d+", str(value or ""))
+    return int(match.group()) if match else None
+
+def _text(value):
+    return html.unescape(str(value or "")).strip()
+
+def _extract_jsonld(content):
+    """
+    Reads title, description, servings and ingredients from schema.org Recipe JSON-LD.
+    """
+    scripts = BeautifulSoup(content, "html.parser", parse_only=SoupStrainer("script", type="application/ld+json"))
+    for script in scripts.find_all("script"):
+        try:
+            recipe = _find_jsonld_recipe(json.loads(script.string or ""))
+        except ValueError:
+            continue
+        if recipe:
+            ingredients = recipe.get("recipeIngredient") or recipe.get("ingredients") or []
+            return {
+                "title": _text(recipe.get("name")),
+                "description": _text(recipe.get("description")),
+                "servings": _first_number(recipe.get("recipeYield")) or "",
+                "ingredients": [_text(line) for line in ingredients if _text(line)],
+            }
+    return {"title": "", "description": "", "servings": "", "ingredients": []}
+
+def _extract_html(content, config):
+    """
+    Runs the SITE_CONFIGS selectors against the static html, for sites that render server side.
+    """
+    soup = BeautifulSoup(content, "html.parser")
+
+    def select_text(field):
+        element = soup.select_one(config[f"{field}_selector"])
+        return element.get_text().strip() if element else ""
+
+    return {
+        "title": select_text("title"),
+        "description": select_text("description"),
+        "servings": _first_number(select_text("servings")) or "",
+        "ingredients": [e.get_text().strip() for e in soup.select(config["ingredients_selector"])],
+    }
+
+def fetch_static(url, etag="", last_modified=""):
+    """
+    Fetches a page over plain HTTP. The validators of an earlier fetch are sent along,
+    so sites that support it answer an unchanged page with 304 Not Modified.
+    Returns the response, or None when the page could not be loaded.
+    Raises RetryableStatus when the site answers 429 or 5xx.
+    """
+    headers = dict(STATIC_FETCH_HEADERS)
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        response = requests.get(url, headers=headers, timeout=STATIC_FETCH_TIMEOUT)
+        if response.status_code in RETRY_STATUSES:
+            raise RetryableStatus(url, response.status_code, retry_after_seconds(response.headers.get("Retry-After")))
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logger.info("Static fetch of %s failed: %s", url, e)
+        return None
+    return response
+
+def extract_content(content, config):
+    """
+    Reads a recipe from a fetched page, JSON-LD first, then the configured selectors.
+    Returns None when the title or ingredients are still missing.
+    """
+    recipe = _extract_jsonld(content)
+    recipe["tier"] = "jsonld"
+    if not (recipe["title"] and recipe["ingredients"] and recipe["servings"]):
+        from_html = _extract_html(content, config)
+        for field, value in from_html.items():
+            if not recipe[field] and value:
+                recipe[field] = value
+                recipe["tier"] = "html"
+
+    if recipe["title"] and recipe["ingredients"]:
+        return recipe
+    return None
+
+def extract_static(url, config):
+    """
+    Browserless fast path: fetches the page over plain HTTP and reads JSON-LD, then the
+    configured selectors. Returns None when the title or ingredients are still missing
+    so the caller can fall back to the headless browser.
+    """
+    response = fetch_static(url)
+    if response is None:
+        return None
+    return extract_content(response.content, config)
+
+def scrape_tiered(url, config):
+    """
+    Tries the static fast path and only renders the page in a browser when it comes up short.
+    The returned recipe records the tier that served it in "tier".
+    """
+    recipe = politely(url, extract_static, url, config)
+    if recipe is None:
+        recipe = politely(url, get_browser_pool().run, _collect_recipe, url, config)
+        recipe["tier"] = "browser"
+    logger.info("Scraped %s with the %s tier", url, recipe["tier"])
+    return recipe
 
 def find_all_recipe_links(site_key):
     """
@@ -9,68 +179,62 @@ def find_all_recipe_links(site_key):
     Returns a list of links that match the recipe pattern.
     """
     config = SITE_CONFIGS[site_key]
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
-        page.goto(config["start_url"])
-        hrefs = page.eval_on_selector_all(config["link_selector"], config["href_extractor"])
-        links = [href for href in hrefs if config["recipe_pattern"].match(href)]
-        browser.close()
-        return links
+    hrefs = politely(config["start_url"], get_browser_pool().run, _collect_links, config)
+    links = [href for href in hrefs if config["recipe_pattern"].match(href)]
+    return links
+
+def find_recipe(url, site_key, refresh=False):
+    """
+    Scrapes title, description, servings and ingredients from a single page load.
+    Results are served from the scrape cache when possible, pass refresh=True to
+    load the page again. Concurrent calls for the same url share one page load.
+    """
+    if not refresh:
+        cached = get_cached_recipe(url, site_key)
+        if cached is not None:
+            return cached
+
+    key = (canonicalize_url(url), site_key)
+    with _lock:
+        flight = _in_flight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _in_flight[key] = Future()
+
+    if not leader:
+        return flight.result()
+
+    config = SITE_CONFIGS[site_key]
+    logger.debug("Scraping recipe from %s using site key %s", url, site_key)
+    try:
+        result = scrape_tiered(url, config)
+        cache_recipe(url, site_key, result)
+    except BaseException as e:
+        with _lock:
+            del _in_flight[key]
+        flight.set_exception(e)
+        raise
+
+    with _lock:
+        del _in_flight[key]
+    flight.set_result(result)
+    return result
 
 def find_ingridients_from_recipe(url, site_key):
     """
     Scrapes ingredients from a recipe page.
     Returns a list of ingredients found on the page.
     """
-    config = SITE_CONFIGS[site_key]
-    print(f"Scraping ingredients from {url} using site key {site_key}")
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
-        # Adding timeout for page loading
-        page.goto(url, wait_until="networkidle")
-        ingredients = page.eval_on_selector_all(
-            config["ingredients_selector"], config["ingredients_extractor"]
-        )
-        browser.close()
-        return ingredients
-    
+    return find_recipe(url, site_key)["ingredients"]
+
 def find_recipe_details(url, site_key):
     """
     Scrapes recipe details like title, description, and servings.
     Returns a dictionary with the scraped details.
     """
-    config = SITE_CONFIGS[site_key]
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
-        page.goto(url, wait_until="networkidle")
-
-        print(f"Scraping recipe details from {url} using site key {site_key}")
-
-        try:
-            title = page.eval_on_selector(config["title_selector"], config["title_extractor"])
-        except Exception:
-            title = None
-
-        try:
-            description = page.eval_on_selector(config["description_selector"], config["description_extractor"])
-        except Exception:
-            description = None
-
-        try:
-            servings = page.eval_on_selector(config["servings_selector"], config["servings_extractor"])
-        except Exception:
-            servings = None
-
-        print(f"Title: {title}")
-        print(f"Description: {description}")
-        print(f"Servings: {servings}")
-
-        browser.close()
-        return {
-            "title": title or "",
-            "description": description or "",
-            "servings": servings or ""
-        }
\ No newline at end of file
+    recipe = find_recipe(url, site_key)
+    return {
+        "title": recipe["title"],
+        "description": recipe["description"],
+        "servings": recipe["servings"]
+    }
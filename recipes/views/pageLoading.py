@@ -0,0 +1,65 @@
+import time
+
+from .scrapeScheduler import RETRY_STATUSES, RetryableStatus, retry_after_seconds
+
+# Used for SITE_CONFIGS entries that do not set their own load strategy.
+DEFAULT_NAVIGATION_TIMEOUT = 20
+DEFAULT_BLOCKED_RESOURCE_TYPES = ["image", "media", "font"]
+
+
+def ready_selectors(config):
+    """
+    The selectors that have to be in the DOM before a recipe page counts as loaded.
+    """
+    return config.get("ready_selectors") or [config["title_selector"], config["ingredients_selector"]]
+
+def should_block(config, resource_type, url):
+    """
+    True for requests a scrape never needs: the site's blocked resource types and
+    urls containing one of its blocked patterns, like ad and analytics hosts.
+    """
+    if resource_type in config.get("blocked_resource_types", DEFAULT_BLOCKED_RESOURCE_TYPES):
+        return True
+    return any(pattern in url for pattern in config.get("blocked_url_patterns", ()))
+
+def _route_handler(config):
+    def handle(route):
+        request = route.request
+        if should_block(config, request.resource_type, request.url):
+            return route.abort()
+        return route.continue_()
+    return handle
+
+def _check_status(url, response):
+    if response is not None and response.status in RETRY_STATUSES:
+        raise RetryableStatus(url, response.status, retry_after_seconds(response.headers.get("retry-after")))
+
+def open_page(page, url, config, selectors=None):
+    """
+    Loads url in a sync playwright page with the site's load strategy. Blocked requests are
+    aborted, and instead of waiting for the network to go quiet the page counts as loaded
+    as soon as every ready selector is present. Raises playwright's TimeoutError when that
+    takes longer than the site's navigation_timeout, RetryableStatus when the site answers 429 or 5xx.
+    """
+    timeout = config.get("navigation_timeout", DEFAULT_NAVIGATION_TIMEOUT)
+    deadline = time.monotonic() + timeout
+    # Pages are reused across sites, the handler of an earlier site is replaced.
+    page.unroute("**/*")
+    page.route("**/*", _route_handler(config))
+    _check_status(url, page.goto(url, wait_until="commit", timeout=timeout * 1000))
+    for selector in selectors or ready_selectors(config):
+        remaining = max(deadline - time.monotonic(), 0.001)
+        page.wait_for_selector(selector, state="attached", timeout=remaining * 1000)
+
+async def open_page_async(page, url, config, selectors=None):
+    """
+    open_page for playwright.async_api pages.
+    """
+    timeout = config.get("navigation_timeout", DEFAULT_NAVIGATION_TIMEOUT)
+    deadline = time.monotonic() + timeout
+    await page.unroute("**/*")
+    await page.route("**/*", _route_handler(config))
+    _check_status(url, await page.goto(url, wait_until="commit", timeout=timeout * 1000))
+    for selector in selectors or ready_selectors(config):
+        remaining = max(deadline - time.monotonic(), 0.001)
+        await page.wait_for_selector(selector, state="attached", timeout=remaining * 1000)
@@ -1,8 +1,18 @@
 import re
 
-
+# Ad, analytics and consent hosts, a scrape never needs what they serve.
+TRACKER_PATTERNS = [
+    "googletagmanager.com", "google-analytics.com", "doubleclick.net", "googlesyndication.com",
+    "adservice.google.", "facebook.net", "connect.facebook.", "hotjar.com", "cookielaw.org",
+    "onetrust.com", "cookiebot.com", "adnxs.com", "criteo.", "scorecardresearch.com",
+]
 
 # A dictionary to hold the site settings for the scraper.
+# The browser considers a page loaded once all ready_selectors are present (default: the title and
+# ingredients selectors) and gives up after navigation_timeout seconds. Requests of the
+# blocked_resource_types and to urls containing a blocked_url_patterns entry are aborted,
+# see views/pageLoading.py. Every site gets rate_limit requests per second with bursts of up to
+# burst requests, and at most max_in_flight at the same time, see views/scrapeScheduler.py.
 SITE_CONFIGS = {
     "ica.se": {
         "start_url": "https://www.ica.se/recept/",
@@ -16,9 +26,14 @@ SITE_CONFIGS = {
         "description_selector": "div.recipe-header__preamble",
         "description_extractor": "element => element.textContent.trim()",
         "servings_selector": "div.change-portions-wrapper",
-        "servings_extractor": "element => { const match = element.textContent.match(/\\d+/); return match ? parseInt(match[0], 10) : null; }"
-
-
+        "servings_extractor": "element => { const match = element.textContent.match(/\\d+/); return match ? parseInt(match[0], 10) : null; }",
+        "ready_selectors": ["h1.recipe-header__title", "div.ingredients-list-group__card"],
+        "navigation_timeout": 15,
+        "blocked_resource_types": ["image", "media", "font", "stylesheet"],
+        "blocked_url_patterns": TRACKER_PATTERNS,
+        "rate_limit": 2.0,
+        "burst": 4,
+        "max_in_flight": 4,
     },
     "koket.se": {
         "start_url": "https://www.koket.se/",
@@ -32,6 +47,13 @@ SITE_CONFIGS = {
         "description_selector": "div.koket_markdown_mdWrapper__trCli",
         "description_extractor": "element => element.textContent.trim()",
         "servings_selector": "span.portions_portions__Iwly7",
-        "servings_extractor": "element => parseInt(element.textContent.match(/\\d+/)[0], 10)"
+        "servings_extractor": "element => parseInt(element.textContent.match(/\\d+/)[0], 10)",
+        "ready_selectors": ["h1.recipe_title__Al9fM", "li.ingredient_wrapper__uRhJx"],
+        "navigation_timeout": 15,
+        "blocked_resource_types": ["image", "media", "font", "stylesheet"],
+        "blocked_url_patterns": TRACKER_PATTERNS,
+        "rate_limit": 2.0,
+        "burst": 4,
+        "max_in_flight": 4,
     }
 }
@@ -0,0 +1,66 @@
+import re
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from recipes.models import ManagedIngredient, Recipe
+from .fragmentCache import render_recipe_cards
+from .ingridientHandler import resolve_ingredients
+from .pantryIndex import get_pantry_index
+
+
+def cookable_recipes(pantry, limit=None):
+    """
+    Returns the recipes best covered by the managed ingredient ids in the pantry, as dicts with
+    id, title, servings, updated_at, the names of the missing ingredients and the ingredient count.
+    """
+    limit = limit or settings.RECIPE_PAGE_SIZE
+    matches = get_pantry_index().match(pantry, limit)
+    recipes = {
+        recipe['id']: recipe
+        for recipe in Recipe.objects.filter(id__in=[recipe_id for recipe_id, _, _ in matches]).values('id', 'title', 'servings', 'updated_at')
+    }
+    names = dict(
+        ManagedIngredient.objects.filter(id__in={i for _, missing, _ in matches for i in missing}).values_list('id', 'name')
+    )
+    return [
+        {**recipes[recipe_id], 'missing': [names[i] for i in missing if i in names], 'total': total}
+        for recipe_id, missing, total in matches if recipe_id in recipes
+    ]
+
+def what_can_i_cook(request):
+    """
+    Takes the ingredients the user has at home as free text, one per line or comma separated,
+    and lists the recipes that need the fewest extra ingredients.
+    """
+    have = request.GET.get('have', '')
+    names = [name.strip() for name in re.split(r'[,\n]', have) if name.strip()]
+    matched, unknown = {}, []
+    for name, match in zip(names, resolve_ingredients(names)):
+        if match['action'] == 'match':
+            matched[match['id']] = match['name']
+        else:
+            unknown.append(name)
+
+    results = cookable_recipes(list(matched)) if matched else []
+    return render(request, 'recipes/pantry.html', {
+        'have': have,
+        'matched': sorted(matched.values()),
+        'unknown': unknown,
+        'cards': list(zip(results, render_recipe_cards(results))),
+    })
+
+def pantry_api(request):
+    """
+    JSON version of what_can_i_cook, takes managed ingredient ids: ingredients=1,2,3.
+    """
+    pantry = [int(part) for part in request.GET.get('ingredients', '').split(',') if part.strip().isdigit()]
+    if not pantry:
+        return JsonResponse({'error': 'At least one ingredient id is required.'}, status=400)
+    limit = request.GET.get('limit', '')
+    limit = min(int(limit), 100) if limit.isdigit() and int(limit) > 0 else None
+    results = cookable_recipes(pantry, limit)
+    return JsonResponse({'recipes': [
+        {key: recipe[key] for key in ('id', 'title', 'servings', 'missing', 'total')} for recipe in results
+    ]})
@@ -0,0 +1,141 @@
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from recipes.models import Ingredient
+
+
+class PantryIndex:
+    """
+    In-memory inverted index from managed ingredient to the recipes that use it.
+    Recipes get a dense position, each ingredient keeps a sorted array of positions,
+    so the ingredients a pantry covers per recipe are counted with one bincount.
+    """
+
+    def __init__(self):
+        self.recipe_ids = []          # position -> recipe id, None for removed recipes
+        self.positions = {}           # recipe id -> position
+        self.recipe_ingredients = {}  # recipe id -> frozenset of managed ingredient ids
+        self.postings = {}            # managed ingredient id -> set of positions
+        self.arrays = {}              # managed ingredient id -> sorted positions, rebuilt on demand
+        self.sizes = np.zeros(0, dtype=np.int32)
+        self.built_at = None
+        self.lock = threading.RLock()
+
+    def build(self, rows):
+        """
+        Replaces the index contents with (recipe id, managed ingredient id) rows.
+        The new index is built on the side, lookups keep using the old one until it is swapped in.
+        """
+        ingredients = {}
+        for recipe_id, ingredient_id in rows:
+            ingredients.setdefault(recipe_id, set()).add(ingredient_id)
+        fresh = PantryIndex()
+        fresh.update(ingredients)
+        with self.lock:
+            self.recipe_ids, self.positions = fresh.recipe_ids, fresh.positions
+            self.recipe_ingredients, self.postings = fresh.recipe_ingredients, fresh.postings
+            self.arrays, self.sizes = {}, fresh.sizes
+            self.built_at = time.monotonic()
+
+    def update(self, ingredients):
+        """
+        Sets the ingredients of recipes from a {recipe id: managed ingredient ids} dictionary.
+        An empty set removes the recipe.
+        """
+        with self.lock:
+            new_positions = [recipe_id for recipe_id, ids in ingredients.items() if ids and recipe_id not in self.positions]
+            if new_positions:
+                for recipe_id in new_positions:
+                    self.positions[recipe_id] = len(self.recipe_ids)
+                    self.recipe_ids.append(recipe_id)
+                self.sizes = np.concatenate([self.sizes, np.zeros(len(new_positions), dtype=np.int32)])
+
+            for recipe_id, ids in ingredients.items():
+                position = self.positions.get(recipe_id)
+                if position is None:
+                    continue
+                old = self.recipe_ingredients.pop(recipe_id, frozenset())
+                new = frozenset(ids)
+                for ingredient_id in old - new:
+                    self.postings[ingredient_id].discard(position)
+                    self.arrays.pop(ingredient_id, None)
+                for ingredient_id in new - old:
+                    self.postings.setdefault(ingredient_id, set()).add(position)
+                    self.arrays.pop(ingredient_id, None)
+                self.sizes[position] = len(new)
+                if new:
+                    self.recipe_ingredients[recipe_id] = new
+                else:
+                    # Positions are not reused, the next full build compacts them.
+                    del self.positions[recipe_id]
+                    self.recipe_ids[position] = None
+
+    def _array(self, ingredient_id):
+        array = self.arrays.get(ingredient_id)
+        if array is None:
+            array = self.arrays[ingredient_id] = np.array(sorted(self.postings.get(ingredient_id, ())), dtype=np.int32)
+        return array
+
+    def match(self, pantry, limit):
+        """
+        Ranks the recipes sharing at least one ingredient with the pantry: recipes that can be
+        made right away first, then by fewest missing ingredients and most covered ones.
+        Returns up to `limit` (recipe id, missing ingredient ids, number of ingredients) tuples.
+        """
+        with self.lock:
+            arrays = [self._array(ingredient_id) for ingredient_id in set(pantry) if ingredient_id in self.postings]
+            if not arrays:
+                return []
+            covered = np.bincount(np.concatenate(arrays), minlength=len(self.sizes))
+            candidates = np.flatnonzero(covered)
+            missing = self.sizes[candidates] - covered[candidates]
+
+            # Sort by missing, then by covered descending, then by position for a stable order.
+            score = missing.astype(np.int64) * (len(pantry) + 1) - covered[candidates]
+            if len(candidates) > limit:
+                best = np.argpartition(score, limit - 1)[:limit]
+                candidates, score = candidates[best], score[best]
+            order = np.lexsort((candidates, score))
+
+            pantry = frozenset(pantry)
+            results = []
+            for position in candidates[order].tolist():
+                recipe_id = self.recipe_ids[position]
+                ingredients = self.recipe_ingredients[recipe_id]
+                results.append((recipe_id, sorted(ingredients - pantry), len(ingredients)))
+            return results
+
+    def is_stale(self):
+        return self.built_at is None or time.monotonic() - self.built_at > settings.PANTRY_INDEX_TTL
+
+
+_index = PantryIndex()
+_rebuild_lock = threading.Lock()
+
+
+def get_pantry_index():
+    """
+    Returns the process-wide index, built from the database on first use. Changes made in this
+    process are applied through recipes_changed, other workers' changes after PANTRY_INDEX_TTL seconds.
+    """
+    if _index.is_stale() and _rebuild_lock.acquire(blocking=_index.built_at is None):
+        try:
+            if _index.is_stale():
+                _index.build(Ingredient.objects.values_list('recipe_id', 'name_id').iterator(chunk_size=10000))
+        finally:
+            _rebuild_lock.release()
+    return _index
+
+def reindex_pantry(recipe_ids):
+    """
+    Reloads the ingredients of the given recipes into the index, if it has been built.
+    """
+    if _index.built_at is None:
+        return
+    ingredients = {recipe_id: set() for recipe_id in recipe_ids}
+    for recipe_id, ingredient_id in Ingredient.objects.filter(recipe_id__in=list(ingredients)).values_list('recipe_id', 'name_id'):
+        ingredients[recipe_id].add(ingredient_id)
+    _index.update(ingredients)
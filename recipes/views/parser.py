@@ -1,9 +1,50 @@
 import re
 from fractions import Fraction
+from functools import lru_cache
+
+from recipes.models import Ingredient
+
+# Spellings found on recipe sites, mapped onto the units of Ingredient.UNIT_CHOICES.
+UNIT_ALIASES = {
+    "g": "g", "gr": "g", "gram": "g",
+    "kg": "kg", "kilo": "kg", "kilogram": "kg",
+    "l": "liter", "liter": "liter", "litre": "liter",
+    "dl": "dl", "deciliter": "dl",
+    "cl": "cl", "centiliter": "cl",
+    "ml": "ml", "milliliter": "ml",
+    "krm": "krm", "kryddmått": "krm",
+    "tsk": "tsk", "tesked": "tsk", "teskedar": "tsk",
+    "msk": "msk", "matsked": "msk", "matskedar": "msk",
+    "st": "st", "styck": "st", "stycken": "st",
+    "nypa": "nypa", "nypor": "nypa",
+    "klyfta": "klyfta", "klyftor": "klyfta",
+}
+UNIT_ALIASES.update({unit: unit for unit, _ in Ingredient.UNIT_CHOICES})
+
+PREFIXES = {"ca", "ungefär", "cirka", "drygt"}
+ADJECTIVES = {
+    "finhackad", "finhackade", "skuren", "hackad", "hackade", "dubbla", "enkla",
+    "tärnad", "tärnade", "strimlad", "strimlade", "finskuren", "skurna",
+}
+UNICODE_FRACTIONS = {"½": 0.5, "¼": 0.25, "¾": 0.75, "⅓": 1 / 3, "⅔": 2 / 3}
+
+TOKEN = re.compile(r"""
+    (?P<paren>\([^)]*\)?)
+  | (?P<number>\d+(?:[.,]\d+)?(?:\s+\d+/\d+)?(?:/\d+)?|[½¼¾⅓⅔])
+  | (?P<dash>[-–])
+  | (?P<word>[^\W\d_]+%?|%)
+  | (?P<other>\S)
+""", re.VERBOSE)
+
+PARSE_CACHE_SIZE = 8192
+
 
 def to_float(s):
     """Converts a string fraction like '1 1/2' or '1.5' to float."""
+    if s in UNICODE_FRACTIONS:
+        return UNICODE_FRACTIONS[s]
     try:
+        s = s.replace(",", ".")
         if " " in s:
             whole, frac = s.split()
             return float(whole) + float(Fraction(frac))
@@ -11,57 +52,83 @@ def to_float(s):
     except:
         return None
 
-def parse_ingredient(raw):
-    raw = raw.strip()
+def _tokenize(raw):
+    return [(match.lastgroup, match.group(), match.start(), match.end()) for match in TOKEN.finditer(raw)]
 
-    # Remove parenthesis and content inside
-    raw = re.sub(r"\s*\([^)]*\)", "", raw)
+def _join(raw, tokens):
+    """
+    Rebuilds the text of the tokens with their original spacing, leaving out parentheses.
+    """
+    parts = []
+    previous_end = None
+    for kind, text, start, end in tokens:
+        if kind != "paren":
+            if parts and previous_end is not None and start > previous_end:
+                parts.append(" ")
+            parts.append(text)
+        previous_end = end
+    return "".join(parts).strip()
 
-    # Remove prefixes like "ca", "ungefär", "cirka", etc.
-    raw = re.sub(r"^(ca|ungefär|cirka|drygt)\s+", "", raw, flags=re.IGNORECASE)
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse(raw):
+    """
+    Single pass over the tokens of one line: prefixes, amount (or range), unit and item.
+    Returns a tuple of (amount, unit, item) tuples so the result can be shared by the cache.
+    """
+    tokens = [t for t in _tokenize(raw.strip()) if t[0] != "paren"]
+    position = 0
 
-    # Remove adjectives like "finhackad", "skuren", etc.
-    raw = re.sub(r"^(finhackad(e)?|skuren|hackad(e)?|dubbla|enkla|tärnad(e)?|strimlad(e)?|finskuren|skurna)\s+", "", raw, flags=re.IGNORECASE)
+    # Skip prefixes like "ca" and adjectives like "finhackad"
+    while position < len(tokens) and tokens[position][0] == "word" and tokens[position][1].lower() in PREFIXES | ADJECTIVES:
+        position += 1
 
-    # Pattern to match amount, unit, and item
-    match = re.match(r"^([\d\s\/.,\-]+)\s*([a-zA-ZåäöÅÄÖ%]+)?\s+(.+)$", raw)
-    if not match:
-        return [{"amount": None, "unit": "", "item": raw}]
-    
-    # TODO: Improve unit logic to only use common units, if units are not common, set unit to empty string and add the text to the ingridient name.
+    amounts = []
+    while position < len(tokens) and tokens[position][0] in ("number", "dash"):
+        if tokens[position][0] == "number":
+            amounts.append(to_float(tokens[position][1]))
+        position += 1
 
-    amount_raw = match.group(1).strip().replace(",", ".")
-    unit = match.group(2) or ""
-    item = match.group(3).strip()
+    if not amounts:
+        return ((None, "", _join(raw, tokens[position:])),)
 
-    # Normalize amount (handle range)
-    if "-" in amount_raw:
-        parts = [to_float(p.strip()) for p in amount_raw.split("-")]
-        amount = max(filter(None, parts)) if parts else None
-    else:
-        amount = to_float(amount_raw)
+    # Ranges like "2-3" keep the larger amount
+    amount = max(filter(None, amounts), default=None)
+
+    unit = ""
+    if position + 1 < len(tokens) and tokens[position][0] == "word":
+        unit = UNIT_ALIASES.get(tokens[position][1].lower(), "")
+        if unit:
+            position += 1
+            # "st." and similar abbreviations
+            if tokens[position][1] == "." and tokens[position][2] == tokens[position - 1][3]:
+                position += 1
+    # Words that are not units stay part of the item, "1 gul lök" is a "gul lök"
+
+    item = _join(raw, tokens[position:])
+    if not item:
+        return ((None, "", _join(raw, tokens)),)
 
     # Handle "eller" (keep first option)
     if " eller " in item:
-        item = item.split(" eller ")[0].strip()
-        return [{
-            "amount": amount,
-            "unit": unit,
-            "item": item
-        }]
+        return ((amount, unit, item.split(" eller ")[0].strip()),)
 
     # Handle "och" (split into two ingredients)
     if " och " in item:
-        parts = [i.strip() for i in item.split(" och ")]
-        return [{
-            "amount": amount,
-            "unit": unit,
-            "item": part
-        } for part in parts]
-
-    # Normal case
-    return [{
-        "amount": amount,
-        "unit": unit,
-        "item": item
-    }]
\ No newline at end of file
+        return tuple((amount, unit, part.strip()) for part in item.split(" och "))
+
+    return ((amount, unit, item),)
+
+def parse_ingredient(raw):
+    """
+    Parses one ingredient line like "2 dl grädde" into a list of
+    {"amount", "unit", "item"} dictionaries. Units are always one of
+    Ingredient.UNIT_CHOICES or an empty string. Repeated lines are served from a cache.
+    """
+    return [{"amount": amount, "unit": unit, "item": item} for amount, unit, item in _parse(raw)]
+
+def parse_ingredients(lines):
+    """
+    Parses many ingredient lines at once.
+    Returns one list of parsed ingredients per line, in input order.
+    """
+    return [parse_ingredient(line) for line in lines]
@@ -0,0 +1,43 @@
+import threading
+
+from django.db import transaction
+from django.utils import timezone
+
+from recipes.models import Recipe
+from .fragmentCache import invalidate_fragments
+from .ingredientVectors import rebuild_ingredient_vectors
+from .pantryIndex import reindex_pantry
+from .recipeSearch import index_recipes
+
+_pending = threading.local()
+
+
+def recipes_changed(recipe_ids):
+    """
+    Marks recipes that changed, directly or through their ingredients. Their version is
+    moved forward and their derived data rebuilt
+    once the surrounding transaction commits, so saving a whole formset or a crawl batch
+    rebuilds every recipe only once. Bulk operations skip model signals and call this directly.
+    """
+    if not hasattr(_pending, 'ids'):
+        _pending.ids = set()
+    _pending.ids.update(recipe_ids)
+    # Every call registers a callback, the first one to run handles all pending ids.
+    # Ids left behind by a rolled back transaction are rebuilt with the next commit.
+    transaction.on_commit(_rebuild_pending)
+
+def touch_recipes(recipe_ids):
+    """
+    Moves Recipe.updated_at forward, which changes the keys of every cached fragment of the recipes.
+    """
+    recipes = Recipe.objects.filter(id__in=recipe_ids)
+    invalidate_fragments(recipes.values_list('id', 'updated_at'))
+    recipes.update(updated_at=timezone.now())
+
+def _rebuild_pending():
+    ids, _pending.ids = _pending.ids, set()
+    if ids:
+        touch_recipes(ids)
+        rebuild_ingredient_vectors(ids)
+        index_recipes(ids)
+        reindex_pantry(ids)
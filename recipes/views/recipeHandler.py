@@ -1,25 +1,97 @@
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
-from recipes.models import Recipe, Ingredient
+from django.db import transaction
+from django.db.models.functions import Substr
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.text import Truncator
+from recipes.models import Recipe
 from recipes.forms import RecipeForm, IngredientFormSet, IngredientEditFormSet
+from .fragmentCache import SUMMARY_LENGTH, render_recipe_cards
 
 
+def recipe_page(after=None, limit=None, summary=True):
+    """
+    Returns one page of recipe cards ordered by id, starting after the given id.
+    Only the columns a card shows are loaded, the description is cut short by the database
+    and left out entirely with summary=False. Returns (cards, next cursor), the cursor is None on the last page.
+    """
+    limit = limit or settings.RECIPE_PAGE_SIZE
+    recipes = Recipe.objects.order_by('id')
+    if after is not None:
+        recipes = recipes.filter(id__gt=after)
+    fields = ['id', 'title', 'servings', 'updated_at']
+    if summary:
+        recipes = recipes.annotate(summary=Substr('description', 1, SUMMARY_LENGTH))
+        fields.append('summary')
+    cards = list(recipes.values(*fields)[:limit + 1])
+    if len(cards) > limit:
+        cards = cards[:limit]
+        return cards, cards[-1]['id']
+    return cards, None
+
+def _cursor(request):
+    after = request.GET.get('after', '')
+    return int(after) if after.isdigit() else None
+
 def list_recipes(request):
-    recipes = Recipe.objects.all()
-    return render(request, 'recipes/recipe_list.html', {'recipes': recipes})
+    """
+    Assembles the page from cached card bodies, only cards of new or changed recipes are rendered.
+    """
+    recipes, next_cursor = recipe_page(_cursor(request), summary=False)
+    cards = list(zip(recipes, render_recipe_cards(recipes)))
+    return render(request, 'recipes/recipe_list.html', {'cards': cards, 'next_cursor': next_cursor})
+
+def list_recipes_page(request):
+    """
+    JSON variant of list_recipes, the list page loads the next page from here while scrolling.
+    """
+    recipes, next_cursor = recipe_page(_cursor(request))
+    for recipe in recipes:
+        del recipe['updated_at']
+        recipe['summary'] = Truncator(recipe['summary']).chars(SUMMARY_LENGTH - 1)
+        recipe['url'] = reverse('view_recipe', kwargs={'pk': recipe['id']})
+        recipe['delete_url'] = reverse('delete_recipe', kwargs={'pk': recipe['id']})
+    return JsonResponse({'recipes': recipes, 'next': next_cursor})
+
+def recipe_etag(recipe):
+    return f'"{recipe.pk}-{recipe.updated_at.timestamp():.6f}"'
+
+def _detail_context(recipe):
+    # Lazy, the query only runs when the ingredient list fragment is not cached.
+    ingredients = recipe.ingredient_set.select_related('name').order_by('id')
+    return {'recipe': recipe, 'ingredients': ingredients, 'fragment_timeout': settings.FRAGMENT_CACHE_TIMEOUT}
 
 def view_recipe(request, pk):
-    recipe = get_object_or_404(Recipe, pk=pk)
-    return render(request, 'recipes/recipe_detail.html', {'recipe': recipe})
+    """
+    Renders a recipe with at most two queries, the recipe and its ingredients with their names.
+    Answers 304 Not Modified after the first one when the client already has the current version.
+    """
+    recipe = get_object_or_404(Recipe.objects.defer('ingredient_vector'), pk=pk)
+    etag = recipe_etag(recipe)
+    last_modified = int(recipe.updated_at.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = render(request, 'recipes/recipe_detail.html', _detail_context(recipe))
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+    # Cooks keep recipes open for a long time, browsers must ask before reusing a stored copy.
+    patch_cache_control(response, no_cache=True)
+    return response
 
 def create_recipe(request):
     if request.method == 'POST':
         form = RecipeForm(request.POST)
         formset = IngredientFormSet(request.POST)
         if form.is_valid() and formset.is_valid():
-            recipe = form.save()
-            formset.instance = recipe
-            formset.save()
+            # One transaction, so the recipe's derived data is rebuilt once and not per ingredient.
+            with transaction.atomic():
+                recipe = form.save()
+                formset.instance = recipe
+                formset.save()
             return redirect('view_recipe', pk=recipe.pk)
     else:
         form = RecipeForm()
@@ -32,8 +104,9 @@ def update_recipe(request, pk):
         form = RecipeForm(request.POST, instance=recipe)
         formset = IngredientEditFormSet(request.POST, instance=recipe)
         if form.is_valid() and formset.is_valid():
-            form.save()
-            formset.save()
+            with transaction.atomic():
+                form.save()
+                formset.save()
             return redirect('view_recipe', pk=recipe.pk)
     else:
         form = RecipeForm(instance=recipe)
@@ -45,4 +118,4 @@ def delete_recipe(request, pk):
     if request.method == 'POST':
         recipe.delete()
         return redirect('list_recipes')
-    return render(request, 'recipes/recipe_detail.html', {'recipe': recipe})
\ No newline at end of file
+    return render(request, 'recipes/recipe_detail.html', _detail_context(recipe))
\ No newline at end of file
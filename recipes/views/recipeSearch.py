@@ -0,0 +1,146 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from recipes.models import Ingredient, Recipe
+from .fragmentCache import render_recipe_cards
+
+# Full-text index over recipe titles, descriptions and ingredient names, created by
+# migration 0005: an FTS5 table on SQLite and a table of tsvectors with a GIN index on PostgreSQL.
+SEARCH_TABLE = 'recipes_recipesearch'
+# Title matches count the most, then ingredients, then the description.
+FTS5_WEIGHTS = (10.0, 1.0, 5.0)
+TEXT_SEARCH_CONFIG = 'swedish'
+SEARCH_MAX_PAGE = 50
+
+WORD = re.compile(r'\w+')
+
+
+def recipe_documents(recipe_ids):
+    """
+    Returns (id, title, description, ingredients) tuples for the recipes that still exist.
+    Ingredients are the managed names and their common denonyms.
+    """
+    ingredients = {}
+    for recipe_id, name, denonyms in (
+        Ingredient.objects.filter(recipe_id__in=recipe_ids)
+        .values_list('recipe_id', 'name__name', 'name__common_denonyms')
+    ):
+        ingredients.setdefault(recipe_id, []).extend([name, *(str(denonym) for denonym in denonyms or [])])
+    return [
+        (recipe_id, title, description, ' '.join(ingredients.get(recipe_id, [])))
+        for recipe_id, title, description in Recipe.objects.filter(id__in=recipe_ids).values_list('id', 'title', 'description')
+    ]
+
+def store_documents(recipe_ids, documents, connection=connection):
+    """
+    Replaces the index entries of recipe_ids with the given documents.
+    Recipes without a document, like deleted ones, are removed from the index.
+    """
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids or connection.vendor not in ('sqlite', 'postgresql'):
+        return
+    key = 'rowid' if connection.vendor == 'sqlite' else 'recipe_id'
+    with connection.cursor() as cursor:
+        for start in range(0, len(recipe_ids), 500):
+            batch = recipe_ids[start:start + 500]
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE {key} IN ({", ".join(["%s"] * len(batch))})', batch
+            )
+        if connection.vendor == 'sqlite':
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, title, description, ingredients) VALUES (%s, %s, %s, %s)',
+                documents,
+            )
+        else:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (recipe_id, document) VALUES (%s, "
+                f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', %s), 'A') || "
+                f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', %s), 'C') || "
+                f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', %s), 'B'))",
+                documents,
+            )
+
+def index_recipes(recipe_ids):
+    """
+    Brings the search index entries of the given recipes up to date.
+    """
+    store_documents(recipe_ids, recipe_documents(recipe_ids))
+
+def search_recipe_ids(query, limit, offset=0):
+    """
+    Returns (id, rank) pairs of the recipes matching every word of the query, best first.
+    The last word also matches as a prefix so results show up while typing.
+    """
+    words = WORD.findall(query.lower())
+    if not words:
+        return []
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            match = ' '.join(f'"{word}"' for word in words) + '*'
+            cursor.execute(
+                f'SELECT rowid, bm25({SEARCH_TABLE}, %s, %s, %s) AS rank FROM {SEARCH_TABLE} '
+                f'WHERE {SEARCH_TABLE} MATCH %s ORDER BY rank LIMIT %s OFFSET %s',
+                [*FTS5_WEIGHTS, match, limit, offset],
+            )
+            # bm25 is lower for better matches, flip it so every backend ranks higher is better.
+            return [(recipe_id, -rank) for recipe_id, rank in cursor.fetchall()]
+        if connection.vendor == 'postgresql':
+            tsquery = ' & '.join(words) + ':*'
+            cursor.execute(
+                f"SELECT recipe_id, ts_rank_cd(document, query) AS rank "
+                f"FROM {SEARCH_TABLE}, to_tsquery('{TEXT_SEARCH_CONFIG}', %s) query "
+                f"WHERE document @@ query ORDER BY rank DESC, recipe_id LIMIT %s OFFSET %s",
+                [tsquery, limit, offset],
+            )
+            return cursor.fetchall()
+
+    # Other databases have no index, fall back to a plain scan of the titles.
+    recipes = Recipe.objects.all()
+    for word in words:
+        recipes = recipes.filter(title__icontains=word)
+    return [(recipe_id, 0.0) for recipe_id in recipes.order_by('id').values_list('id', flat=True)[offset:offset + limit]]
+
+def search_page(query, page, limit=None):
+    """
+    Returns one page of ranked results as recipe card dicts, and whether there is a next page.
+    """
+    limit = limit or settings.RECIPE_PAGE_SIZE
+    ranked = search_recipe_ids(query, limit + 1, (page - 1) * limit)
+    has_next = len(ranked) > limit
+    ranked = ranked[:limit]
+    recipes = {
+        recipe['id']: recipe
+        for recipe in Recipe.objects.filter(id__in=[recipe_id for recipe_id, _ in ranked]).values('id', 'title', 'servings', 'updated_at')
+    }
+    return [{**recipes[recipe_id], 'rank': rank} for recipe_id, rank in ranked if recipe_id in recipes], has_next
+
+def _search_params(request):
+    page = request.GET.get('page', '')
+    page = min(int(page), SEARCH_MAX_PAGE) if page.isdigit() and int(page) > 0 else 1
+    return request.GET.get('q', '').strip(), page
+
+def search_recipes(request):
+    query, page = _search_params(request)
+    results, has_next = search_page(query, page) if query else ([], False)
+    return render(request, 'recipes/search.html', {
+        'query': query,
+        'page': page,
+        'has_next': has_next,
+        'cards': list(zip(results, render_recipe_cards(results))),
+    })
+
+def search_recipes_api(request):
+    query, page = _search_params(request)
+    if not query:
+        return JsonResponse({'error': 'Query is required.'}, status=400)
+    results, has_next = search_page(query, page)
+    return JsonResponse({
+        'results': [{key: result[key] for key in ('id', 'title', 'servings', 'rank')} for result in results],
+        'page': page,
+        'next': page + 1 if has_next and page < SEARCH_MAX_PAGE else None,
+    })
@@ -0,0 +1,70 @@
+import hashlib
+import json
+from urllib.parse import urlsplit
+
+from django.db.models import Q
+
+from recipes.models import Recipe
+from .newScraper import extract_content, fetch_static
+from .pages import SITE_CONFIGS
+from .scrapeCache import canonicalize_url
+
+SOURCE_FIELDS = ['source_url', 'source_hash', 'source_etag', 'source_last_modified']
+
+
+def recipe_hash(recipe):
+    """
+    Hashes what a scrape extracted from a page. Pages carry ads and tokens that change
+    on every load, the extracted recipe only changes when the recipe itself does.
+    """
+    content = json.dumps(
+        [recipe['title'], recipe['description'], recipe['servings'], recipe['ingredients']], ensure_ascii=False
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def site_sources(site_key):
+    """
+    Returns {canonical url: {'id', source fields}} for every recipe crawled from a site.
+    """
+    host = urlsplit(canonicalize_url(SITE_CONFIGS[site_key]['start_url'])).netloc
+    recipes = Recipe.objects.filter(
+        Q(source_url__startswith=f'https://{host}/') | Q(source_url__startswith=f'http://{host}/')
+    )
+    return {source['source_url']: source for source in recipes.values('id', *SOURCE_FIELDS).iterator()}
+
+def fetch_source(url, config, source=None):
+    """
+    Static tier of a crawl, made conditional with the validators of the last crawl in `source`.
+    Returns (not modified, recipe, validators). The recipe is None when the page was not
+    modified or has to be rendered in a browser.
+    """
+    source = source or {}
+    response = fetch_static(url, source.get('source_etag', ''), source.get('source_last_modified', ''))
+    if response is None:
+        return False, None, {}
+    validators = {
+        'source_etag': response.headers.get('ETag', source.get('source_etag', ''))[:200],
+        'source_last_modified': response.headers.get('Last-Modified', source.get('source_last_modified', ''))[:100],
+    }
+    if response.status_code == 304:
+        return True, None, validators
+    return False, extract_content(response.content, config), validators
+
+def with_source(recipe, url, validators):
+    """
+    Adds the source fields save_scraped_recipes stores with a crawled recipe.
+    """
+    return {
+        **recipe,
+        'source_url': canonicalize_url(url),
+        'source_hash': recipe_hash(recipe),
+        'source_etag': validators.get('source_etag', ''),
+        'source_last_modified': validators.get('source_last_modified', ''),
+    }
+
+def update_validators(recipe_id, validators):
+    """
+    Stores new validators of an unchanged page so the next crawl can ask for 304 Not Modified.
+    """
+    if validators:
+        Recipe.objects.filter(id=recipe_id).update(**validators)
@@ -0,0 +1,242 @@
+from contextlib import contextmanager
+from itertools import groupby
+
+from django.db import connection, transaction
+
+from recipes.models import Ingredient, ManagedIngredient, Recipe
+from .ingredientIndex import index_managed_ingredient
+from .ingredientVectors import pack_vector
+from .ingridientHandler import bump_catalog_version
+from .pantryIndex import reindex_pantry
+from .recipeSearch import store_documents
+from .scrapeCache import canonicalize_url
+
+# Rows fetched per round trip while exporting.
+EXPORT_CHUNK_SIZE = 2000
+MANAGED_FIELDS = ['name', 'common_denonyms', 'weight_to_volume_conversion', 'category', 'notes']
+UNITS = {value for value, _ in Ingredient.UNIT_CHOICES}
+
+
+@contextmanager
+def export_snapshot():
+    """
+    On PostgreSQL, runs the export in a read-only REPEATABLE READ transaction, so every query
+    sees the database as it was when the export started. Other databases read without a
+    snapshot: a transaction on SQLite (BEGIN IMMEDIATE, see settings.py) would hold the write
+    lock for the whole export. export_records copes with recipes added or deleted meanwhile.
+    """
+    if connection.vendor != 'postgresql':
+        yield
+        return
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY')
+        yield
+
+def export_records(chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields every managed ingredient, then every recipe with its ingredients, as JSON-ready dicts.
+    Recipes and ingredients are read as two streams sorted by recipe id and merged,
+    so memory use does not grow with the number of recipes.
+    """
+    for fields in ManagedIngredient.objects.order_by('id').values(*MANAGED_FIELDS).iterator(chunk_size):
+        yield {'type': 'managed_ingredient', **fields}
+
+    rows = (
+        Ingredient.objects.order_by('recipe_id', 'id')
+        .values_list('recipe_id', 'name__name', 'quantity', 'unit')
+        .iterator(chunk_size)
+    )
+    groups = groupby(rows, key=lambda row: row[0])
+    group = next(groups, None)
+    recipes = Recipe.objects.order_by('id').values('id', 'title', 'description', 'servings', 'source_url')
+    for recipe in recipes.iterator(chunk_size):
+        ingredients = []
+        # Ingredients of recipes deleted before the recipes were read.
+        while group is not None and group[0] < recipe['id']:
+            group = next(groups, None)
+        if group is not None and group[0] == recipe['id']:
+            ingredients = [{'name': name, 'quantity': quantity, 'unit': unit} for _, name, quantity, unit in group[1]]
+            group = next(groups, None)
+        yield {
+            'type': 'recipe',
+            'title': recipe['title'],
+            'description': recipe['description'],
+            'servings': recipe['servings'],
+            'source_url': recipe['source_url'],
+            'ingredients': ingredients,
+        }
+
+def _text(record, field, max_length=None, required=False, default=''):
+    value = record.get(field, default)
+    if not isinstance(value, str):
+        raise ValueError(f'{field} must be a string.')
+    value = value.strip() if required else value
+    if required and not value:
+        raise ValueError(f'{field} is required.')
+    if max_length and len(value) > max_length:
+        raise ValueError(f'{field} is longer than {max_length} characters.')
+    return value
+
+def _number(record, field, default=None):
+    value = record.get(field, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f'{field} must be a number.')
+    return value
+
+def clean_managed_ingredient(record):
+    """
+    Returns the ManagedIngredient fields of an exported record, raises ValueError when it is invalid.
+    """
+    denonyms = record.get('common_denonyms', [])
+    if not isinstance(denonyms, list):
+        raise ValueError('common_denonyms must be a list.')
+    conversion = _number(record, 'weight_to_volume_conversion', 1.0)
+    if conversion <= 0:
+        raise ValueError('weight_to_volume_conversion must be positive.')
+    return {
+        'name': _text(record, 'name', 200, required=True),
+        'common_denonyms': denonyms,
+        'weight_to_volume_conversion': conversion,
+        'category': _text(record, 'category', 100),
+        'notes': _text(record, 'notes'),
+    }
+
+def clean_recipe(record):
+    """
+    Returns (recipe fields, [(ingredient name, quantity, unit)]) for an exported record,
+    raises ValueError when it is invalid.
+    """
+    servings = record.get('servings')
+    if isinstance(servings, bool) or not isinstance(servings, int) or servings <= 0:
+        raise ValueError('servings must be a positive whole number.')
+    lines = record.get('ingredients', [])
+    if not isinstance(lines, list):
+        raise ValueError('ingredients must be a list.')
+
+    ingredients = []
+    for position, line in enumerate(lines, 1):
+        if not isinstance(line, dict):
+            raise ValueError(f'ingredient {position} must be an object.')
+        try:
+            quantity = _number(line, 'quantity')
+            if quantity < 0:
+                raise ValueError('quantity must not be negative.')
+            unit = line.get('unit')
+            if unit not in UNITS:
+                raise ValueError(f'unknown unit {unit!r}.')
+            ingredients.append((_text(line, 'name', 200, required=True), quantity, unit))
+        except ValueError as e:
+            raise ValueError(f'ingredient {position}: {e}')
+
+    source_url = _text(record, 'source_url', 2000)
+    fields = {
+        'title': _text(record, 'title', 200, required=True),
+        'description': _text(record, 'description'),
+        'servings': servings,
+        # Keeps crawlsite from importing the recipe again.
+        'source_url': canonicalize_url(source_url) if source_url else '',
+    }
+    return fields, ingredients
+
+def _index_managed(created):
+    for ingredient in created:
+        index_managed_ingredient(ingredient)
+    bump_catalog_version()
+
+
+class RecipeImporter:
+    """
+    Writes cleaned records with bulk_create, `batch_size` recipes per transaction.
+    Ingredient names are resolved case-insensitively through a name map loaded once,
+    names that are not in it become new managed ingredients. Managed ingredients that
+    already exist are left as they are.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.managed_ids = {}
+        # Managed ingredient id -> the words recipes using it are found by, see recipeSearch.recipe_documents
+        self.search_terms = {}
+        for ingredient in ManagedIngredient.objects.only('id', 'name', 'common_denonyms').iterator(EXPORT_CHUNK_SIZE):
+            self._remember(ingredient)
+        self.managed = {}
+        self.recipes = []
+        self.counts = {'recipes': 0, 'ingredients': 0, 'managed_ingredients': 0}
+
+    def add(self, record):
+        """
+        Validates and queues one exported record, raises ValueError when it is invalid.
+        """
+        kind = record.get('type') if isinstance(record, dict) else None
+        if kind == 'managed_ingredient':
+            fields = clean_managed_ingredient(record)
+            key = fields['name'].lower()
+            if key not in self.managed_ids:
+                self.managed.setdefault(key, fields)
+        elif kind == 'recipe':
+            self.recipes.append(clean_recipe(record))
+            if len(self.recipes) >= self.batch_size:
+                self.flush()
+        else:
+            raise ValueError(f'unknown record type {kind!r}.')
+
+    def flush(self):
+        with transaction.atomic():
+            for fields, ingredients in self.recipes:
+                for name, _, _ in ingredients:
+                    if name.lower() not in self.managed_ids:
+                        self.managed.setdefault(name.lower(), {'name': name})
+            self._create_managed()
+
+            recipes, rows = [], []
+            for fields, ingredients in self.recipes:
+                lines = [(self.managed_ids[name.lower()], unit, quantity) for name, quantity, unit in ingredients]
+                recipes.append(Recipe(**fields, ingredient_vector=pack_vector(lines, fields['servings'])))
+                rows.append(lines)
+            Recipe.objects.bulk_create(recipes, batch_size=self.batch_size)
+            Ingredient.objects.bulk_create([
+                Ingredient(recipe=recipe, name_id=ingredient_id, unit=unit, quantity=quantity)
+                for recipe, lines in zip(recipes, rows)
+                for ingredient_id, unit, quantity in lines
+            ], batch_size=self.batch_size)
+            # Bulk inserts skip the signals, the vectors were packed above and the
+            # new recipes have no cached fragments, so only the indexes need updating.
+            recipe_ids = [recipe.id for recipe in recipes]
+            store_documents(recipe_ids, [
+                (recipe.id, recipe.title, recipe.description, ' '.join(self.search_terms[ingredient_id] for ingredient_id, _, _ in lines))
+                for recipe, lines in zip(recipes, rows)
+            ])
+            transaction.on_commit(lambda: reindex_pantry(recipe_ids))
+
+        self.counts['recipes'] += len(recipes)
+        self.counts['ingredients'] += sum(len(lines) for lines in rows)
+        self.recipes = []
+
+    def _create_managed(self):
+        if not self.managed:
+            return
+        created = ManagedIngredient.objects.bulk_create(
+            [ManagedIngredient(**fields) for fields in self.managed.values()], batch_size=self.batch_size
+        )
+        for ingredient in created:
+            self._remember(ingredient)
+        # A rolled back batch must not leave its ids in the index or move the version.
+        transaction.on_commit(lambda: _index_managed(created))
+        self.counts['managed_ingredients'] += len(created)
+        self.managed = {}
+
+    def _remember(self, ingredient):
+        self.managed_ids[ingredient.name.lower()] = ingredient.id
+        self.search_terms[ingredient.id] = ' '.join([ingredient.name, *(str(denonym) for denonym in ingredient.common_denonyms or [])])
+
+    def close(self):
+        """
+        Writes whatever is still queued and returns the number of created rows per model.
+        """
+        if self.recipes:
+            self.flush()
+        elif self.managed:
+            with transaction.atomic():
+                self._create_managed()
+        return self.counts
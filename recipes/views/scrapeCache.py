@@ -0,0 +1,115 @@
+import hashlib
+import json
+import time
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+from recipes.models import ScrapedPage
+from .pages import SITE_CONFIGS
+
+# Query parameters that only track where a visitor came from and never change the page.
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# The fields a scrape reads off a page. Only their selectors and extractors are part of the
+# cache key, rate limits or blocked requests can change without invalidating cached pages.
+EXTRACTED_FIELDS = ("title", "description", "servings", "ingredients")
+
+# time.monotonic() of the last eviction in this process.
+_last_eviction = None
+
+
+def canonicalize_url(url):
+    """
+    Normalizes a url so different spellings of the same recipe page share one cache entry.
+    Lowercases scheme and host, drops default ports, fragments and tracking parameters
+    and sorts the remaining query string.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.startswith("utm_") and name not in TRACKING_PARAMS
+    ))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+def config_hash(site_key):
+    """
+    Hashes the selectors and extractors of a SITE_CONFIGS entry, changing one invalidates the cached pages of that site.
+    """
+    config = SITE_CONFIGS[site_key]
+    extraction = {
+        name: config.get(name)
+        for field in EXTRACTED_FIELDS
+        for name in (f"{field}_selector", f"{field}_extractor")
+    }
+    return hashlib.sha256(json.dumps(extraction, sort_keys=True).encode()).hexdigest()
+
+def cache_key(url, site_key):
+    return hashlib.sha256(f"{canonicalize_url(url)}|{config_hash(site_key)}".encode()).hexdigest()
+
+def get_cached_recipe(url, site_key):
+    """
+    Returns the cached scrape result for a url, or None if it is missing or older than SCRAPE_CACHE_TTL.
+    """
+    key = cache_key(url, site_key)
+    entry = ScrapedPage.objects.filter(key=key).values("data", "created_at").first()
+    if entry is None:
+        return None
+    if entry["created_at"] < timezone.now() - timedelta(seconds=settings.SCRAPE_CACHE_TTL):
+        ScrapedPage.objects.filter(key=key).delete()
+        return None
+    return entry["data"]
+
+def cache_recipe(url, site_key, data):
+    """
+    Stores a scrape result. At most every SCRAPE_CACHE_EVICT_INTERVAL seconds the oldest
+    entries above SCRAPE_CACHE_MAX_ENTRIES are evicted as well.
+    """
+    key = cache_key(url, site_key)
+    try:
+        ScrapedPage.objects.update_or_create(
+            key=key,
+            defaults={"url": canonicalize_url(url), "site_key": site_key, "data": data, "created_at": timezone.now()},
+        )
+    except IntegrityError:
+        # Another worker stored the same page at the same time.
+        pass
+
+    global _last_eviction
+    now = time.monotonic()
+    if _last_eviction is None or now - _last_eviction >= settings.SCRAPE_CACHE_EVICT_INTERVAL:
+        _last_eviction = now
+        evict()
+
+def evict():
+    """
+    Deletes the oldest entries above SCRAPE_CACHE_MAX_ENTRIES, returns the number deleted.
+    """
+    excess = ScrapedPage.objects.count() - settings.SCRAPE_CACHE_MAX_ENTRIES
+    if excess <= 0:
+        return 0
+    oldest = ScrapedPage.objects.order_by("created_at").values_list("id", flat=True)[:excess]
+    deleted, _ = ScrapedPage.objects.filter(id__in=list(oldest)).delete()
+    return deleted
+
+def invalidate(url=None, site_key=None, expired_only=False):
+    """
+    Deletes cached pages, optionally limited to one url, one site or entries past their TTL.
+    Returns the number of deleted entries.
+    """
+    entries = ScrapedPage.objects.all()
+    if url:
+        entries = entries.filter(url=canonicalize_url(url))
+    if site_key:
+        entries = entries.filter(site_key=site_key)
+    if expired_only:
+        entries = entries.filter(created_at__lt=timezone.now() - timedelta(seconds=settings.SCRAPE_CACHE_TTL))
+    deleted, _ = entries.delete()
+    return deleted
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from recipes.models import ScrapeJob
+from .scrapeCache import canonicalize_url
+
+
+def submit_job(url, site_key):
+    """
+    Queues a scrape of url. A pending or running job for the same page is reused
+    so impatient double clicks do not scrape it twice.
+    """
+    url = canonicalize_url(url)
+    job = ScrapeJob.objects.filter(url=url, site_key=site_key, status__in=['pending', 'running']).first()
+    if job is None:
+        job = ScrapeJob.objects.create(url=url, site_key=site_key)
+    return job
+
+def claim_job():
+    """
+    Marks the oldest pending job as running and returns it, or None if the queue is empty.
+    The conditional update makes sure two workers never claim the same job.
+    """
+    while True:
+        job_id = ScrapeJob.objects.filter(status='pending').order_by('created_at', 'id').values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        claimed = ScrapeJob.objects.filter(id=job_id, status='pending').update(
+            status='running', started_at=timezone.now(), attempts=F('attempts') + 1
+        )
+        if claimed:
+            return ScrapeJob.objects.get(id=job_id)
+
+def finish_job(job, result):
+    ScrapeJob.objects.filter(id=job.id).update(status='done', result=result, error='', finished_at=timezone.now())
+
+def fail_job(job, error):
+    """
+    Puts the job back in the queue, or marks it failed after SCRAPE_JOB_MAX_ATTEMPTS tries.
+    """
+    if job.attempts < settings.SCRAPE_JOB_MAX_ATTEMPTS:
+        ScrapeJob.objects.filter(id=job.id).update(status='pending', error=error)
+    else:
+        ScrapeJob.objects.filter(id=job.id).update(status='failed', error=error, finished_at=timezone.now())
+
+def requeue_stale_jobs():
+    """
+    Hands jobs of workers that died mid-scrape to the next worker.
+    Returns the number of requeued jobs.
+    """
+    stale = timezone.now() - timedelta(seconds=settings.SCRAPE_JOB_TIMEOUT)
+    jobs = ScrapeJob.objects.filter(status='running', started_at__lt=stale)
+    jobs.filter(attempts__gte=settings.SCRAPE_JOB_MAX_ATTEMPTS).update(
+        status='failed', error='Scrape timed out.', finished_at=timezone.now()
+    )
+    return jobs.update(status='pending')
+
+def purge_finished_jobs():
+    """
+    Deletes done and failed jobs older than SCRAPE_JOB_RETENTION seconds, their results live on in the scrape cache.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.SCRAPE_JOB_RETENTION)
+    deleted, _ = ScrapeJob.objects.filter(status__in=['done', 'failed'], finished_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,246 @@
+import asyncio
+import itertools
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.utils import timezone
+
+from .pages import SITE_CONFIGS
+
+logger = logging.getLogger(__name__)
+
+# Answers that mean the site is overloaded or throttling us, worth trying again later.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Used for sites without their own limits, including hosts outside SITE_CONFIGS.
+DEFAULT_RATE_LIMIT = 1.0
+DEFAULT_BURST = 2
+DEFAULT_MAX_IN_FLIGHT = 2
+# How often async waiters check for a free page, sync waiters are woken up instead.
+ASYNC_POLL_INTERVAL = 0.05
+
+# Hostname -> site key, the site key itself is the bare domain of the site.
+SITE_HOSTS = {
+    host: key
+    for key, config in SITE_CONFIGS.items()
+    for host in (key, urlsplit(config["start_url"]).hostname)
+}
+
+
+def site_key_for_url(url):
+    """
+    Returns the SITE_CONFIGS key for a url, matching its hostname or a parent domain
+    of it, so www.ica.se and ica.se both map to ica.se. None for other sites.
+    """
+    host = (urlsplit(url).hostname or "").lower()
+    while host:
+        if host in SITE_HOSTS:
+            return SITE_HOSTS[host]
+        host = host.partition(".")[2]
+    return None
+
+
+class RetryableStatus(Exception):
+    """
+    A site answered 429 or 5xx, retry_after holds its Retry-After header in seconds if it sent one.
+    """
+
+    def __init__(self, url, status, retry_after=None):
+        super().__init__(f"{url} answered {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+def retry_after_seconds(value):
+    """
+    Parses a Retry-After header, given either in seconds or as an HTTP date.
+    """
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return int(value)
+    try:
+        return max((parsedate_to_datetime(value) - timezone.now()).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class DomainLimiter:
+    """
+    Politeness for one site: a token bucket refilling `rate` tokens per second up to `burst`,
+    and at most `max_in_flight` requests or pages at the same time. Waiters are served in
+    arrival order. Every site has its own limiter, a queue on one never delays another.
+    """
+
+    def __init__(self, rate, burst, max_in_flight):
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self.waiting = deque()
+        self.served = 0
+        self.retried = 0
+        self.condition = threading.Condition()
+
+    def _try_acquire(self, ticket):
+        """
+        Called with the condition held. Returns 0 when the ticket got its slot, otherwise the
+        seconds until a token is due, or None when it has to wait for its turn or a free slot.
+        """
+        if self.waiting[0] is not ticket or self.in_flight >= self.max_in_flight:
+            return None
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+        self.tokens -= 1
+        self.in_flight += 1
+        self.served += 1
+        self.waiting.popleft()
+        # The next in line may be able to go right away.
+        self.condition.notify_all()
+        return 0
+
+    def _leave(self, ticket):
+        with self.condition:
+            if ticket in self.waiting:
+                self.waiting.remove(ticket)
+                self.condition.notify_all()
+
+    def _release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        ticket = object()
+        with self.condition:
+            self.waiting.append(ticket)
+        try:
+            with self.condition:
+                while (wait := self._try_acquire(ticket)) != 0:
+                    self.condition.wait(wait)
+        except BaseException:
+            self._leave(ticket)
+            raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def slot_async(self):
+        ticket = object()
+        with self.condition:
+            self.waiting.append(ticket)
+        try:
+            while True:
+                with self.condition:
+                    wait = self._try_acquire(ticket)
+                if wait == 0:
+                    break
+                await asyncio.sleep(ASYNC_POLL_INTERVAL if wait is None else wait)
+        except BaseException:
+            self._leave(ticket)
+            raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def back_off(self, seconds):
+        """
+        Holds every request to the site for `seconds`, after it asked us to slow down.
+        """
+        with self.condition:
+            self.retried += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def stats(self):
+        with self.condition:
+            return {
+                "waiting": len(self.waiting),
+                "in_flight": self.in_flight,
+                "served": self.served,
+                "retried": self.retried,
+                "paused_for": round(max(self.paused_until - time.monotonic(), 0), 1),
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(url):
+    """
+    Returns the process-wide limiter of the site serving url, limits come from its SITE_CONFIGS entry.
+    """
+    key = site_key_for_url(url) or (urlsplit(url).hostname or "").lower()
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            config = SITE_CONFIGS.get(key, {})
+            limiter = _limiters[key] = DomainLimiter(
+                config.get("rate_limit", DEFAULT_RATE_LIMIT),
+                config.get("burst", DEFAULT_BURST),
+                config.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT),
+            )
+        return limiter
+
+def queue_stats():
+    """
+    Returns {site: limiter stats} for every site scraped by this process.
+    """
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {key: limiter.stats() for key, limiter in sorted(limiters.items())}
+
+def _backoff(url, limiter, error, attempt):
+    if attempt >= settings.SCRAPER_MAX_RETRIES:
+        raise error
+    if error.retry_after is not None:
+        delay = min(error.retry_after, settings.SCRAPER_BACKOFF_MAX)
+    else:
+        # Exponential with jitter, so waiting workers do not all come back at once.
+        delay = min(settings.SCRAPER_BACKOFF_BASE * 2 ** attempt, settings.SCRAPER_BACKOFF_MAX)
+        delay *= random.uniform(0.5, 1)
+    logger.warning("%s answered %s, retrying in %.1fs", url, error.status, delay)
+    limiter.back_off(delay)
+
+def politely(url, fn, *args):
+    """
+    Calls fn(*args) once the site serving url has a token and a free slot, and calls it
+    again with exponential backoff while it raises RetryableStatus.
+    Every newScraper entry point loads its pages through here.
+    """
+    limiter = get_limiter(url)
+    for attempt in itertools.count():
+        try:
+            with limiter.slot():
+                return fn(*args)
+        except RetryableStatus as e:
+            _backoff(url, limiter, e, attempt)
+
+async def politely_async(url, fn, *args):
+    """
+    politely for coroutine functions.
+    """
+    limiter = get_limiter(url)
+    for attempt in itertools.count():
+        try:
+            async with limiter.slot_async():
+                return await fn(*args)
+        except RetryableStatus as e:
+            _backoff(url, limiter, e, attempt)
@@ -1,43 +1,128 @@
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count
 from django.http import JsonResponse
-from .ingridientHandler import find_or_create_ingredient
-from .newScraper import find_ingridients_from_recipe, find_recipe_details
-from .parser import parse_ingredient
-from .pages import SITE_CONFIGS
-import re
-
-def get_site_key_from_url(url):
-    for key in SITE_CONFIGS:
-        if key in url:
-            return key
-    return None
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from recipes.models import Recipe, Ingredient, ScrapeJob
+from .asyncScraper import find_recipe_async
+from .ingridientHandler import get_or_create_managed_ingredient, resolve_ingredients
+from .newScraper import find_ingridients_from_recipe, find_recipe, find_recipe_details
+from .parser import parse_ingredients
+from .recipeChanges import recipes_changed
+from .recipeSources import SOURCE_FIELDS
+from .scrapeCache import get_cached_recipe
+from .scrapeJobs import submit_job
+from .scrapeScheduler import queue_stats, site_key_for_url
+import logging
 
-def scrape_recipe(request):
-    url = request.GET.get('url')
-    if not url:
-        return JsonResponse({'error': 'URL is required.'}, status=400)
+logger = logging.getLogger(__name__)
+
+# Used when a scraped page does not say how many it serves.
+DEFAULT_SERVINGS = 4
+
+def build_ingredients(raw_ingredients):
+    """
+    Parses scraped ingredient lines and matches them against the managed ingredients.
+    """
+    parsed = [ing for line in parse_ingredients(raw_ingredients) for ing in line]
+    logger.debug("Parsed %d ingredient lines into %s", len(raw_ingredients), parsed)
+    matches = resolve_ingredients([ing['item'] for ing in parsed])
+    return [{
+        'original_name': ing['item'],
+        'quantity': ing['amount'] if ing['amount'] is not None else '',
+        'unit': ing['unit'],
+        'managed_ingredient': ingredient_data
+    } for ing, ingredient_data in zip(parsed, matches)]
+
+def _to_servings(value):
+    try:
+        servings = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_SERVINGS
+    return servings if servings > 0 else DEFAULT_SERVINGS
+
+def save_scraped_recipes(scraped):
+    """
+    Creates recipes from find_recipe results in a single transaction.
+    Ingredients are matched the same way as in the scrape endpoint, names without
+    a match become new managed ingredients. Results without a title or ingredients are skipped.
+    Results with a recipe_id replace that recipe and its ingredients, like a re-crawl does,
+    the source fields of recipeSources.with_source are stored when present.
+    Returns the saved recipes.
+    """
+    units = {value for value, _ in Ingredient.UNIT_CHOICES}
+    parsed = [
+        (data, [ing for line in parse_ingredients(data['ingredients']) for ing in line])
+        for data in scraped
+        if data['title'] and data['ingredients']
+    ]
+    names = [ing['item'][:200] for _, lines in parsed for ing in lines]
+    managed_ids = {}
+    created = []
+
+    with transaction.atomic():
+        for name, match in zip(names, resolve_ingredients(names)):
+            key = name.lower()
+            if key in managed_ids:
+                continue
+            if match['action'] == 'match':
+                managed_ids[key] = match['id']
+            else:
+                managed_ids[key] = get_or_create_managed_ingredient(name).id
+
+        # Recipes deleted since they were crawled are created again.
+        existing = set(Recipe.objects.filter(
+            id__in=[data['recipe_id'] for data, _ in parsed if data.get('recipe_id')]
+        ).values_list('id', flat=True))
+        for data, lines in parsed:
+            recipe = Recipe(
+                id=data.get('recipe_id') if data.get('recipe_id') in existing else None,
+                title=data['title'][:200],
+                description=data['description'],
+                servings=_to_servings(data['servings']),
+                **{field: data.get(field, '') for field in SOURCE_FIELDS}
+            )
+            created.append((recipe, [Ingredient(
+                name_id=managed_ids[ing['item'][:200].lower()],
+                quantity=ing['amount'] or 0,
+                unit=ing['unit'] if ing['unit'] in units else 'st'
+            ) for ing in lines]))
+
+        updated = [recipe for recipe, _ in created if recipe.id is not None]
+        Recipe.objects.bulk_create([recipe for recipe, _ in created if recipe.id is None])
+        if updated:
+            Recipe.objects.bulk_update(updated, ['title', 'description', 'servings', *SOURCE_FIELDS])
+            Ingredient.objects.filter(recipe__in=updated).delete()
+        for recipe, lines in created:
+            for line in lines:
+                line.recipe = recipe
+        Ingredient.objects.bulk_create([line for _, lines in created for line in lines])
+        recipes_changed([recipe.id for recipe, _ in created])
 
-    site_key = get_site_key_from_url(url)
+    return [recipe for recipe, _ in created]
+
+def _scrape_target(params):
+    """
+    Reads the url to scrape from request.GET or request.POST.
+    Returns (url, site_key, None) for a supported page, or (None, None, error response).
+    """
+    url = params.get('url')
+    if not url:
+        return None, None, JsonResponse({'error': 'URL is required.'}, status=400)
+    site_key = site_key_for_url(url)
     if not site_key:
-        return JsonResponse({'error': 'Website not supported for scraping.'}, status=400)
+        return None, None, JsonResponse({'error': 'Website not supported for scraping.'}, status=400)
+    return url, site_key, None
+
+def scrape_recipe(request):
+    url, site_key, error = _scrape_target(request.GET)
+    if error:
+        return error
 
     try:
         raw_ingredients = find_ingridients_from_recipe(url, site_key)
-        
-        ingredients = []
-        print(f"Raw ingredients found: {raw_ingredients}")
-        for raw_ing in raw_ingredients:
-            parsed_ings = parse_ingredient(raw_ing)
-            print(f"Parsed ingredients: {parsed_ings}")
-            for ing in parsed_ings:
-                ingredient_data = find_or_create_ingredient(ing['item'])
-                ingredients.append({
-                    'original_name': ing['item'],
-                    'quantity': ing['amount'] if ing['amount'] is not None else '',
-                    'unit': ing['unit'],
-                    'managed_ingredient': ingredient_data
-                })
-
-        return JsonResponse({'ingredients': ingredients})
+        return JsonResponse({'ingredients': build_ingredients(raw_ingredients)})
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -45,13 +130,9 @@ def scrape_recipe_details(request):
     """
     Uses the title, description and servings functions from newScraper.py to scrape the recipe details.
     """
-    url = request.GET.get('url')
-    if not url:
-        return JsonResponse({'error': 'URL is required.'}, status=400)
-
-    site_key = get_site_key_from_url(url)
-    if not site_key:
-        return JsonResponse({'error': 'Website not supported for scraping.'}, status=400)
+    url, site_key, error = _scrape_target(request.GET)
+    if error:
+        return error
 
     try:
         details = find_recipe_details(url, site_key)
@@ -59,3 +140,103 @@ def scrape_recipe_details(request):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
+def scrape_payload(recipe):
+    """
+    Turns a find_recipe result into the response of the scrape endpoints, with matched ingredients.
+    """
+    return {
+        'title': recipe['title'],
+        'description': recipe['description'],
+        'servings': recipe['servings'],
+        'ingredients': build_ingredients(recipe['ingredients']),
+        'tier': recipe.get('tier', '')
+    }
+
+def scrape_recipe_full(request):
+    """
+    Scrapes details and ingredients from a single page load.
+    Returns the title, description, servings and matched ingredients in one response.
+    """
+    url, site_key, error = _scrape_target(request.GET)
+    if error:
+        return error
+
+    try:
+        return JsonResponse(scrape_payload(find_recipe(url, site_key)))
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+# Async versions of the scrape views, served instead of the sync ones under ASGI.
+# They wait on the async browser instead of holding a thread for the whole scrape.
+
+async def scrape_recipe_async(request):
+    url, site_key, error = _scrape_target(request.GET)
+    if error:
+        return error
+    try:
+        recipe = await find_recipe_async(url, site_key)
+        return JsonResponse({'ingredients': await sync_to_async(build_ingredients)(recipe['ingredients'])})
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+async def scrape_recipe_details_async(request):
+    url, site_key, error = _scrape_target(request.GET)
+    if error:
+        return error
+    try:
+        recipe = await find_recipe_async(url, site_key)
+        return JsonResponse({key: recipe[key] for key in ('title', 'description', 'servings')})
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+async def scrape_recipe_full_async(request):
+    url, site_key, error = _scrape_target(request.GET)
+    if error:
+        return error
+    try:
+        recipe = await find_recipe_async(url, site_key)
+        return JsonResponse(await sync_to_async(scrape_payload)(recipe))
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+def _job_response(job, status=200):
+    return JsonResponse({
+        'id': job.id,
+        'status': job.status,
+        'result': job.result,
+        'error': job.error,
+        'poll_url': reverse('scrape_job_status', kwargs={'pk': job.id})
+    }, status=status)
+
+def submit_scrape_job(request):
+    """
+    Queues a scrape for the runscrapeworker command and answers right away.
+    Pages in the scrape cache are answered directly with a done status.
+    The client polls the returned poll_url until the job is done or failed.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required.'}, status=405)
+    url, site_key, error = _scrape_target(request.POST)
+    if error:
+        return error
+
+    cached = get_cached_recipe(url, site_key)
+    if cached is not None:
+        return JsonResponse({'id': None, 'status': 'done', 'result': scrape_payload(cached), 'error': ''})
+    return _job_response(submit_job(url, site_key), status=202)
+
+def scrape_job_status(request, pk):
+    return _job_response(get_object_or_404(ScrapeJob, pk=pk))
+
+def scraper_stats(request):
+    """
+    Queue depths for monitoring: queued and running scrape jobs, and per site the scrapes
+    of this process waiting for or holding a slot, see scrapeScheduler.
+    """
+    jobs = dict(
+        ScrapeJob.objects.filter(status__in=['pending', 'running']).values_list('status').annotate(count=Count('id'))
+    )
+    return JsonResponse({
+        'jobs': {'pending': jobs.get('pending', 0), 'running': jobs.get('running', 0)},
+        'sites': queue_stats(),
+    })
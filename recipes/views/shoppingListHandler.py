@@ -1,40 +1,123 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
-from recipes.models import Recipe, Ingredient
+from django.db import DatabaseError
+from django.db.models import ExpressionWrapper, F, FloatField, Sum
+from recipes.models import Recipe, Ingredient, ManagedIngredient
 from recipes.forms import RecipeForm, IngredientFormSet, ShoppingListForm
+from .ingredientVectors import sum_vectors
+import logging
 
+logger = logging.getLogger(__name__)
+
+
+def parse_recipe_ids(value):
+    """
+    Turns a comma separated string of recipe ids into a list of ints, skipping anything else.
+    """
+    return [int(part) for part in value.split(',') if part.strip().isdigit()]
+
+def parse_meal_plan(value, num_guests):
+    """
+    Turns "1,2:8,3" into {recipe id: guests}. Recipes without their own
+    number of guests get num_guests, repeated recipes add up.
+    Raises ValueError for entries that are not ids or id:guests pairs.
+    """
+    plan = {}
+    for part in filter(None, (part.strip() for part in value.split(','))):
+        recipe_id, _, guests = part.partition(':')
+        guests = int(guests) if guests else num_guests
+        if guests < 0:
+            raise ValueError(part)
+        plan[int(recipe_id)] = plan.get(int(recipe_id), 0) + guests
+    return plan
+
+def aggregate_shopping_list(recipe_ids, num_guests):
+    """
+    Scales every ingredient of the selected recipes to num_guests and sums them
+    per managed ingredient and unit in a single grouped query.
+    Returns a list of dictionaries with name, quantity, unit and managed_ingredient.
+    """
+    scaled_quantity = ExpressionWrapper(
+        F('quantity') * num_guests / F('recipe__servings'), output_field=FloatField()
+    )
+    try:
+        rows = list(
+            Ingredient.objects.filter(recipe_id__in=recipe_ids, recipe__servings__gt=0)
+            .values('name_id', 'unit')
+            .annotate(quantity=Sum(scaled_quantity))
+            .order_by('name__name', 'unit')
+        )
+    except DatabaseError:
+        logger.exception("Grouped shopping list query failed, merging in Python instead")
+        return _merge_in_python(recipe_ids, num_guests)
+
+    managed = ManagedIngredient.objects.in_bulk({row['name_id'] for row in rows})
+    return [{
+        'name': managed[row['name_id']].name,
+        'quantity': row['quantity'],
+        'unit': row['unit'],
+        'managed_ingredient': managed[row['name_id']]
+    } for row in rows]
+
+def _merge_in_python(recipe_ids, num_guests):
+    """
+    Fallback for databases where the grouped query does not work, one query with the related rows joined.
+    """
+    merged_ingredients = {}
+    ingredients = Ingredient.objects.filter(recipe_id__in=recipe_ids, recipe__servings__gt=0).select_related('name', 'recipe')
+    for ingredient in ingredients:
+        scaled_quantity = ingredient.quantity * num_guests / ingredient.recipe.servings
+        ingredient_key = (ingredient.name_id, ingredient.unit)
+
+        if ingredient_key in merged_ingredients:
+            merged_ingredients[ingredient_key]['quantity'] += scaled_quantity
+        else:
+            merged_ingredients[ingredient_key] = {
+                'name': ingredient.name.name,
+                'quantity': scaled_quantity,
+                'unit': ingredient.unit,
+                'managed_ingredient': ingredient.name  # Pass the whole object
+            }
+    return sorted(merged_ingredients.values(), key=lambda item: (item['name'], item['unit']))
 
 def create_shopping_list(request):
     shopping_list = []
     if request.method == 'POST':
         form = ShoppingListForm(request.POST)
         if form.is_valid():
-            recipe_ids = request.POST.get('selected_recipes', '').split(',')
-            selected_recipes = Recipe.objects.filter(id__in=recipe_ids)
+            recipe_ids = parse_recipe_ids(request.POST.get('selected_recipes', ''))
             num_guests = form.cleaned_data['num_guests']
-            
-            merged_ingredients = {}
-
-            for recipe in selected_recipes:
-                scale_factor = num_guests / recipe.servings
-
-                for ingredient in recipe.ingredient_set.all():
-                    scaled_quantity = ingredient.quantity * scale_factor
-                    ingredient_key = f"{ingredient.name.name}_{ingredient.unit}"
-                    
-                    if ingredient_key in merged_ingredients:
-                        merged_ingredients[ingredient_key]['quantity'] += scaled_quantity
-                    else:
-                        merged_ingredients[ingredient_key] = {
-                            'name': ingredient.name.name,
-                            'quantity': scaled_quantity,
-                            'unit': ingredient.unit,
-                            'managed_ingredient': ingredient.name  # Pass the whole object
-                        }
-            
-            shopping_list = list(merged_ingredients.values())
+            shopping_list = aggregate_shopping_list(recipe_ids, num_guests)
     else:
         form = ShoppingListForm()
 
     return render(request, 'recipes/shopping_list.html', {'form': form, 'shopping_list': shopping_list})
 
+def shopping_list_api(request):
+    """
+    JSON version of the shopping list, built from the stored per-serving vectors so
+    meal plans with many recipes are summed without touching the Ingredient table.
+    Takes recipes=1,2:8 and num_guests (for recipes without their own count) as GET or POST parameters.
+    Quantities are in canonical units, grams, milliliters or pieces.
+    """
+    params = request.POST if request.method == 'POST' else request.GET
+    try:
+        num_guests = int(params.get('num_guests', 1))
+    except ValueError:
+        num_guests = -1
+    if num_guests < 0:
+        return JsonResponse({'error': 'num_guests must be a positive number.'}, status=400)
+    try:
+        plan = parse_meal_plan(params.get('recipes', ''), num_guests)
+    except ValueError:
+        return JsonResponse({'error': 'recipes must be a comma separated list of ids or id:guests pairs.'}, status=400)
+    if not plan:
+        return JsonResponse({'error': 'At least one recipe is required.'}, status=400)
+
+    totals = sum_vectors(plan)
+    names = dict(ManagedIngredient.objects.filter(id__in={ingredient_id for ingredient_id, _, _ in totals}).values_list('id', 'name'))
+    items = sorted((
+        {'id': ingredient_id, 'name': names[ingredient_id], 'quantity': round(quantity, 3), 'unit': unit}
+        for ingredient_id, unit, quantity in totals
+    ), key=lambda item: (item['name'], item['unit']))
+    return JsonResponse({'recipes': len(plan), 'items': items})
@@ -1,3 +1,5 @@
 #!/bin/bash
 set -e
+# Scrapes run in their own process so they never hold up a web worker.
+python manage.py runscrapeworker &
 gunicorn makeRecipe.wsgi --bind 0.0.0.0:8000 --log-file -
@@ -0,0 +1,6 @@
+#!/bin/bash
+set -e
+# ASGI alternative to run.sh: every uvicorn worker runs the async scrape and
+# autocomplete views on one event loop, so it serves many of them at once.
+python manage.py runscrapeworker &
+uvicorn makeRecipe.asgi:application --host 0.0.0.0 --port 8000 --workers "${WEB_CONCURRENCY:-2}"
@@ -1,17 +1,18 @@
+const AUTOCOMPLETE_DELAY = 150;
+
 document.addEventListener('DOMContentLoaded', function() {
-    const addButton = document.getElementById('add-ingredient');
+    const addIngredientButton = document.getElementById('add-ingredient');
     const formsetContainer = document.getElementById('ingredient-formset-container');
-    let totalForms = document.querySelector('#id_ingredient_set-TOTAL_FORMS');
-    const emptyForm = document.getElementById('empty-form').innerHTML;
+    const emptyFormTemplate = document.getElementById('empty-form').innerHTML;
 
     addIngredientButton.addEventListener('click', function() {
         const totalFormsInput = document.getElementById('id_ingredient_set-TOTAL_FORMS');
         let formIdx = parseInt(totalFormsInput.value);
-        
+
         const newFormHtml = emptyFormTemplate.replace(/__prefix__/g, formIdx);
         const newForm = document.createElement('div');
         newForm.innerHTML = newFormHtml;
-        
+
         formsetContainer.appendChild(newForm.firstElementChild);
         totalFormsInput.value = formIdx + 1;
     });
@@ -20,80 +21,79 @@ document.addEventListener('DOMContentLoaded', function() {
     formsetContainer.addEventListener('click', function(e) {
         if (e.target && e.target.classList.contains('remove-ingredient')) {
             const formToRemove = e.target.closest('.ingredient-form');
-            if (formToRemove) {
+            const deleteInput = formToRemove.querySelector('input[name$="-DELETE"]');
+            if (deleteInput) {
+                // Saved ingredients are deleted on submit
+                deleteInput.checked = true;
+                formToRemove.style.display = 'none';
+            } else {
+                // TOTAL_FORMS stays, a missing new form is skipped like an empty one
                 formToRemove.remove();
-                // Optional: Update total forms count if needed for formset validation
-                const totalFormsInput = document.getElementById('id_ingredient_set-TOTAL_FORMS');
-                totalFormsInput.value = parseInt(totalFormsInput.value) - 1;
             }
         }
     });
 
-    function attachAutocompleteListeners() {
-        document.querySelectorAll('.autocomplete-ingredient').forEach(input => {
-            input.addEventListener('input', function() {
-                const query = this.value;
-                const currentInput = this;
-                const formRow = currentInput.closest('.ingredient-form');
-                const hiddenSelect = formRow.querySelector('select[name$="-name"]'); // The actual select element
-
-                if (query.length > 1) {
-                    fetch(`/recipes/ingredients/autocomplete/?q=${query}`)
-                        .then(response => response.json())
-                        .then(data => {
-                            // Clear previous suggestions
-                            let suggestionsList = formRow.querySelector('.suggestions-list');
-                            if (!suggestionsList) {
-                                suggestionsList = document.createElement('ul');
-                                suggestionsList.classList.add('suggestions-list', 'list-group', 'mt-1');
-                                currentInput.parentNode.appendChild(suggestionsList);
-                            }
-                            suggestionsList.innerHTML = '';
+    function clearSuggestions(formRow) {
+        const suggestionsList = formRow.querySelector('.suggestions-list');
+        if (suggestionsList) {
+            suggestionsList.innerHTML = '';
+        }
+    }
 
-                            data.forEach(item => {
-                                const listItem = document.createElement('li');
-                                listItem.classList.add('list-group-item', 'list-group-item-action');
-                                listItem.textContent = item.name;
-                                listItem.dataset.id = item.id;
-                                listItem.addEventListener('click', function() {
-                                    currentInput.value = item.name;
-                                    // Set the selected option in the hidden select element
-                                    const option = hiddenSelect.querySelector(`option[value="${item.id}"]`);
-                                    if (option) {
-                                        option.selected = true;
-                                    } else {
-                                        // If option doesn't exist, create it (for newly added ManagedIngredients)
-                                        const newOption = document.createElement('option');
-                                        newOption.value = item.id;
-                                        newOption.textContent = item.name;
-                                        newOption.selected = true;
-                                        hiddenSelect.appendChild(newOption);
-                                    }
-                                    suggestionsList.innerHTML = ''; // Clear suggestions
-                                });
-                                suggestionsList.appendChild(listItem);
-                            });
-                        });
-                } else {
-                    // Clear suggestions if query is too short
-                    const suggestionsList = formRow.querySelector('.suggestions-list');
-                    if (suggestionsList) {
-                        suggestionsList.innerHTML = '';
-                    }
-                }
-            });
+    function showSuggestions(input, data) {
+        const formRow = input.closest('.ingredient-form');
+        const idInput = formRow.querySelector('input[name$="-name"]'); // The hidden id the form submits
+        let suggestionsList = formRow.querySelector('.suggestions-list');
+        if (!suggestionsList) {
+            suggestionsList = document.createElement('ul');
+            suggestionsList.classList.add('suggestions-list', 'list-group', 'mt-1');
+            input.parentNode.insertBefore(suggestionsList, input.nextSibling);
+        }
+        suggestionsList.innerHTML = '';
 
-            // Clear suggestions when input loses focus
-            input.addEventListener('blur', function() {
-                setTimeout(() => {
-                    const suggestionsList = this.closest('.ingredient-form').querySelector('.suggestions-list');
-                    if (suggestionsList) {
-                        suggestionsList.innerHTML = '';
-                    }
-                }, 100);
+        data.forEach(item => {
+            const listItem = document.createElement('li');
+            listItem.classList.add('list-group-item', 'list-group-item-action');
+            listItem.textContent = item.name;
+            // mousedown fires before the input loses focus
+            listItem.addEventListener('mousedown', function(e) {
+                e.preventDefault();
+                input.value = item.name;
+                idInput.value = item.id;
+                clearSuggestions(formRow);
             });
+            suggestionsList.appendChild(listItem);
         });
     }
 
-    attachAutocompleteListeners(); // Attach listeners on initial load
-});
\ No newline at end of file
+    // Listeners on the container also cover rows added later
+    let autocompleteTimer = null;
+    formsetContainer.addEventListener('input', function(e) {
+        if (!e.target.classList.contains('autocomplete-ingredient')) return;
+        const input = e.target;
+        const formRow = input.closest('.ingredient-form');
+        // The typed name no longer matches the picked ingredient
+        formRow.querySelector('input[name$="-name"]').value = '';
+
+        clearTimeout(autocompleteTimer);
+        const query = input.value.trim();
+        if (query.length < 2) {
+            clearSuggestions(formRow);
+            return;
+        }
+        autocompleteTimer = setTimeout(() => {
+            fetch(`/ingredients/autocomplete/?q=${encodeURIComponent(query)}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (input.value.trim() === query) showSuggestions(input, data);
+                });
+        }, AUTOCOMPLETE_DELAY);
+    });
+
+    // Clear suggestions when input loses focus
+    formsetContainer.addEventListener('focusout', function(e) {
+        if (e.target.classList.contains('autocomplete-ingredient')) {
+            clearSuggestions(e.target.closest('.ingredient-form'));
+        }
+    });
+});
@@ -0,0 +1,59 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const cards = document.getElementById('recipe-cards');
+    const more = document.getElementById('recipe-list-more');
+    const cardTemplate = document.getElementById('recipe-card-template');
+    if (!cards || !more) return;
+
+    let next = more.dataset.next;
+    let loading = false;
+
+    function addCard(recipe) {
+        const clone = cardTemplate.content.cloneNode(true);
+
+        const link = clone.querySelector('.recipe-link');
+        link.href = recipe.url;
+        link.textContent = recipe.title;
+        clone.querySelector('.recipe-summary').textContent = recipe.summary;
+        clone.querySelector('.recipe-servings').textContent = `Servings: ${recipe.servings}`;
+
+        const form = clone.querySelector('.recipe-delete-form');
+        form.action = recipe.delete_url;
+        form.addEventListener('submit', function(event) {
+            if (!confirm(`Are you sure you want to delete '${recipe.title}'?`)) {
+                event.preventDefault();
+            }
+        });
+
+        cards.appendChild(clone);
+    }
+
+    // Fetch the page after the last card, the cursor is the id of that card
+    function loadNextPage() {
+        if (loading || !next) return;
+        loading = true;
+
+        fetch(`${more.dataset.pageUrl}?after=${next}`)
+            .then(response => response.json())
+            .then(data => {
+                data.recipes.forEach(addCard);
+                next = data.next;
+                if (!next) {
+                    observer.disconnect();
+                    more.remove();
+                }
+            })
+            .catch(error => console.error('Error loading recipes:', error))
+            .finally(() => { loading = false; });
+    }
+
+    // Load more when the "Load more" link scrolls into view, the link itself still works without JavaScript
+    const observer = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) loadNextPage();
+    }, { rootMargin: '400px' });
+    observer.observe(more);
+
+    more.querySelector('a').addEventListener('click', function(event) {
+        event.preventDefault();
+        loadNextPage();
+    });
+});
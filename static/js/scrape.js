@@ -1,3 +1,6 @@
+const SCRAPE_POLL_INTERVAL = 1000;
+const SCRAPE_POLL_TIMEOUT = 3 * 60 * 1000;
+
 document.addEventListener('DOMContentLoaded', function() {
     const scrapeButton = document.getElementById('scrape-button');
     const recipeUrlInput = document.getElementById('recipe-url');
@@ -8,17 +11,28 @@ document.addEventListener('DOMContentLoaded', function() {
     const addScrapedContainer = document.getElementById('add-scraped-to-recipe-container');
     const emptyFormTemplate = document.getElementById('empty-form').innerHTML;
 
-    let managedIngredientsCache = [];
+    // Fill a dropdown with the best autocomplete suggestions for a name, keeping the current choice
+    function fillManagedSelect(select, query, selected) {
+        select.innerHTML = '';
+
+        const placeholder = document.createElement('option');
+        placeholder.textContent = 'Select matching ingredient...';
+        placeholder.value = '';
+        select.appendChild(placeholder);
 
-    // Fetch all managed ingredients for the dropdown
-    function fetchManagedIngredients() {
-        fetch('/ingredients/autocomplete/')
+        if (selected) {
+            select.appendChild(new Option(selected.name, selected.id, true, true));
+        }
+
+        fetch(`/ingredients/autocomplete/?q=${encodeURIComponent(query)}`)
             .then(response => response.json())
             .then(data => {
-                managedIngredientsCache = data;
+                data.forEach(managed => {
+                    if (selected && managed.id == selected.id) return;
+                    select.appendChild(new Option(managed.name, managed.id));
+                });
             });
     }
-    fetchManagedIngredients();
 
     scrapeButton.addEventListener('click', function() {
         const url = recipeUrlInput.value;
@@ -26,41 +40,63 @@ document.addEventListener('DOMContentLoaded', function() {
             statusDiv.textContent = 'Please enter a URL.';
             return;
         }
-        statusDiv.textContent = 'Scraping...';
+        statusDiv.textContent = 'Submitting...';
         scrapedIngredientsContainer.innerHTML = '';
         addScrapedContainer.style.display = 'none';
 
-        fetch(`/scrape-recipe/?url=${encodeURIComponent(url)}`)
+        const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]').value;
+
+        fetch('/scrape-jobs/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'X-CSRFToken': csrfToken
+            },
+            body: `url=${encodeURIComponent(url)}`
+        })
             .then(response => response.json())
-            .then(data => {
-                if (data.error) {
-                    statusDiv.textContent = `Error: ${data.error}`;
-                    return;
-                }
-                statusDiv.textContent = 'Scraping successful! Please review the ingredients below.';
-                populateScrapedIngredients(data.ingredients);
-                addScrapedContainer.style.display = 'block';
-            })
+            .then(job => handleJob(job, Date.now()))
             .catch(error => {
                 statusDiv.textContent = `Error: ${error}`;
             });
-        
-        fetch(`/scrape-recipe-details/?url=${encodeURIComponent(url)}`)
-            .then(response => response.json())
-            .then(data => {
-                if (data.error) {
-                    console.error(`Error: ${data.error}`);
-                    return;
-                }
-                if(data.title) document.getElementById('id_title').value = data.title;
-                if(data.description) document.getElementById('id_description').value = data.description;
-                if(data.servings) document.getElementById('id_servings').value = data.servings;
-            })
-            .catch(error => {
-                console.error(`Error: ${error}`);
-            });
     });
 
+    // Scrapes run in a background worker, poll the job until it is done or failed
+    function handleJob(job, startedAt) {
+        if (job.error && job.status !== 'pending') {
+            statusDiv.textContent = `Error: ${job.error}`;
+            return;
+        }
+        if (job.status === 'done') {
+            showScrapedRecipe(job.result);
+            return;
+        }
+        if (Date.now() - startedAt > SCRAPE_POLL_TIMEOUT) {
+            statusDiv.textContent = 'Scraping is taking longer than expected, please try again later.';
+            return;
+        }
+
+        statusDiv.textContent = job.status === 'running' ? 'Scraping...' : 'Waiting for a free scraper...';
+        setTimeout(() => {
+            fetch(job.poll_url)
+                .then(response => response.json())
+                .then(next => handleJob(next, startedAt))
+                .catch(error => {
+                    statusDiv.textContent = `Error: ${error}`;
+                });
+        }, SCRAPE_POLL_INTERVAL);
+    }
+
+    function showScrapedRecipe(data) {
+        if(data.title) document.getElementById('id_title').value = data.title;
+        if(data.description) document.getElementById('id_description').value = data.description;
+        if(data.servings) document.getElementById('id_servings').value = data.servings;
+
+        statusDiv.textContent = 'Scraping successful! Please review the ingredients below.';
+        populateScrapedIngredients(data.ingredients);
+        addScrapedContainer.style.display = 'block';
+    }
+
     function populateScrapedIngredients(ingredients) {
         ingredients.forEach(ingredient => {
             const clone = ingredientTemplate.content.cloneNode(true);
@@ -71,26 +107,23 @@ document.addEventListener('DOMContentLoaded', function() {
             row.querySelector('.unit-input').value = ingredient.unit;
 
             const select = row.querySelector('.managed-ingredient-select');
-            
-            const placeholder = document.createElement('option');
-            placeholder.textContent = 'Select matching ingredient...';
-            placeholder.value = '';
-            select.appendChild(placeholder);
-
-            managedIngredientsCache.forEach(managed => {
-                const option = document.createElement('option');
-                option.value = managed.id;
-                option.textContent = managed.name;
-                if (ingredient.managed_ingredient.action === 'match' && managed.id === ingredient.managed_ingredient.id) {
-                    option.selected = true;
-                }
-                select.appendChild(option);
-            });
+            const match = ingredient.managed_ingredient.action === 'match' ? ingredient.managed_ingredient : null;
+            fillManagedSelect(select, ingredient.original_name, match);
 
             scrapedIngredientsContainer.appendChild(clone);
         });
     }
 
+    // Search again when the original name is edited
+    scrapedIngredientsContainer.addEventListener('change', function(e) {
+        if (e.target.classList.contains('original-ingredient-name-input')) {
+            const select = e.target.closest('.scraped-ingredient-row').querySelector('.managed-ingredient-select');
+            const current = select.selectedOptions[0];
+            const selected = current && current.value ? { id: current.value, name: current.textContent } : null;
+            fillManagedSelect(select, e.target.value, selected);
+        }
+    });
+
     scrapedIngredientsContainer.addEventListener('click', function(e) {
         if (e.target.classList.contains('create-new-managed-ingredient')) {
             const row = e.target.closest('.scraped-ingredient-row');
@@ -109,7 +142,6 @@ document.addEventListener('DOMContentLoaded', function() {
             .then(response => response.json())
             .then(data => {
                 if (data.id) {
-                    managedIngredientsCache.push({ id: data.id, name: data.name });
                     const allSelects = document.querySelectorAll('.managed-ingredient-select');
                     allSelects.forEach(s => {
                         const newOption = document.createElement('option');
@@ -132,7 +164,8 @@ document.addEventListener('DOMContentLoaded', function() {
         const scrapedRows = scrapedIngredientsContainer.querySelectorAll('.scraped-ingredient-row');
         
         scrapedRows.forEach(row => {
-            const selectedManagedId = row.querySelector('.managed-ingredient-select').value;
+            const managedSelect = row.querySelector('.managed-ingredient-select');
+            const selectedManagedId = managedSelect.value;
             if (!selectedManagedId) return;
 
             const quantity = row.querySelector('.quantity-input').value;
@@ -142,20 +175,13 @@ document.addEventListener('DOMContentLoaded', function() {
             const newForm = document.createElement('div');
             newForm.innerHTML = newFormHtml;
             
-            const nameSelect = newForm.querySelector('select[id$="-name"]');
+            const nameInput = newForm.querySelector('input[id$="-name"]');
+            const nameText = newForm.querySelector('.autocomplete-ingredient');
             const quantityInput = newForm.querySelector('input[id$="-quantity"]');
             const unitInput = newForm.querySelector('select[id$="-unit"]');
 
-            let optionExists = Array.from(nameSelect.options).some(opt => opt.value == selectedManagedId);
-            if (!optionExists) {
-                const selectedManaged = managedIngredientsCache.find(i => i.id == selectedManagedId);
-                if (selectedManaged) {
-                    const newOption = new Option(selectedManaged.name, selectedManaged.id, true, true);
-                    nameSelect.add(newOption);
-                }
-            }
-            
-            nameSelect.value = selectedManagedId;
+            nameInput.value = selectedManagedId;
+            nameText.value = managedSelect.selectedOptions[0].textContent;
             quantityInput.value = quantity;
             unitInput.value = unit;
 